@@ -7,6 +7,7 @@ import random
 import av
 import streamlit as st
 from streamlit_webrtc import webrtc_streamer, VideoTransformerBase, RTCConfiguration, VideoProcessorBase, WebRtcMode
+from render_utils import BlendRegion, HandSkeleton, landmarks_to_pixels
 
 # ============================================================
 #   YOGA AI - STREAMLIT PREMIUM EDITION
@@ -89,6 +90,10 @@ CHAKRA_COLORS = [
     (255, 255, 255)  # Crown   - White
 ]
 
+# mp_drawing.draw_landmarks defaults: red joints, light grey bones
+HAND_SKELETON = HandSkeleton(joint_color=(0, 0, 255), bone_color=(224, 224, 224),
+                             joint_radius=2, joint_thickness=2, bone_thickness=2)
+
 MUDRA_INFO = {
     "Gyan": [
         "GYAN MUDRA (Wisdom)", "Benefits:", "- Improves concentration", "- Sharpens memory", "- Reduces stress"
@@ -114,9 +119,7 @@ MUDRA_INFO = {
 
 def draw_text_with_bg(frame, text, x, y, font_scale=0.6, color=(255, 255, 255), thickness=1, bg_color=(0, 0, 0), bg_alpha=0.6):
     (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (x - 5, y - text_h - 5), (x + text_w + 5, y + 5), bg_color, -1)
-    cv2.addWeighted(overlay, bg_alpha, frame, 1 - bg_alpha, 0, frame)
+    BlendRegion(frame).rect((x - 5, y - text_h - 5), (x + text_w + 5, y + 5), bg_color).apply(bg_alpha)
     cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
 
 def draw_universe(frame, t):
@@ -124,10 +127,10 @@ def draw_universe(frame, t):
     cx = int(w * 0.15) # Left side
     cy = int(h * 0.5)
 
-    overlay = frame.copy()
-    cv2.circle(overlay, (cx, cy), 140, (40, 0, 60), -1)
-    cv2.circle(overlay, (cx, cy), 90, (80, 0, 120), -1)
-    cv2.addWeighted(overlay, 0.25, frame, 0.75, 0, frame)
+    overlay = BlendRegion(frame)
+    overlay.circle((cx, cy), 140, (40, 0, 60))
+    overlay.circle((cx, cy), 90, (80, 0, 120))
+    overlay.apply(0.25)
 
     cv2.circle(frame, (cx, cy), 26, (0, 255, 255), -1)
 
@@ -161,9 +164,7 @@ def draw_chakras(frame, center_x, top_y, bottom_y, active_index, energies, aura_
         aura_radius = int(radius * (1.5 + 0.3 * music_pulse))
         aura_alpha = min(0.9, 0.25 + 0.5 * energy * music_pulse)
 
-        overlay = frame.copy()
-        cv2.circle(overlay, center, aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay, aura_alpha, frame, 1 - aura_alpha, 0, frame)
+        BlendRegion(frame).circle(center, aura_radius, aura_color).apply(aura_alpha)
 
         cv2.circle(frame, center, radius, base_color, -1)
 
@@ -181,9 +182,7 @@ def draw_chakras(frame, center_x, top_y, bottom_y, active_index, energies, aura_
 
 def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255)
-    overlay = frame.copy()
-    cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
-    cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+    BlendRegion(frame).circle((center_x, center_y), radius, golden_color).apply(0.2)
     
     num_particles = 8
     for i in range(num_particles):
@@ -196,14 +195,14 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
         cv2.circle(frame, (px, py), 10, golden_color, 2)
 
 def draw_gyan_sparkles(frame, center_x, center_y, radius):
-    overlay = frame.copy()
+    overlay = BlendRegion(frame)
     for _ in range(35):
         angle = random.uniform(0, 2 * math.pi)
         r = random.uniform(radius * 0.6, radius * 1.1)
         x = int(center_x + r * math.cos(angle))
         y = int(center_y + r * math.sin(angle))
-        cv2.circle(overlay, (x, y), random.randint(2, 4), (0, 215, 255), -1)
-    cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
+        overlay.circle((x, y), random.randint(2, 4), (0, 215, 255))
+    overlay.apply(0.8, 0.2)
 
 def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
     colors = [(0, 0, 255), (0, 255, 0), (0, 255, 255), (0, 140, 255), (255, 0, 255)]
@@ -252,9 +251,7 @@ def draw_mudra_info_panel(frame, mudra_name=None):
     x = w - sidebar_w + 10
     y = 570 
     
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (x, y), (x + panel_w, y + panel_h), (40, 50, 60), -1)
-    cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
+    BlendRegion(frame).rect((x, y), (x + panel_w, y + panel_h), (40, 50, 60)).apply(0.9, 0.1)
     cv2.rectangle(frame, (x, y), (x + panel_w, y + panel_h), (0, 255, 0), 2)
     
     lines = MUDRA_INFO.get(mudra_name, ["CHAKRA AI FLOW", "Guide:", "- Sit in **Lotus Pose**", "- Show **Hand Mudras**", "- Close **Eyes**", "- Focus on **Breath**"])
@@ -278,9 +275,7 @@ def draw_mudra_info_panel(frame, mudra_name=None):
 def draw_mudra_sidebar(frame, active_mudra):
     h, w, _ = frame.shape
     sidebar_w = 280 
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (w - sidebar_w, 0), (w, h), (60, 70, 80), -1)
-    cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
+    BlendRegion(frame).rect((w - sidebar_w, 0), (w, h), (60, 70, 80)).apply(0.85, 0.15)
     cv2.line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (100, 255, 100), 2, cv2.LINE_AA)
     cv2.putText(frame, "Mudra Guide", (w - sidebar_w + 20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
     
@@ -294,9 +289,7 @@ def draw_mudra_sidebar(frame, active_mudra):
         if is_active:
             cv2.line(frame, (w - sidebar_w, y - 25), (w - sidebar_w, y + 45), (0, 255, 0), 5, cv2.LINE_AA)
             
-        overlay_item = frame.copy()
-        cv2.rectangle(overlay_item, (w - sidebar_w + 2, y - 25), (w, y + 45), bg_col, -1)
-        cv2.addWeighted(overlay_item, bg_alpha, frame, 1 - bg_alpha, 0, frame)
+        BlendRegion(frame).rect((w - sidebar_w + 2, y - 25), (w, y + 45), bg_col).apply(bg_alpha)
         
         cv2.putText(frame, name, (w - sidebar_w + 20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
         cv2.putText(frame, desc, (w - sidebar_w + 20, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (220, 220, 220) if not is_active else (255, 255, 255), 1, cv2.LINE_AA)
@@ -434,9 +427,7 @@ class YogaProcessor(VideoProcessorBase):
         aura_radius = int(min(w, h) * 0.4)
         aura_color = (0, 215, 255) if (is_yoga_active and not self.alignment_mode) else (255, 255, 255)
         
-        overlay_bg = img.copy()
-        cv2.circle(overlay_bg, (center_x, center_y_aura), aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay_bg, 0.15, img, 0.85, 0, img)
+        BlendRegion(img).circle((center_x, center_y_aura), aura_radius, aura_color).apply(0.15)
         
         if is_yoga_active and not self.alignment_mode:
             draw_revolving_aura(img, center_x, center_y_aura - 100, 120, self.anim_time)
@@ -449,7 +440,8 @@ class YogaProcessor(VideoProcessorBase):
         # Hands & Face
         if hand_res.multi_hand_landmarks:
              for hl in hand_res.multi_hand_landmarks:
-                 self.mp_drawing.draw_landmarks(img, hl, self.mp_hands.HAND_CONNECTIONS)
+                 points, visible = landmarks_to_pixels(hl, w, h)
+                 HAND_SKELETON.draw(img, points, visible)
                  
         draw_mudra_sidebar(img, detected_mudra_name)
         
@@ -0,0 +1,82 @@
+#include "MAX30100.h"
+#include <Wire.h>
+#include <avr/wdt.h> // Watchdog Timer Library
+
+// Raw PPG streaming mode: every IR / red sample (100 Hz) goes to the host,
+// which does the filtering, beat detection and SpO2 (ppg.py). Run the app
+// with HR_SENSOR_RAW=1.
+//
+// Frame (8 bytes): 0xA5 0x5A | seq | ir lo, hi | red lo, hi | checksum
+// checksum = (seq + ir lo + ir hi + red lo + red hi) & 0xFF
+// seq counts frames (wraps at 256) so the host can spot dropped samples.
+
+MAX30100 sensor;
+uint8_t seq = 0;
+uint32_t tsLastSample = 0;
+
+void sendFrame(uint16_t ir, uint16_t red) {
+  uint8_t frame[8];
+  frame[0] = 0xA5;
+  frame[1] = 0x5A;
+  frame[2] = seq++;
+  frame[3] = ir & 0xFF;
+  frame[4] = ir >> 8;
+  frame[5] = red & 0xFF;
+  frame[6] = red >> 8;
+  frame[7] = frame[2] + frame[3] + frame[4] + frame[5] + frame[6];
+  Serial.write(frame, sizeof(frame));
+}
+
+bool initSensor() {
+  if (!sensor.begin())
+    return false;
+  sensor.setMode(MAX30100_MODE_SPO2_HR);
+  sensor.setLedsCurrent(MAX30100_LED_CURR_27_1MA, MAX30100_LED_CURR_27_1MA);
+  sensor.setLedsPulseWidth(MAX30100_SPC_PW_1600US_16BITS);
+  sensor.setSamplingRate(MAX30100_SAMPRATE_100HZ);
+  sensor.setHighresModeEnabled(true);
+  return true;
+}
+
+void setup() {
+  // 8 bytes x 100 Hz = 800 B/s, well within 115200 baud
+  Serial.begin(115200);
+  pinMode(13, OUTPUT);
+
+  // If the loop hangs for > 2 seconds, the Arduino will auto-reset.
+  wdt_enable(WDTO_2S);
+
+  Serial.print("Initializing...");
+  if (!initSensor()) {
+    Serial.println("FAILED");
+    for (;;)
+      ;
+  } else {
+    Serial.println("SUCCESS");
+  }
+
+  // Stability: Lower I2C speed to 100kHz to prevent lockups
+  Wire.setClock(100000);
+  tsLastSample = millis();
+}
+
+void loop() {
+  wdt_reset();
+  sensor.update();
+
+  // Drain the sensor FIFO: one frame per sample
+  uint16_t ir, red;
+  while (sensor.getRawValues(&ir, &red)) {
+    sendFrame(ir, red);
+    tsLastSample = millis();
+  }
+
+  // Auto-Recovery: no samples for 1 s means the sensor froze, revive it
+  if (millis() - tsLastSample > 1000) {
+    digitalWrite(13, HIGH);
+    delay(50);
+    digitalWrite(13, LOW);
+    initSensor();
+    tsLastSample = millis();
+  }
+}
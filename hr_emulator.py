@@ -0,0 +1,315 @@
+import argparse
+import math
+import os
+import random
+import threading
+import time
+
+from ppg import PPG_SAMPLE_HZ, SyntheticPPG, encode_frames
+
+# ============================================================
+#   HEART RATE SENSOR EMULATOR
+#   Speaks the Arduino sketch's serial protocol ("BEAT" and
+#   "HR:75;SpO2:98" lines) on a pseudo-terminal, so the sensor
+#   path and panels can be run, benchmarked and soak-tested
+#   without the board. POSIX only (os.openpty).
+#
+#   python hr_emulator.py --scenario rest
+#   HR_SENSOR_PORT=<printed pty path> python yogi.py
+#   --raw streams synthetic PPG frames like arduino_raw_ppg
+#   (run the app with HR_SENSOR_RAW=1 as well).
+# ============================================================
+
+REPORT_HZ = 10.0 # The sketch reports every 100 ms
+
+SCENARIOS = ("rest", "breath_hold", "finger_off", "noisy", "burst", "disconnect", "mixed")
+
+
+class SensorState:
+    """What the emulated finger / board is doing at one moment."""
+    def __init__(self, hr=68.0, rsa_ms=40.0, breath_hz=0.1, spo2=98.0, contact=True,
+                 silent=False, noisy=False, burst=False):
+        self.hr = hr               # Mean heart rate (BPM)
+        self.rsa_ms = rsa_ms       # Breathing-driven IBI swing (respiratory sinus arrhythmia)
+        self.breath_hz = breath_hz # Breathing rate; 0 while holding the breath
+        self.spo2 = spo2
+        self.contact = contact     # False: finger off, the sketch sends HR:0;SpO2:0
+        self.silent = silent       # True: nothing is written (cable pulled, board hung)
+        self.noisy = noisy         # Missed / extra beats, outliers and garbled bytes
+        self.burst = burst         # Output held back and flushed in chunks
+
+
+def scenario_state(name, t):
+    """SensorState of scenario `name` at t seconds into the run."""
+    if name == "breath_hold":
+        # 30 s breathing, 30 s hold: HR sinks ~10 BPM (dive reflex), RSA
+        # flattens and SpO2 drifts down, then recovers
+        phase = t % 60.0
+        if phase < 30.0:
+            return SensorState(hr=70.0, rsa_ms=45.0, breath_hz=0.1)
+        k = min(1.0, (phase - 30.0) / 15.0)
+        return SensorState(hr=70.0 - 10.0 * k, rsa_ms=8.0, breath_hz=0.0, spo2=98.0 - 3.0 * k)
+    if name == "finger_off":
+        # 15 s on the sensor, 5 s off
+        return SensorState(contact=(t % 20.0) < 15.0)
+    if name == "noisy":
+        return SensorState(hr=74.0, rsa_ms=25.0, breath_hz=0.2, noisy=True)
+    if name == "burst":
+        return SensorState(burst=True)
+    if name == "disconnect":
+        # Goes quiet for 7 s every 30 s (past the app's 5 s data timeout)
+        return SensorState(silent=(t % 30.0) >= 23.0)
+    if name == "mixed":
+        # One minute of each scenario in turn
+        parts = [s for s in SCENARIOS if s != "mixed"]
+        return scenario_state(parts[int(t // 60.0) % len(parts)], t % 60.0)
+    return SensorState() # rest
+
+
+class HeartRateEmulator:
+    """
+    Generates the sensor's line stream in (optionally accelerated) time.
+    Beats follow the scenario's heart rate with breathing-driven variability
+    and a little jitter; "HR:..;SpO2:.." is reported at report_hz (10 Hz on
+    the real board; raise it to stress the reader). speed > 1 plays the
+    scenario faster than real time. Lines go to write_fn(bytes).
+    raw=True sends SyntheticPPG samples as binary frames at PPG_SAMPLE_HZ
+    instead (report_hz unused); noisy then also corrupts frame bytes.
+    """
+    RAW_CHUNK = 5 # Samples per write in raw mode
+
+    def __init__(self, write_fn, scenario="rest", report_hz=REPORT_HZ, speed=1.0, seed=None,
+                 burst_secs=0.5, raw=False):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"unknown scenario {scenario!r} (choose from {', '.join(SCENARIOS)})")
+        self.write_fn = write_fn
+        self.scenario = scenario
+        self.report_hz = report_hz
+        self.speed = speed
+        self.burst_secs = burst_secs
+        self.rng = random.Random(seed)
+        self.raw = raw
+        self.ppg = SyntheticPPG(seed=seed) if raw else None
+        self.seq = 0 # Next frame sequence number
+        self.t = 0.0 # Scenario time (s)
+        self.next_beat = 0.0
+        self.next_report = 0.0
+        self.shown_hr = None # Smoothed HR, like the sketch's 4-beat average
+        self.pending = bytearray() # Held back while bursting
+        self.last_flush = 0.0
+        self.lines = 0
+        self.beats = 0
+        self.bytes = 0
+        self.garbled = 0 # Garbled partial lines (noisy); each spoils the line it runs into
+        self._stop = threading.Event()
+
+    def _ibi(self, state):
+        """Next inter-beat interval (s) at the current scenario time."""
+        ibi = 60.0 / state.hr
+        if state.breath_hz > 0:
+            ibi += state.rsa_ms / 1000.0 * math.sin(2 * math.pi * state.breath_hz * self.t)
+        return max(0.3, ibi + self.rng.gauss(0.0, 0.008))
+
+    def _emit(self, line, state):
+        data = line.encode() + b"\n"
+        self.lines += 1
+        if state.burst:
+            self.pending += data
+            return
+        self._write(data)
+
+    def _write(self, data):
+        self.write_fn(bytes(data))
+        self.bytes += len(data)
+
+    def step(self, state=None):
+        """Emits everything due at self.t; returns the scenario time of the next event."""
+        state = state or scenario_state(self.scenario, self.t)
+        if state.silent:
+            # Nothing on the wire; resume on fresh timings afterwards
+            self.next_beat = max(self.next_beat, self.t)
+            self.next_report = max(self.next_report, self.t)
+            self.pending.clear()
+            return self.t + 0.1
+        if self.raw:
+            return self._step_raw(state)
+
+        if self.t >= self.next_beat:
+            ibi = self._ibi(state)
+            if state.contact:
+                if not (state.noisy and self.rng.random() < 0.05): # Missed beat
+                    self._emit("BEAT", state)
+                    self.beats += 1
+                if state.noisy and self.rng.random() < 0.05: # Double count
+                    self._emit("BEAT", state)
+                    self.beats += 1
+                inst = 60.0 / ibi
+                self.shown_hr = inst if self.shown_hr is None else self.shown_hr + (inst - self.shown_hr) / 4
+            self.next_beat = self.t + ibi
+
+        if self.t >= self.next_report:
+            if not state.contact:
+                self.shown_hr = None
+                self._emit("HR:0;SpO2:0", state)
+            elif self.shown_hr is not None:
+                hr, spo2 = self.shown_hr, state.spo2
+                if state.noisy and self.rng.random() < 0.03:
+                    hr, spo2 = self.rng.choice([(180.0, 80.0), (35.0, 99.0)]) # Motion artifact
+                self._emit(f"HR:{hr:.0f};SpO2:{spo2:.0f}", state)
+            if state.noisy and self.rng.random() < 0.02:
+                self._write(b"\x00\xffHR:7") # Garbled partial line, no newline
+                self.garbled += 1
+            self.next_report = self.t + 1.0 / self.report_hz
+
+        if state.burst and self.pending and self.t - self.last_flush >= self.burst_secs:
+            self._write(self.pending)
+            self.pending.clear()
+            self.last_flush = self.t
+        return min(self.next_beat, self.next_report)
+
+    def _step_raw(self, state):
+        ppg = self.ppg
+        ppg.hr, ppg.rsa_ms, ppg.breath_hz = state.hr, state.rsa_ms, state.breath_hz
+        ppg.spo2, ppg.contact = state.spo2, state.contact
+        ppg.noise = 0.003 if state.noisy else 0.0005
+        ppg.t = self.t # Follow scenario time across silences
+        ir, red, beats = ppg.generate(self.RAW_CHUNK)
+        data = bytearray(encode_frames(self.seq, ir, red))
+        self.seq += self.RAW_CHUNK
+        self.lines += self.RAW_CHUNK
+        self.beats += len(beats)
+        if state.noisy and self.rng.random() < 0.05:
+            data[self.rng.randrange(len(data))] ^= 0x55 # Corrupted byte: frame dropped
+        if state.burst:
+            self.pending += data
+        else:
+            self._write(data)
+        if state.burst and self.pending and self.t - self.last_flush >= self.burst_secs:
+            self._write(self.pending)
+            self.pending.clear()
+            self.last_flush = self.t
+        return self.t + self.RAW_CHUNK / PPG_SAMPLE_HZ
+
+    def run(self, duration=None):
+        """Plays the scenario (scaled by speed) until stop() or duration scenario seconds."""
+        start = time.monotonic()
+        while not self._stop.is_set():
+            if duration is not None and self.t >= duration:
+                break
+            nxt = self.step()
+            wait = start + nxt / self.speed - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            self.t = max(nxt, (time.monotonic() - start) * self.speed)
+        if self.pending:
+            self._write(self.pending)
+            self.pending.clear()
+
+    def stop(self):
+        self._stop.set()
+
+
+class PtyLink:
+    """
+    Pseudo-terminal pair: the emulator writes to the master end, the app
+    opens .port (the slave path) like any serial device.
+    """
+    def __init__(self):
+        import tty
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave) # No echo / line discipline: bytes pass unchanged
+        self.port = os.ttyname(self.slave)
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            n = os.write(self.master, view)
+            view = view[n:]
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def benchmark(link, emulator, secs, frame_hz=30.0):
+    """
+    Runs the emulator against the app's serial path (SerialReader drained at
+    frame_hz, beats into StreamingHRV) and returns throughput / loss figures.
+    Beat arrival times are scaled back to scenario time when speed != 1
+    (line mode; raw beats are stamped on the sample clock, so only real-time
+    raw runs give meaningful HRV).
+    """
+    import serial
+    from hr_sensor import PPGReader, SerialReader
+    from hrv import StreamingHRV
+
+    ser = serial.Serial(link.port, 115200, timeout=0.1)
+    reader = (PPGReader if emulator.raw else SerialReader)(ser, max_samples=1 << 16)
+    scale = 1.0 if emulator.raw else emulator.speed
+    hrv = StreamingHRV(window_secs=60.0)
+    thread = threading.Thread(target=emulator.run, args=(secs * emulator.speed,), daemon=True)
+    t0 = time.monotonic()
+    thread.start()
+    samples = beats = 0
+    worst_drain = 0
+    while thread.is_alive() or reader.samples:
+        time.sleep(1.0 / frame_hz)
+        batch = reader.drain()
+        worst_drain = max(worst_drain, len(batch))
+        samples += len(batch)
+        for s in batch:
+            if s.kind == "BEAT":
+                beats += 1
+                hrv.add_beat(s.t * scale)
+        if not thread.is_alive() and time.monotonic() - t0 > secs + 1.0:
+            break
+    elapsed = time.monotonic() - t0
+    reader.stop(timeout=1.0)
+    return {
+        "secs": round(elapsed, 2),
+        "lines_sent": emulator.lines,
+        "lines_framed": reader.lines,
+        "samples": samples,
+        "beats_sent": emulator.beats,
+        "beats_received": beats,
+        "lines_per_sec": round(reader.lines / elapsed, 1),
+        "max_samples_per_frame": worst_drain,
+        "rmssd_ms": round(hrv.rmssd, 1),
+        "reader_error": repr(reader.error) if reader.error else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heart rate sensor emulator on a pseudo-terminal")
+    parser.add_argument("--scenario", default="rest", choices=SCENARIOS)
+    parser.add_argument("--rate", type=float, default=REPORT_HZ, help="HR/SpO2 report rate (Hz)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Scenario time multiplier")
+    parser.add_argument("--duration", type=float, default=None, help="Scenario seconds to run (default: forever)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--raw", action="store_true", help="Stream raw PPG frames (arduino_raw_ppg)")
+    parser.add_argument("--bench", type=float, default=None, metavar="SECS",
+                        help="Run SECS against the in-process serial reader and print stats")
+    args = parser.parse_args()
+
+    link = PtyLink()
+    emulator = HeartRateEmulator(link.write, args.scenario, args.rate, args.speed, args.seed, raw=args.raw)
+    try:
+        if args.bench:
+            for key, value in benchmark(link, emulator, args.bench).items():
+                print(f"{key}: {value}")
+            return
+        print(f"[INFO] Emulating '{args.scenario}' on {link.port} (Ctrl+C to stop)")
+        print(f"[INFO] Run the app with HR_SENSOR_PORT={link.port}" + (" HR_SENSOR_RAW=1" if args.raw else ""))
+        emulator.run(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+        link.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+import collections
+import threading
+import time
+
+import numpy as np
+import serial
+import serial.tools.list_ports
+
+from ppg import PPG_BLOCK, PPG_HR_RANGE, FrameDecoder, PPGPipeline
+from timing import FrameClock
+
+# ============================================================
+#   HEART RATE SENSOR LINK
+#   Serial reader thread for the Arduino heart rate sensor.
+#   Bulk reads, bytearray line framing and parsing happen off
+#   the render thread; timestamped samples go into a deque
+#   that the UI drains once per frame. Port discovery and
+#   opening run on a hotplug watcher thread. In raw mode the
+#   same thread decodes PPG frames and detects beats (ppg.py).
+#   HeartRateMonitor ties them together for the render loop.
+# ============================================================
+
+# Port descriptions that identify the sensor board ("Serial" is a generic
+# match for some clones)
+SENSOR_PORT_HINTS = ("Arduino", "CH340", "USB Serial", "Serial")
+
+# One parsed line. kind is "HR" (hr / spo2 set, either may be None when the
+# field is missing) or "BEAT". t is the time.monotonic() the line arrived at
+# (spread over the read for lines taken in one bulk read).
+HRSample = collections.namedtuple("HRSample", "t kind hr spo2")
+
+
+def parse_line(line, t):
+    """
+    Parses one sensor line ("BEAT" or "HR:75;SpO2:98") into an HRSample.
+    Returns None for anything else (debug prints, partial lines, noise).
+    """
+    if isinstance(line, (bytes, bytearray)):
+        line = line.decode("utf-8", errors="ignore")
+    line = line.strip()
+    if line == "BEAT":
+        return HRSample(t, "BEAT", None, None)
+    if not line.startswith("HR:"):
+        return None
+    hr = spo2 = None
+    for part in line.split(";"):
+        try:
+            if "HR:" in part:
+                hr = float(part.split(":")[1])
+            if "SpO2:" in part:
+                spo2 = float(part.split(":")[1])
+        except (IndexError, ValueError):
+            return None
+    return HRSample(t, "HR", hr, spo2)
+
+
+class SerialReader:
+    """
+    Reads an open serial port on a daemon thread.
+    Each pass takes everything waiting in one read(in_waiting) (or blocks for
+    one byte up to the port timeout when idle), splits complete lines out of
+    a bytearray and appends parsed samples to a deque. deque.append/popleft
+    are atomic, so the UI thread drains without taking a lock; if it stops
+    draining, the oldest samples are dropped past max_samples.
+    A read error ends the thread and is kept in .error for the owner.
+    The reader owns the port: it is closed when the thread exits.
+    """
+    MAX_LINE = 256 # A longer run without a newline is noise: discard it
+
+    def __init__(self, ser, max_samples=1024):
+        self.ser = ser
+        self.samples = collections.deque(maxlen=max_samples)
+        self.error = None
+        self.lines = 0 # Complete lines framed so far
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def alive(self):
+        return self.thread.is_alive()
+
+    def _run(self):
+        buf = bytearray()
+        last = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                data = self.ser.read(self.ser.in_waiting or 1)
+                t0, last = last, time.monotonic()
+                if not data:
+                    continue
+                buf += data
+                self._consume(buf, len(data), t0, last)
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+
+    def _consume(self, buf, fresh, t0, t):
+        """
+        Parses the complete lines in buf and removes them. The last `fresh`
+        bytes arrived between the previous read (t0) and t: a backlog taken
+        in one read (e.g. after a stall) has its lines stamped in proportion
+        to their position in it, so two BEATs never share one timestamp.
+        """
+        end = buf.rfind(b"\n")
+        if end < 0:
+            if len(buf) > self.MAX_LINE:
+                buf.clear()
+            return
+        start = len(buf) - fresh # Older bytes hold no newline: lines end in the fresh part
+        step = (t - t0) / fresh
+        pos = 0
+        for line in buf[:end].split(b"\n"):
+            pos += len(line) + 1
+            self.lines += 1
+            sample = parse_line(line, t - (start + fresh - pos) * step)
+            if sample is not None:
+                self.samples.append(sample)
+        del buf[:end + 1]
+
+    def drain(self):
+        """Returns (and removes) every sample received since the last drain."""
+        out = []
+        pop = self.samples.popleft
+        while True:
+            try:
+                out.append(pop())
+            except IndexError:
+                return out
+
+    def stop(self, timeout=None):
+        """
+        Asks the thread to finish; it closes the port within the read timeout.
+        Only waits for that when a timeout is given (e.g. on exit).
+        """
+        self._stop.set()
+        if timeout is not None and threading.current_thread() is not self.thread:
+            self.thread.join(timeout)
+
+
+class PPGReader(SerialReader):
+    """
+    SerialReader for the raw streaming firmware (arduino_raw_ppg).
+    Frames are decoded as they arrive and run through PPGPipeline in blocks
+    of PPG_BLOCK samples on the reader thread; the results go into the same
+    deque as HRSample("BEAT") (at the detected beat time) and HRSample("HR")
+    after each beat, or HR 0 / SpO2 0 about once a second with no finger,
+    so the UI side is unchanged. .lines counts decoded frames.
+    """
+    def __init__(self, ser, max_samples=1024, pipeline=None):
+        self.decoder = FrameDecoder()
+        self.pipeline = pipeline or PPGPipeline()
+        self._pending = [] # (ir, red) chunks not yet processed
+        self._pending_len = 0
+        self._gap = 0
+        self._last_off = None # When HR 0 was last sent
+        super().__init__(ser, max_samples)
+
+    def _consume(self, buf, fresh, t0, t):
+        ir, red, gap = self.decoder.decode(buf)
+        if not len(ir) and not gap:
+            return
+        self.lines += len(ir)
+        if not self._pending:
+            self._gap = gap
+        elif gap: # Hold the last pending sample through the gap
+            last_ir, last_red = self._pending[-1]
+            self._pending.append((last_ir[-1:].repeat(gap), last_red[-1:].repeat(gap)))
+            self._pending_len += gap
+        self._pending.append((ir, red))
+        self._pending_len += len(ir)
+        if self._pending_len < PPG_BLOCK:
+            return
+        irs, reds = zip(*self._pending)
+        self._pending, self._pending_len = [], 0
+        beats, hr, spo2 = self.pipeline.process(np.concatenate(irs), np.concatenate(reds), t, self._gap)
+        for bt in beats:
+            self.samples.append(HRSample(bt, "BEAT", None, None))
+        if hr == 0:
+            if self._last_off is None or t - self._last_off >= 1.0:
+                self._last_off = t
+                self.samples.append(HRSample(t, "HR", 0.0, 0.0))
+        elif hr is not None:
+            self._last_off = None
+            self.samples.append(HRSample(t, "HR", hr, spo2))
+
+
+def find_sensor_port(ports, hints=SENSOR_PORT_HINTS):
+    """Device name of the first port whose description matches a hint, or None."""
+    for p in ports:
+        if any(hint in p.description for hint in hints):
+            return p.device
+    return None
+
+
+class PortWatcher:
+    """
+    Finds and opens the sensor port on a daemon thread, so port enumeration
+    and the blocking open never stall the render loop.
+    The port list is refreshed every poll_secs (kept in .ports). While a
+    connection is wanted, a matching port is opened and handed over as a
+    running SerialReader through take(). request() asks for a (new)
+    connection and wakes the thread at once; it never blocks.
+    A fixed `device` (e.g. an hr_emulator pty, which comports() doesn't list)
+    is opened directly instead of matching descriptions. raw=True reads the
+    raw PPG firmware's frames with a PPGReader.
+    """
+    def __init__(self, baud_rate=115200, poll_secs=2.0, read_timeout=0.1, hints=SENSOR_PORT_HINTS,
+                 device=None, raw=False):
+        self.device = device
+        self.reader_cls = PPGReader if raw else SerialReader
+        self.baud_rate = baud_rate
+        self.poll_secs = poll_secs
+        self.read_timeout = read_timeout
+        self.hints = hints
+        self.ports = [] # Last enumerated ports (cached for the UI)
+        self.last_error = None
+        self._wanted = False
+        self._ready = None # (device, SerialReader) waiting for take()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def request(self):
+        """Asks for a connection (e.g. on start, after a drop, or a manual reconnect)."""
+        with self._lock:
+            self._wanted = True
+            stale, self._ready = self._ready, None
+        if stale:
+            stale[1].stop()
+        self._wake.set()
+
+    def take(self):
+        """Returns (device, reader) once a port has been opened, else None."""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        return ready
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear() # Before looking, so a request() during the pass isn't lost
+            try:
+                self.ports = list(serial.tools.list_ports.comports())
+            except Exception as e:
+                self.last_error = e
+            with self._lock:
+                wanted = self._wanted and self._ready is None
+            if wanted:
+                device = self.device or find_sensor_port(self.ports, self.hints)
+                if device:
+                    self._open(device)
+            self._wake.wait(self.poll_secs)
+
+    def _open(self, device):
+        try:
+            ser = serial.Serial(device, self.baud_rate, timeout=self.read_timeout)
+        except Exception as e:
+            self.last_error = e
+            print(f"[ERROR] Connection failed: {e}")
+            return
+        reader = self.reader_cls(ser)
+        with self._lock:
+            if self._wanted:
+                self._wanted = False
+                self._ready = (device, reader)
+                reader = None
+        if reader:
+            reader.stop() # No longer wanted (stopped meanwhile)
+
+    def cancel(self):
+        """Stops looking for a port."""
+        with self._lock:
+            self._wanted = False
+            stale, self._ready = self._ready, None
+        if stale:
+            stale[1].stop()
+
+    def stop(self, timeout=1.0):
+        self.cancel()
+        self._stop.set()
+        self._wake.set()
+        self.thread.join(timeout)
+
+
+class HeartRateMonitor:
+    """
+    The app's view of the sensor: takes readers from a PortWatcher, drains
+    them once per frame (update) and keeps HR / SpO2, the beats of the
+    frame and the data / beat timeouts, all on `clock` (a FrameClock the
+    owner ticks every frame). port / raw are passed to the PortWatcher.
+    """
+    def __init__(self, baud_rate=115200, clock=None, port=None, raw=False):
+        self.clock = clock or FrameClock() # Per-frame timestamp snapshot
+        self.ser = None
+        self.heart_rate = 0
+        self.spo2 = 0
+        self.last_beat_time = 0 # Frame-clock time of the last beat / valid HR
+        self.connected = False
+        self.reader = None # Background SerialReader while connected
+        self.reader_lines = 0 # reader.lines seen at the last drain
+        self.baud_rate = baud_rate
+        self.beat_detected_flag = False # New flag for visualizer
+        self.frame_beats = [] # Arrival times (frame clock) of every beat drained this frame
+        self.hr_history = [] # History for stability analysis
+        self.connection_id = 0 # Bumped on every (re)connect, so consumers can drop old data
+        
+        # [FIX] Reconnection Logic
+        # Port discovery and opening run on the watcher thread (polls every 2 s)
+        self.last_data_time = self.clock.now
+        self.last_update = None # Frame time of the last drain
+        self.watcher = PortWatcher(baud_rate, poll_secs=2.0, device=port, raw=raw)
+        # Host-side detection already rejects artifacts, so it isn't held to the
+        # 55-115 window meant for the firmware's smoothed HR
+        self.hr_range = PPG_HR_RANGE if raw else (55, 115)
+        
+        self.connect()
+
+    def disconnect(self):
+        """Stops the reader thread (which closes the port); never blocks."""
+        self.connected = False
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
+        self.ser = None
+
+    def connect(self):
+        """Drops the current port and asks the watcher for a new one (non-blocking)."""
+        self.disconnect()
+        self.watcher.request()
+
+    def close(self):
+        """Stops the reader and the watcher (on exit)."""
+        reader = self.reader
+        self.disconnect()
+        self.watcher.stop()
+        if reader:
+            reader.stop(timeout=1.0)
+
+    def _attach(self, device, reader, now):
+        self.reader = reader
+        self.ser = reader.ser
+        self.reader_lines = 0
+        self.connected = True
+        self.connection_id += 1
+        self.last_data_time = now # Reset timeout timer
+        print(f"[INFO] Heart Rate Sensor connected on {device}")
+
+    def update(self):
+        now = self.clock.now
+        # Drain once per frame (the main loop may call this more than once)
+        if now == self.last_update:
+            return
+        self.last_update = now
+        self.beat_detected_flag = False # Reset flag each frame
+        self.frame_beats = []
+        
+        # [FIX] Auto-Reconnection Logic
+        # The watcher keeps looking in the background; pick up its port once open
+        if not self.connected:
+            ready = self.watcher.take()
+            if ready:
+                self._attach(*ready, now)
+            return
+
+        # [FIX] Timeout Detection (Sensor Freeze)
+        # If no data received for 5 seconds, assume connection is dead
+        if now - self.last_data_time > 5.0:
+            print("[WARN] Sensor timeout (no data for 5s). Resetting connection...")
+            self.connect()
+            return
+
+        # Serial reading and line framing run on the reader thread; here we
+        # only apply what arrived since the last frame
+        if not self.reader.alive:
+            print(f"[WARN] Serial read error: {self.reader.error}")
+            self.connect()
+            return
+        if self.reader.lines != self.reader_lines:
+            self.reader_lines = self.reader.lines
+            self.last_data_time = now # [FIX] Update timestamp
+        # Reader samples carry time.monotonic(); move them onto the frame clock
+        # so beat times, last_beat_time and both timeouts share one timeline
+        for sample in self.reader.drain():
+            self.apply_sample(sample._replace(t=self.clock.from_real(sample.t)))
+
+    def apply_sample(self, sample):
+        if sample.kind == "BEAT":
+            self.last_beat_time = sample.t
+            self.beat_detected_flag = True
+            self.frame_beats.append(sample.t)
+        elif sample.kind == "HR":
+            # Format: HR:75;SpO2:98
+            if sample.hr is not None:
+                raw_val = sample.hr
+                
+                # [ACCURACY MODE] Direct Passthrough
+                # Trust the Arduino's sophisticated processing.
+                
+                # [FIX] Handle "0" from Arduino immediately
+                if raw_val == 0:
+                    self.heart_rate = 0
+                    self.spo2 = 0
+                    self.hr_history = []
+                elif self.hr_range[0] < raw_val < self.hr_range[1]:
+                    self.heart_rate = raw_val
+                    self.last_beat_time = sample.t
+                
+            if sample.spo2 is not None:
+                self.spo2 = min(sample.spo2, 100.0) # Clamp to 100%
+
+    def parse_data(self, line):
+        sample = parse_line(line, self.clock.now)
+        if sample is not None:
+            self.apply_sample(sample)
+
+    def get_data(self):
+        # TIMEOUT LOGIC: If no beat for 3.0 seconds (was 1.5), reset data (Synced with Arduino)
+        # This ensures "Instant Reset" in the UI but allows for slower heart rates.
+        if self.clock.now - self.last_beat_time > 3.0:
+            self.heart_rate = 0
+            self.spo2 = 0
+            self.hr_history = [] # Clear history
+            self.beat_detected_flag = False
+            self.frame_beats = []
+            
+        return self.heart_rate, self.spo2, self.last_beat_time, self.beat_detected_flag, self.hr_history
@@ -0,0 +1,327 @@
+import collections
+import math
+import queue
+import threading
+import time
+
+import numpy as np
+
+# ============================================================
+#   STREAMING HRV
+#   Heart rate variability over a sliding time window with
+#   running sums: every beat updates RMSSD, SDNN and pNN50 in
+#   constant time (amortised), with no per-frame recomputation.
+#   Frequency-domain HRV (LF / HF, coherence) from the uneven
+#   IBI series, recomputed every few seconds on a worker thread.
+# ============================================================
+
+HRV_MIN_WINDOW_SECS = 30.0
+HRV_MAX_WINDOW_SECS = 300.0 # 5 min, the standard short-term HRV recording
+
+# Frequency bands (Hz)
+VLF_BAND = (0.0033, 0.04)
+LF_BAND = (0.04, 0.15)
+HF_BAND = (0.15, 0.4)
+COHERENCE_PEAK_BAND = (0.04, 0.26) # Where a resonant breathing peak can sit
+COHERENCE_PEAK_WIDTH = 0.03 # Hz, window integrated around the peak
+SPECTRUM_FREQS = np.arange(VLF_BAND[0], HF_BAND[1] + 1e-9, 0.002)
+
+
+class WindowedStats:
+    """
+    Mean and variance of the samples pushed in the last window_secs.
+    Welford's update on append and its inverse on expiry keep both O(1)
+    per sample. Like TimedHistory, values pushed faster than sample_hz are
+    dropped so the window holds the same span at any FPS.
+    """
+    def __init__(self, window_secs, sample_hz=None):
+        self.window_secs = window_secs
+        self.min_interval = (1.0 / sample_hz) if sample_hz else 0.0
+        self.samples = collections.deque() # (time, value)
+        self.mean = 0.0
+        self._m2 = 0.0 # Sum of squared deviations from the mean
+
+    def append(self, value, now=None):
+        if now is None:
+            now = time.monotonic()
+        if self.samples and now - self.samples[-1][0] < self.min_interval:
+            return False
+        self.samples.append((now, value))
+        n = len(self.samples)
+        d = value - self.mean
+        self.mean += d / n
+        self._m2 += d * (value - self.mean)
+        self.expire(now)
+        return True
+
+    def expire(self, now):
+        """Drops samples older than the window (inverse Welford step)."""
+        cutoff = now - self.window_secs
+        samples = self.samples
+        while samples and samples[0][0] < cutoff:
+            _, value = samples.popleft()
+            n = len(samples)
+            if n == 0:
+                self.mean = 0.0
+                self._m2 = 0.0
+                break
+            d = value - self.mean
+            self.mean -= d / n
+            self._m2 -= d * (value - self.mean)
+
+    def var(self, ddof=0):
+        """Variance (ddof=0 matches np.var, ddof=1 is the sample variance)."""
+        n = len(self.samples)
+        if n <= ddof:
+            return 0.0
+        return max(0.0, self._m2) / (n - ddof)
+
+    def std(self, ddof=0):
+        return math.sqrt(self.var(ddof))
+
+    def clear(self):
+        self.samples.clear()
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class StreamingHRV:
+    """
+    Time-domain HRV from beat timestamps.
+    add_beat(t) turns consecutive beats into inter-beat intervals (ms),
+    rejecting intervals outside [min_ibi, max_ibi] as artifacts; successive
+    differences are only taken between two accepted, adjacent intervals.
+    Over the last window_secs (clamped to 30 s - 5 min):
+      sdnn  : standard deviation of the intervals (Welford, sample std)
+      rmssd : root mean square of successive differences (running sum)
+      pnn50 : % of successive differences larger than 50 ms (running count)
+    The window moves on each beat and on expire(now).
+    """
+    def __init__(self, window_secs=60.0, min_ibi=300, max_ibi=1500):
+        self.window_secs = min(max(window_secs, HRV_MIN_WINDOW_SECS), HRV_MAX_WINDOW_SECS)
+        self.min_ibi = min_ibi # 200 BPM
+        self.max_ibi = max_ibi # 40 BPM
+        self.intervals = WindowedStats(self.window_secs)
+        self.diffs = collections.deque() # (time, successive difference)
+        self._sq_diff_sum = 0.0
+        self._nn50 = 0
+        self.last_beat_time = None
+        self.last_ibi = None # Previous accepted interval, if adjacent
+        self.rejected = 0
+
+    def add_beat(self, t):
+        """Feeds one beat timestamp (seconds); returns its IBI in ms, or None."""
+        last = self.last_beat_time
+        self.last_beat_time = t
+        if last is None:
+            return None
+        ibi = (t - last) * 1000.0
+        if not (self.min_ibi < ibi < self.max_ibi):
+            self.rejected += 1
+            self.last_ibi = None # Next interval isn't adjacent to an accepted one
+            return None
+        self.add_ibi(ibi, t)
+        return ibi
+
+    def add_ibi(self, ibi, t):
+        """Feeds one accepted inter-beat interval (ms) ending at time t."""
+        if self.last_ibi is not None:
+            d = ibi - self.last_ibi
+            self.diffs.append((t, d))
+            self._sq_diff_sum += d * d
+            if abs(d) > 50.0:
+                self._nn50 += 1
+        self.last_ibi = ibi
+        self.intervals.append(ibi, t)
+        self._expire_diffs(t)
+
+    def expire(self, now):
+        """
+        Drops intervals and differences older than the window as of now, so
+        the stats don't hold on to old beats once beats stop (finger lifted,
+        long breath-hold). Call it when querying.
+        """
+        self.intervals.expire(now)
+        self._expire_diffs(now)
+
+    def _expire_diffs(self, now):
+        cutoff = now - self.window_secs
+        diffs = self.diffs
+        while diffs and diffs[0][0] < cutoff:
+            _, d = diffs.popleft()
+            self._sq_diff_sum -= d * d
+            if abs(d) > 50.0:
+                self._nn50 -= 1
+        if not diffs:
+            self._sq_diff_sum = 0.0
+
+    @property
+    def count(self):
+        """Intervals in the window."""
+        return len(self.intervals)
+
+    @property
+    def mean_ibi(self):
+        return self.intervals.mean
+
+    @property
+    def sdnn(self):
+        return self.intervals.std(ddof=1)
+
+    @property
+    def rmssd(self):
+        n = len(self.diffs)
+        return math.sqrt(max(0.0, self._sq_diff_sum) / n) if n else 0.0
+
+    @property
+    def pnn50(self):
+        n = len(self.diffs)
+        return 100.0 * self._nn50 / n if n else 0.0
+
+    def series(self):
+        """(time, ibi ms) pairs in the window, oldest first (e.g. for spectral HRV)."""
+        return list(self.intervals.samples)
+
+    def reset(self):
+        self.intervals.clear()
+        self.diffs.clear()
+        self._sq_diff_sum = 0.0
+        self._nn50 = 0
+        self.last_beat_time = None
+        self.last_ibi = None
+
+
+def lomb_scargle(t, y, freqs):
+    """
+    Lomb-Scargle power spectral density of samples y taken at uneven times t
+    (seconds), at the given frequencies (Hz). Vectorised over all frequencies
+    at once; scaled so integrating it over frequency approximates the
+    variance of y (ms^2 for IBIs in ms).
+    """
+    t = np.asarray(t, np.float64)
+    y = np.asarray(y, np.float64)
+    y = y - y.mean()
+    w = 2.0 * np.pi * np.asarray(freqs, np.float64)[:, None]
+    wt2 = 2.0 * w * t
+    tau = np.arctan2(np.sin(wt2).sum(axis=1), np.cos(wt2).sum(axis=1))[:, None] / (2.0 * w)
+    arg = w * (t - tau)
+    c, s = np.cos(arg), np.sin(arg)
+    cc = np.maximum((c * c).sum(axis=1), 1e-12)
+    ss = np.maximum((s * s).sum(axis=1), 1e-12)
+    power = 0.5 * ((c @ y) ** 2 / cc + (s @ y) ** 2 / ss)
+    span = t[-1] - t[0]
+    return power * 2.0 * span / len(t)
+
+
+def band_power(freqs, psd, band):
+    """Integrated power of psd over [band[0], band[1])."""
+    sel = (freqs >= band[0]) & (freqs < band[1])
+    if not sel.any():
+        return 0.0
+    return float(psd[sel].sum() * (freqs[1] - freqs[0]))
+
+
+def spectral_hrv(series, freqs=SPECTRUM_FREQS, min_span=30.0, min_beats=20):
+    """
+    Frequency-domain HRV from (time, ibi ms) pairs, or None when there is
+    too little data. Returns a dict with:
+      lf, hf   : band powers (ms^2); lf_nu / hf_nu: their normalised units
+      lf_hf    : LF / HF ratio
+      peak_hz  : strongest frequency in the coherence band
+      coherence: share (0-1) of total power within COHERENCE_PEAK_WIDTH
+                 of that peak - high for slow, regular, breath-paced rhythm
+    """
+    if len(series) < min_beats:
+        return None
+    t, ibi = np.asarray(series, np.float64).T
+    if t[-1] - t[0] < min_span:
+        return None
+    psd = lomb_scargle(t, ibi, freqs)
+    lf = band_power(freqs, psd, LF_BAND)
+    hf = band_power(freqs, psd, HF_BAND)
+    total = band_power(freqs, psd, (VLF_BAND[0], HF_BAND[1]))
+
+    sel = (freqs >= COHERENCE_PEAK_BAND[0]) & (freqs < COHERENCE_PEAK_BAND[1])
+    peak_hz = float(freqs[sel][np.argmax(psd[sel])])
+    half = COHERENCE_PEAK_WIDTH / 2
+    peak = band_power(freqs, psd, (peak_hz - half, peak_hz + half))
+    lf_hf = lf + hf
+    return {
+        "lf": lf,
+        "hf": hf,
+        "lf_nu": lf / lf_hf if lf_hf > 0 else 0.5,
+        "hf_nu": hf / lf_hf if lf_hf > 0 else 0.5,
+        "lf_hf": lf / hf if hf > 0 else 0.0,
+        "peak_hz": peak_hz,
+        "coherence": min(1.0, peak / total) if total > 0 else 0.0,
+    }
+
+
+class SpectralHRV:
+    """
+    Runs spectral_hrv() on a worker thread every `interval` seconds.
+    update() (render thread) only snapshots the IBI window and hands it over
+    when the worker is idle, then returns the latest finished result (None
+    until there is enough data). Feed it a StreamingHRV with a 5 min window
+    (the LF band needs minutes of data); a pass costs a few ms.
+    reset() drops the result, including one still being computed.
+    """
+    def __init__(self, interval=2.0, min_span=30.0, min_beats=20):
+        self.interval = interval
+        self.min_span = min_span
+        self.min_beats = min_beats
+        self.result = None
+        self.last_submit = None
+        self._generation = 0 # Bumped by reset(); stale passes are discarded
+        self._jobs = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def update(self, now, hrv):
+        """hrv: a StreamingHRV; now: current time in any consistent clock."""
+        if self.last_submit is None or now - self.last_submit >= self.interval:
+            self.last_submit = now
+            try:
+                self._jobs.put_nowait((self._generation, hrv.series()))
+            except queue.Full:
+                pass # Previous pass still running; take the next slot
+        return self.result
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            generation, series = job
+            try:
+                result = spectral_hrv(series, min_span=self.min_span, min_beats=self.min_beats)
+            except Exception as e:
+                print(f"[WARN] Spectral HRV failed: {e}")
+                continue
+            if generation == self._generation:
+                self.result = result
+
+    def reset(self):
+        """Forgets the current result (e.g. when the sensor disconnects)."""
+        self._generation += 1
+        self.result = None
+        self.last_submit = None
+
+    def stop(self, timeout=None):
+        """
+        Ends the worker after the pass in progress (a queued one is dropped).
+        Only waits for it when a timeout is given (e.g. on exit).
+        """
+        try:
+            self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._jobs.put_nowait(None)
+        except queue.Full:
+            pass
+        if timeout is not None:
+            self.thread.join(timeout)
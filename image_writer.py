@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+# ============================================================
+#   BACKGROUND IMAGE WRITER
+#   Encodes and writes images on a worker thread so saving a
+#   souvenir or report never stalls the render loop. Bounded
+#   queue, batched fsyncs, flush on shutdown, write stats.
+# ============================================================
+
+
+def encode_params(fmt, png_level=3, jpeg_quality=90, webp_quality=90):
+    """cv2 encoder flags for a format ('png', 'jpg' / 'jpeg' or 'webp')."""
+    fmt = fmt.lower().lstrip(".")
+    if fmt == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_level)]     # zlib level 0-9
+    if fmt in ("jpg", "jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]    # 0-100
+    if fmt == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(webp_quality)]    # 1-100
+    return []
+
+
+class ImageWriter:
+    """
+    Single worker thread fed through a bounded queue.
+    submit() never blocks: when max_queue writes are already waiting the
+    image is dropped (counted as failed) rather than stalling the caller.
+    The image must not be modified after submit (pass a copy if the caller
+    keeps drawing on it). The format follows the file extension.
+
+    Files are written to a temporary name and made visible with os.replace
+    once synced; fsyncs are batched (every fsync_batch files, or whenever
+    the queue runs empty) so a burst of writes costs one round of syncs.
+    flush() waits for everything queued so far, close() flushes and stops.
+    """
+    def __init__(self, max_queue=16, fsync_batch=8, png_level=3, jpeg_quality=90, webp_quality=90):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.fsync_batch = fsync_batch
+        self.png_level = png_level
+        self.jpeg_quality = jpeg_quality
+        self.webp_quality = webp_quality
+        self.written = 0
+        self.failed = 0
+        self.last_error = None
+        self._unsynced = [] # (file, tmp path, final path)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def pending(self):
+        """Writes submitted but not yet on disk."""
+        return self._pending
+
+    def stats(self):
+        return {"pending": self._pending, "written": self.written, "failed": self.failed}
+
+    def submit(self, path, image, quality=None):
+        """
+        Queues one image; returns False if it was dropped.
+        quality overrides the writer default for this file (PNG level or
+        JPEG / WebP quality, depending on the extension).
+        """
+        fmt = os.path.splitext(path)[1]
+        params = encode_params(fmt, self.png_level, self.jpeg_quality, self.webp_quality)
+        if quality is not None and params:
+            params[1] = int(quality)
+        with self._idle:
+            self._pending += 1
+        try:
+            self.queue.put_nowait((path, image, fmt, params))
+        except queue.Full:
+            self._done(ok=False, error=f"queue full, dropped {path}")
+            return False
+        return True
+
+    def _done(self, ok, error=None):
+        with self._idle:
+            if ok:
+                self.written += 1
+            else:
+                self.failed += 1
+                self.last_error = error
+                print(f"[WARN] Image write failed: {error}")
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self._sync()
+                break
+            path, image, fmt, params = item
+            try:
+                ok, buf = cv2.imencode(fmt, image, params)
+                if not ok:
+                    raise ValueError(f"could not encode {path}")
+                folder = os.path.dirname(path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                tmp = path + ".tmp"
+                f = open(tmp, "wb")
+                try:
+                    f.write(buf.tobytes())
+                    f.flush()
+                except Exception:
+                    self._discard(f, tmp)
+                    raise
+                self._unsynced.append((f, tmp, path))
+            except Exception as e:
+                self._done(ok=False, error=f"{path}: {e}")
+            if self._unsynced and (len(self._unsynced) >= self.fsync_batch or self.queue.empty()):
+                self._sync()
+
+    @staticmethod
+    def _discard(f, tmp):
+        """Closes and removes a temp file that won't be published."""
+        for cleanup in (f.close, lambda: os.remove(tmp)):
+            try:
+                cleanup()
+            except OSError:
+                pass
+
+    def _sync(self):
+        """fsyncs and publishes the batch, then syncs the touched folders once."""
+        folders = set()
+        for f, tmp, path in self._unsynced:
+            try:
+                os.fsync(f.fileno())
+                f.close()
+                os.replace(tmp, path)
+                folders.add(os.path.dirname(os.path.abspath(path)))
+                self._done(ok=True)
+            except Exception as e:
+                self._discard(f, tmp)
+                self._done(ok=False, error=f"{path}: {e}")
+        self._unsynced = []
+        for folder in folders:
+            try:
+                fd = os.open(folder, os.O_RDONLY)
+            except OSError:
+                continue # Folders can't be opened for fsync on Windows
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def flush(self, timeout=None):
+        """Waits until every submitted image is on disk; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=10.0):
+        flushed = self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        return flushed
@@ -9,6 +9,7 @@ import random
 import speech_recognition as sr
 import pyttsx3
 import ai_explainer
+from render_utils import BlendRegion
 
 # ============================================================
 #   AI CHAKRAFLOW — FULL VERSION (MUSIC + VOICE + SUMMARY)
@@ -123,10 +124,8 @@ mp_drawing_styles = mp.solutions.drawing_styles
 
 def draw_text_with_bg(frame, text, x, y, font_scale=0.6, color=(255, 255, 255), thickness=1, bg_color=(0, 0, 0), bg_alpha=0.6):
     (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
-    overlay = frame.copy()
     # Draw background rectangle
-    cv2.rectangle(overlay, (x - 5, y - text_h - 5), (x + text_w + 5, y + 5), bg_color, -1)
-    cv2.addWeighted(overlay, bg_alpha, frame, 1 - bg_alpha, 0, frame)
+    BlendRegion(frame).rect((x - 5, y - text_h - 5), (x + text_w + 5, y + 5), bg_color).apply(bg_alpha)
     cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
 
 def get_finger_states(hand_landmarks, image_width, image_height):
@@ -394,10 +393,10 @@ def draw_universe(frame, t):
     cx = int(w * 0.15) # Moved to Left side
     cy = int(h * 0.5)
 
-    overlay = frame.copy()
-    cv2.circle(overlay, (cx, cy), 140, (40, 0, 60), -1)
-    cv2.circle(overlay, (cx, cy), 90, (80, 0, 120), -1)
-    cv2.addWeighted(overlay, 0.25, frame, 0.75, 0, frame)
+    overlay = BlendRegion(frame)
+    overlay.circle((cx, cy), 140, (40, 0, 60))
+    overlay.circle((cx, cy), 90, (80, 0, 120))
+    overlay.apply(0.25)
 
     cv2.circle(frame, (cx, cy), 26, (0, 255, 255), -1)
 
@@ -438,9 +437,7 @@ def draw_chakras(frame, center_x, top_y, bottom_y,
         aura_radius = int(radius * (1.5 + 0.3 * music_pulse))
         aura_alpha = min(0.9, 0.25 + 0.5 * energy * music_pulse)
 
-        overlay = frame.copy()
-        cv2.circle(overlay, center, aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay, aura_alpha, frame, 1 - aura_alpha, 0, frame)
+        BlendRegion(frame).circle(center, aura_radius, aura_color).apply(aura_alpha)
 
         cv2.circle(frame, center, radius, base_color, -1)
 
@@ -495,14 +492,14 @@ def generate_smart_coach_message(energies, mood_label, alignment_mode, gyan_acti
 
 
 def draw_gyan_sparkles(frame, center_x, center_y, radius):
-    overlay = frame.copy()
+    overlay = BlendRegion(frame)
     for _ in range(35):
         angle = random.uniform(0, 2 * math.pi)
         r = random.uniform(radius * 0.6, radius * 1.1)
         x = int(center_x + r * math.cos(angle))
         y = int(center_y + r * math.sin(angle))
-        cv2.circle(overlay, (x, y), random.randint(2, 4), (0, 215, 255), -1)
-    cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
+        overlay.circle((x, y), random.randint(2, 4), (0, 215, 255))
+    overlay.apply(0.8, 0.2)
 
 
 def draw_revolving_aura(frame, center_x, center_y, radius, t):
@@ -512,9 +509,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
-    cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
-    cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+    BlendRegion(frame).circle((center_x, center_y), radius, golden_color).apply(0.2)
     
     # Revolving particles
     num_particles = 8
@@ -744,14 +739,14 @@ def draw_mudra_sidebar(frame, active_mudra):
     h, w, _ = frame.shape
     sidebar_w = 280 # Widened for visuals
     # Draw sidebar background
-    overlay = frame.copy()
+    overlay = BlendRegion(frame)
     # Assuming a center for the circular effect within the sidebar area
     # For example, centered vertically and horizontally within the sidebar
     cx_sidebar = w - sidebar_w // 2
     cy_sidebar = h // 2
-    cv2.circle(overlay, (cx_sidebar, cy_sidebar), 140, (40, 0, 60), -1)
-    cv2.circle(overlay, (cx_sidebar, cy_sidebar), 90, (80, 0, 120), -1)
-    cv2.addWeighted(overlay, 0.25, frame, 0.75, 0, frame)
+    overlay.circle((cx_sidebar, cy_sidebar), 140, (40, 0, 60))
+    overlay.circle((cx_sidebar, cy_sidebar), 90, (80, 0, 120))
+    overlay.apply(0.25)
     
     # Title
     cv2.putText(frame, "Mudra Guide", (w - sidebar_w + 20, 40), 
@@ -794,8 +789,8 @@ def draw_mudra_sidebar(frame, active_mudra):
         r = random.uniform(radius * 0.6, radius * 1.1)
         x = int(center_x + r * math.cos(angle))
         y = int(center_y + r * math.sin(angle))
-        cv2.circle(overlay, (x, y), random.randint(2, 4), (0, 215, 255), -1)
-    cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
+        overlay.circle((x, y), random.randint(2, 4), (0, 215, 255))
+    overlay.apply(0.8, 0.2)
 
 
 def draw_revolving_aura(frame, center_x, center_y, radius, t):
@@ -805,9 +800,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
-    cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
-    cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+    BlendRegion(frame).circle((center_x, center_y), radius, golden_color).apply(0.2)
     
     # Revolving particles
     num_particles = 8
@@ -1041,11 +1034,9 @@ def draw_mudra_sidebar(frame, active_mudra):
     sidebar_w = 280 
     
     # Glassmorphism Background - HIGH VISIBILITY
-    overlay = frame.copy()
     # Much lighter background (Dark Grey/Blue) for contrast
-    cv2.rectangle(overlay, (w - sidebar_w, 0), (w, h), (60, 70, 80), -1)
     # High alpha (0.85) to block out background noise
-    cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
+    BlendRegion(frame).rect((w - sidebar_w, 0), (w, h), (60, 70, 80)).apply(0.85, 0.15)
     
     # Vertical Accent Line (Left Edge)
     cv2.line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (100, 255, 100), 2, cv2.LINE_AA)
@@ -1085,9 +1076,7 @@ def draw_mudra_sidebar(frame, active_mudra):
             cv2.line(frame, (w - sidebar_w, y - 25), (w - sidebar_w, y + 45), (0, 255, 0), 5, cv2.LINE_AA)
             
         # Draw Item Background
-        overlay_item = frame.copy()
-        cv2.rectangle(overlay_item, (w - sidebar_w + 2, y - 25), (w, y + 45), bg_col, -1)
-        cv2.addWeighted(overlay_item, bg_alpha, frame, 1 - bg_alpha, 0, frame)
+        BlendRegion(frame).rect((w - sidebar_w + 2, y - 25), (w, y + 45), bg_col).apply(bg_alpha)
             
         # Text
         cv2.putText(frame, f"{name}", (w - sidebar_w + 20, y), 
@@ -1181,9 +1170,7 @@ def draw_mudra_info_panel(frame, mudra_name=None):
     y = 570 
     
     # Background
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (x, y), (x + panel_w, y + panel_h), (40, 50, 60), -1)
-    cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
+    BlendRegion(frame).rect((x, y), (x + panel_w, y + panel_h), (40, 50, 60)).apply(0.9, 0.1)
     
     # Border
     cv2.rectangle(frame, (x, y), (x + panel_w, y + panel_h), (0, 255, 0), 2)
@@ -1694,9 +1681,7 @@ def main():
         elif not alignment_mode:
             aura_color = (255, 255, 255) # White default
 
-        overlay_bg = frame.copy()
-        cv2.circle(overlay_bg, (center_x, center_y_aura), aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay_bg, 0.15, frame, 0.85, 0, frame)
+        BlendRegion(frame).circle((center_x, center_y_aura), aura_radius, aura_color).apply(0.15)
         
         if is_yoga_active and not alignment_mode:
              head_y = int(nose.y * h) if 'nose' in locals() else center_y_aura - 100
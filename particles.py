@@ -0,0 +1,126 @@
+import time
+import numpy as np
+
+from render_utils import AccumLayer
+
+# ============================================================
+#   PARTICLE ENGINE
+#   Struct-of-arrays particle store (numpy) with vectorised
+#   physics, per-kind caps and a per-frame draw budget. All
+#   particles are drawn into one AccumLayer and blended once.
+# ============================================================
+
+
+class ParticleEngine:
+    """
+    Particles live in parallel numpy arrays (x, y, vx, vy, life, size, kind,
+    color); only the first `count` entries are alive. Kinds are registered
+    with add_kind(name, cap, decay, draw_fn) where
+        draw_fn(layer, x, y, vx, vy, life, size, color)
+    renders a batch of particles of that kind into the shared accumulation
+    layer: x .. size are float32 arrays and color an (n, 3) uint8 array.
+    """
+    DRAW_CHUNK = 32 # Particles per draw_fn call (the budget is checked between calls)
+
+    def __init__(self, capacity=512, budget_ms=2.0):
+        self.capacity = capacity
+        self.budget_ms = budget_ms   # Max time spent drawing per frame
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.size = np.zeros(capacity, np.float32)
+        self.kind = np.zeros(capacity, np.int8)
+        self.color = np.zeros((capacity, 3), np.uint8)
+        self.count = 0
+
+        self.kind_ids = {}
+        self.caps = []
+        self.cap_scale = 1.0         # Render quality tier scaling of every cap
+        self.decay = []
+        self.draw_fns = []
+        self.layer = AccumLayer()
+        self.last_draw_ms = 0.0
+        self.skipped = 0             # Particles not drawn last frame (budget hit)
+
+    def add_kind(self, name, cap, decay=0.05, draw_fn=None):
+        kid = len(self.caps)
+        self.kind_ids[name] = kid
+        self.caps.append(cap)
+        self.decay.append(decay)
+        self.draw_fns.append(draw_fn)
+        return kid
+
+    def count_of(self, name):
+        kid = self.kind_ids[name]
+        return int(np.count_nonzero(self.kind[:self.count] == kid))
+
+    def mask(self, name):
+        """Boolean mask over the alive particles of one kind."""
+        return self.kind[:self.count] == self.kind_ids[name]
+
+    def spawn(self, name, x, y, vx=0.0, vy=0.0, life=1.0, size=1.0, color=(255, 255, 255)):
+        """Adds one particle; returns False when capped or over the draw budget."""
+        kid = self.kind_ids[name]
+        if self.count >= self.capacity or self.last_draw_ms > self.budget_ms:
+            return False
+        if self.count_of(name) >= int(self.caps[kid] * self.cap_scale):
+            return False
+        i = self.count
+        self.x[i], self.y[i] = x, y
+        self.vx[i], self.vy[i] = vx, vy
+        self.life[i] = life
+        self.size[i] = size
+        self.kind[i] = kid
+        self.color[i] = color
+        self.count += 1
+        return True
+
+    def integrate(self):
+        """Moves every particle by its velocity and ages it by its kind's decay."""
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= np.asarray(self.decay, np.float32)[self.kind[:n]]
+
+    def compact(self):
+        """Drops dead particles (life <= 0), keeping arrays contiguous."""
+        n = self.count
+        keep = np.flatnonzero(self.life[:n] > 0)
+        m = len(keep)
+        if m == n:
+            return
+        for arr in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.kind, self.color):
+            arr[:m] = arr[keep]
+        self.count = m
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, frame):
+        """Draws all live particles into one layer, kind by kind, and blends it onto frame."""
+        start = time.perf_counter()
+        budget = self.budget_ms / 1000.0
+        layer = self.layer
+        layer.begin(frame)
+        self.skipped = 0
+        kinds = self.kind[:self.count]
+        drawn, over = 0, False
+        for kid, fn in enumerate(self.draw_fns):
+            if fn is None:
+                continue
+            idx = np.flatnonzero(kinds == kid)
+            for s in range(0, len(idx), self.DRAW_CHUNK):
+                # Stop once over budget
+                if over or (drawn and time.perf_counter() - start > budget):
+                    over = True
+                    self.skipped += len(idx) - s
+                    break
+                i = idx[s:s + self.DRAW_CHUNK]
+                fn(layer, self.x[i], self.y[i], self.vx[i], self.vy[i], self.life[i], self.size[i], self.color[i])
+                drawn += len(i)
+        layer.apply(frame)
+        self.last_draw_ms = (time.perf_counter() - start) * 1000.0
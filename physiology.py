@@ -0,0 +1,195 @@
+from hrv import SpectralHRV, StreamingHRV, WindowedStats
+from timing import FrameClock, TimedHistory
+
+# ============================================================
+#   PHYSIOLOGY ENGINE
+#   Heart-rate derived metrics for the HR panel: streaming
+#   time-domain HRV, spectral HRV (worker thread), stress /
+#   calm / focus scores and the Nadi Pariksha dosha bars.
+# ============================================================
+
+
+class PhysiologyEngine:
+    """
+    Turns the monitor's BPM and beat times into HRV, stress / calm / focus
+    scores, dosha bars and an insight line (analyze, once per frame).
+    Times are on `clock` (a FrameClock) unless analyze is given `now`.
+    """
+    def __init__(self, clock=None, history_secs=20 / 30.0, sample_hz=30.0, hrv_window_secs=60.0,
+                 spectral_secs=2.0, spectral_window_secs=300.0):
+        self.clock = clock or FrameClock()
+        # BPM stability: running (Welford) variance over the history window
+        self.history_bpm = WindowedStats(history_secs, sample_hz)
+        # RMSSD / SDNN / pNN50 from beat timestamps, updated per beat
+        self.hrv = StreamingHRV(hrv_window_secs, min_ibi=300, max_ibi=1500) # 200 - 40 BPM
+        # LF / HF and heart coherence from their own 5 min beat window,
+        # recomputed off the render thread
+        self.spectral_hrv = StreamingHRV(spectral_window_secs, min_ibi=300, max_ibi=1500)
+        self.spectral = SpectralHRV(interval=spectral_secs)
+        self.connection_id = None # Sensor connection the beat windows belong to
+        
+        # [NEW] Nadi Pariksha History
+        self.history_vata = TimedHistory(history_secs, sample_hz)
+        self.history_pitta = TimedHistory(history_secs, sample_hz)
+        self.history_kapha = TimedHistory(history_secs, sample_hz)
+        
+        # [NEW] Insight Timer
+        self.last_insight_time = 0
+        self.current_insight = "Scanning bio-rhythms..."
+        
+    def _get_tiny_graph(self, data, length=7):
+        if not data or len(data) < 2: return "       "
+        # Unicode bars:   ▂ ▃ ▄ ▅ ▆ ▇ █
+        bars = "  ▂▃▄▅▆▇█"
+        # Normalize last 'length' points
+        recent = data[-length:]
+        if not recent: return "       "
+        mn, mx = min(recent), max(recent)
+        if mx == mn: return "▃" * len(recent)
+        
+        graph = ""
+        for v in recent:
+            idx = int((v - mn) / (mx - mn + 1e-6) * (len(bars) - 1))
+            graph += bars[idx]
+        return graph.ljust(length)
+
+    def add_beats(self, beat_times):
+        """IBIs from beat event timestamps (seconds), so they don't depend on the frame rate."""
+        for t in beat_times:
+            self.hrv.add_beat(t)
+            self.spectral_hrv.add_beat(t)
+
+    def set_connection(self, connection_id):
+        """Starts fresh beat windows and spectral results for a new sensor connection."""
+        if connection_id == self.connection_id:
+            return
+        self.connection_id = connection_id
+        self.hrv.reset()
+        self.spectral_hrv.reset()
+        self.spectral.reset()
+
+    def analyze(self, bpm, beat_times=(), gaze_label="Center", now=None):
+        # beat_times: timestamps of every beat since the last call
+        # 1. Calculate IBI
+        self.add_beats(beat_times)
+        if now is None:
+            now = self.clock.now
+        # Windows are time-bounded even when no beats arrive
+        self.hrv.expire(now)
+        self.spectral_hrv.expire(now)
+        spectral = self.spectral.update(now, self.spectral_hrv)
+
+        # [FIX] Handle No Sensor Input
+        if bpm <= 0:
+            return {
+                'stress_score': 0.0,
+                'calm_score': 0.0,
+                'focus_score': 0.0,
+                'insight_text': "Waiting for Sensor...",
+                'tiny_graphs': {'vata': [], 'pitta': [], 'kapha': []}
+            }
+
+        # Update BPM history
+        if bpm > 0:
+            self.history_bpm.append(bpm, now)
+            
+        # 2. HRV (RMSSD), kept up to date per beat
+        hrv_rmssd = self.hrv.rmssd if self.hrv.count > 2 else 0.0
+            
+        # 3. Derive Metrics
+        # Stress: High BPM + Low HRV
+        # Normalize BPM (60-100) -> 0-1
+        norm_bpm = max(0, min(1, (bpm - 60) / 40)) if bpm > 0 else 0
+        # Normalize HRV (10-100) -> 0-1 (Higher is better)
+        norm_hrv = max(0, min(1, (hrv_rmssd - 10) / 90))
+        
+        stress_score = (norm_bpm * 0.7) + ((1.0 - norm_hrv) * 0.3)
+        stress_score = max(0, min(1, stress_score)) * 100
+        
+        calm_score = 100 - stress_score
+        
+        # Focus: Stability of BPM (Inverse of BPM variance)
+        bpm_var = self.history_bpm.var() if len(self.history_bpm) > 5 else 10
+        focus_score = max(0, min(100, 100 - bpm_var))
+        
+        # [FIX] Gaze Influence on Focus
+        if gaze_label == "Center":
+            focus_score = max(80.0, focus_score) # Ensure high focus
+        else:
+            focus_score = min(40.0, focus_score) # Cap low focus
+        
+        # [NEW] Calculate Doshas (Nadi Pariksha)
+        # Vata (Air): Linked to Variability/Movement -> Proportional to HRV
+        vata_score = min(100, norm_hrv * 100)
+        
+        # Pitta (Fire): Linked to Intensity/Heat -> Proportional to HR
+        pitta_score = min(100, norm_bpm * 100)
+        
+        # Kapha (Water): Linked to Stability/Calm -> Inverse of HR & HRV
+        # High Kapha = Slow, steady pulse
+        kapha_score = min(100, (1.0 - norm_bpm) * 80 + (1.0 - norm_hrv) * 20)
+        
+        if spectral is not None:
+            # Pulse rhythm from the HRV spectrum (once ~30 s of beats are in):
+            # Vata also rises with sympathetic (LF) dominance, Kapha with a
+            # steady, coherent rhythm
+            vata_score = min(100, norm_hrv * 60 + spectral['lf_nu'] * 40)
+            kapha_score = min(100, (1.0 - norm_bpm) * 70 + (1.0 - norm_hrv) * 10 + spectral['coherence'] * 20)
+        
+        # Update History
+        # Keep history short (time window, trimmed automatically)
+        self.history_vata.append(vata_score, now)
+        self.history_pitta.append(pitta_score, now)
+        self.history_kapha.append(kapha_score, now)
+        
+        # [NEW] Determine Dominant Dosha & Finding
+        doshas = {'Vata': vata_score, 'Pitta': pitta_score, 'Kapha': kapha_score}
+        dominant = max(doshas, key=doshas.get)
+        
+        finding = "Scanning..."
+        if len(self.history_bpm) > 5:
+            if dominant == 'Vata':
+                finding = "Dominant: Vata (High Movement/Anxiety)"
+            elif dominant == 'Pitta':
+                finding = "Dominant: Pitta (High Energy/Heat)"
+            elif dominant == 'Kapha':
+                finding = "Dominant: Kapha (High Stability/Lethargy)"
+                
+            # Check for Balance (if all are close)
+            avg_d = sum(doshas.values()) / 3
+            if all(abs(v - avg_d) < 15 for v in doshas.values()):
+                finding = "Finding: Tridosha Balanced (Excellent)"
+        
+        # 4. Generate Insight (Every 15 Seconds)
+        if now - self.last_insight_time > 15.0:
+            self.last_insight_time = now
+            
+            if len(self.history_bpm) > 5:
+                if calm_score > 80:
+                    self.current_insight = "Deep state of relaxation detected."
+                elif calm_score > 60:
+                    self.current_insight = "Heart rhythm is steady and calm."
+                elif stress_score > 80:
+                    self.current_insight = "High arousal. Focus on slow exhalations."
+                elif stress_score > 60:
+                    self.current_insight = "Slight tension. Soften your shoulders."
+                elif focus_score > 80:
+                    self.current_insight = "Excellent physiological coherence."
+                else:
+                    self.current_insight = "Breathing is syncing with heart rate."
+            else:
+                self.current_insight = "Scanning bio-rhythms..."
+
+        return {
+            "heart_rate": bpm,
+            "hrv_rmssd_ms": hrv_rmssd,
+            "hrv_sdnn_ms": self.hrv.sdnn,
+            "hrv_pnn50": self.hrv.pnn50,
+            "spectral": spectral, # LF / HF / coherence dict, None until enough data
+            "stress_score": stress_score,
+            "calm_score": calm_score,
+            "focus_score": focus_score,
+            "tiny_graphs": {'vata': self.history_vata.values, 'pitta': self.history_pitta.values, 'kapha': self.history_kapha.values},
+            "insight_text": self.current_insight,
+            "finding": finding # [NEW]
+        }
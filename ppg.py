@@ -0,0 +1,304 @@
+import math
+
+import numpy as np
+
+# ============================================================
+#   RAW PPG PIPELINE
+#   Host-side beat detection for the raw streaming firmware
+#   (arduino_raw_ppg): framed binary IR / red samples at
+#   100 Hz are decoded, band-passed, peak-picked and turned
+#   into beat times, HR and SpO2 (ratio of ratios), a block
+#   of samples at a time with numpy. Runs on the serial
+#   reader thread, never on the render thread.
+# ============================================================
+
+PPG_SAMPLE_HZ = 100
+PPG_BLOCK = 10 # Samples per processing block (100 ms)
+
+# Frame: A5 5A | seq u8 | ir u16le | red u16le | sum(seq..red) & 0xFF
+PPG_SYNC = b"\xa5\x5a"
+PPG_FRAME_SIZE = 8
+
+PPG_MIN_DC = 10000 # IR level below this means no finger on the sensor
+PPG_HR_RANGE = (30, 200) # BPM accepted from host-side detection (tracking limit)
+PPG_MIN_IBI = 0.27 # Refractory floor (s): ~220 BPM, room for beat-to-beat swing at 200
+PPG_SPO2_SECS = 4.0 # Ratio-of-ratios window
+CLOCK_RELAX = 0.002 # Sample clock vs host clock drift allowed (0.2%)
+
+
+def encode_frames(seq, ir, red):
+    """Frames for consecutive samples starting at sequence number seq (bytes)."""
+    n = len(ir)
+    f = np.empty((n, PPG_FRAME_SIZE), np.uint8)
+    f[:, 0], f[:, 1] = PPG_SYNC
+    f[:, 2] = (seq + np.arange(n)) & 0xFF
+    f[:, 3:5] = np.asarray(ir, "<u2").reshape(n, 1).view(np.uint8)
+    f[:, 5:7] = np.asarray(red, "<u2").reshape(n, 1).view(np.uint8)
+    f[:, 7] = f[:, 2:7].sum(axis=1, dtype=np.uint16) & 0xFF
+    return f.tobytes()
+
+
+class FrameDecoder:
+    """
+    Pulls complete, checksum-valid frames out of a byte buffer.
+    Sync search and checksums run over the whole buffer at once; bytes
+    between frames (text from the sketch, line noise) are skipped. Samples
+    lost in transit (sequence gaps) are filled by holding the previous
+    value, so the sample clock stays right; .lost counts them.
+    """
+    def __init__(self):
+        self.seq = None # Sequence number of the last decoded frame
+        self.frames = 0
+        self.lost = 0
+        self._offsets = np.arange(PPG_FRAME_SIZE)
+
+    def decode(self, buf):
+        """
+        Consumes frames from the bytearray buf (in place).
+        Returns (ir, red, gap): uint16 arrays and the number of samples lost
+        before the first one.
+        """
+        b = np.frombuffer(bytes(buf), np.uint8)
+        n = len(b) - PPG_FRAME_SIZE + 1
+        empty = np.empty(0, np.uint16)
+        if n <= 0:
+            return empty, empty, 0
+        pos = np.flatnonzero((b[:n] == PPG_SYNC[0]) & (b[1:n + 1] == PPG_SYNC[1]))
+        frames = b[pos[:, None] + self._offsets]
+        ok = (frames[:, 2:7].sum(axis=1, dtype=np.uint16) & 0xFF) == frames[:, 7]
+        pos, frames = pos[ok], frames[ok]
+        if len(pos) > 1 and (np.diff(pos) < PPG_FRAME_SIZE).any():
+            # A sync pattern inside a real frame happened to checksum: keep the first
+            keep, end = [], -1
+            for i, p in enumerate(pos):
+                if p >= end:
+                    keep.append(i)
+                    end = p + PPG_FRAME_SIZE
+            pos, frames = pos[keep], frames[keep]
+        if not len(pos):
+            del buf[:n] # Nothing decodable: keep only a possible partial frame
+            return empty, empty, 0
+        del buf[:pos[-1] + PPG_FRAME_SIZE]
+
+        seq = frames[:, 2].astype(np.int64)
+        prev = seq[0] - 1 if self.seq is None else self.seq
+        gaps = (np.diff(np.concatenate(([prev], seq))) - 1) & 0xFF
+        self.seq = int(seq[-1])
+        self.frames += len(frames)
+        self.lost += int(gaps.sum())
+        ir = frames[:, 3:5].copy().view("<u2").ravel()
+        red = frames[:, 5:7].copy().view("<u2").ravel()
+        if gaps[1:].any():
+            # Hold each sample through the gap that follows it
+            counts = np.append(gaps[1:], 0) + 1
+            ir, red = np.repeat(ir, counts), np.repeat(red, counts)
+        return ir, red, int(gaps[0])
+
+
+def bandpass_kernel(fs=PPG_SAMPLE_HZ, high_hz=4.0, baseline_secs=1.0, taps=51):
+    """
+    Linear-phase FIR band-pass: a windowed-sinc low-pass (high_hz) minus its
+    moving average over baseline_secs, which removes DC and respiration /
+    motion wander. Odd length; delay is (len - 1) / 2 samples.
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    lp = np.sinc(2.0 * high_hz / fs * n) * np.hamming(taps)
+    lp /= lp.sum()
+    m = int(round(baseline_secs * fs)) | 1
+    baseline = np.convolve(lp, np.full(m, 1.0 / m))
+    return np.pad(lp, (m - 1) // 2) - baseline
+
+
+class PPGPipeline:
+    """
+    Streaming beat detector for IR / red sample blocks.
+    process() filters each block (one np.convolve per channel over the new
+    samples plus the filter history), finds systolic peaks of the inverted
+    IR pulse among the newly filterable samples (local maxima above half the
+    recent pulse std and half the running beat amplitude, with a refractory
+    period, refined by parabolic interpolation) and estimates:
+      beats : beat times in the caller's clock (sample clock anchored to the
+              arrival times; about 0.75 s behind because of the filter delay)
+      hr    : 60 / median of the last 5 intervals (from 3 on), unclamped
+              (callers keep it within PPG_HR_RANGE)
+      spo2  : 110 - 25 R over PPG_SPO2_SECS, R = (AC/DC red) / (AC/DC ir)
+    Nothing is detected during the first warmup_secs (filter fill plus 1 s
+    to set the threshold). Rhythms are tracked up to PPG_HR_RANGE[1]
+    (200 BPM) with ordinary beat-to-beat swing; faster ones put beats
+    inside the PPG_MIN_IBI refractory period and lose them, so HR reports
+    above the range must be rejected, not trusted.
+    """
+    def __init__(self, fs=PPG_SAMPLE_HZ, min_dc=PPG_MIN_DC):
+        self.fs = fs
+        self.min_dc = min_dc
+        self.kernel = bandpass_kernel(fs)
+        self.delay = (len(self.kernel) - 1) // 2
+        self.window = int(PPG_SPO2_SECS * fs)
+        self.max_gap = fs // 2 # Longer gaps restart the filters
+        self.reset()
+
+    @property
+    def warmup_secs(self):
+        """Signal needed before the first beat can be reported."""
+        return (len(self.kernel) - 1 + self.fs) / self.fs
+
+    def reset(self):
+        self.raw = np.empty((2, 0)) # IR / red history (filter taps + SpO2 window)
+        self.filt = np.empty((2, 0)) # Band-passed history
+        self.index = 0 # Samples received (absolute index of the next one)
+        self.filt_end = 0 # Absolute index following the last filtered sample
+        self.scanned = 0 # Peaks are searched from this absolute index on
+        self.last_peak = None # Absolute (fractional) index of the last beat
+        self.ibis = []
+        self.amp = None # Running height of accepted peaks
+        self.anchor = None # Host time of sample index 0
+        self.last_t = None
+        self.spo2 = None
+
+    def process(self, ir, red, t, gap=0):
+        """
+        Feeds one block received at host time t (gap: samples lost before it).
+        Returns (beat_times, hr, spo2); hr is None without a new estimate and
+        0 (with spo2 0) when no finger is on the sensor.
+        """
+        x = np.vstack((ir, red)).astype(np.float64)
+        if gap > self.max_gap or (self.last_t is not None and t - self.last_t > 1.0):
+            self.reset()
+        elif gap and self.raw.shape[1]:
+            x = np.hstack((np.repeat(self.raw[:, -1:], gap, axis=1), x))
+        self.last_t = t
+        if not x.shape[1]:
+            return [], None, None
+        if x[0].mean() < self.min_dc:
+            self.reset()
+            self.last_t = t
+            return [], 0, 0
+
+        n = x.shape[1]
+        self.index += n
+        origin = t - self.index / self.fs
+        if self.anchor is None:
+            self.anchor = origin
+        else:
+            # Follow the lowest-latency arrivals, creeping up for clock drift
+            self.anchor = min(self.anchor + n / self.fs * CLOCK_RELAX, origin)
+
+        k = len(self.kernel)
+        buf = np.hstack((self.raw, x))
+        self.raw = buf[:, -max(k - 1, self.window):]
+        if buf.shape[1] < k:
+            return [], None, None
+        seg = buf[:, -(k - 1 + n):]
+        y = np.vstack([np.convolve(seg[c], self.kernel, "valid") for c in range(2)])
+        self.filt = np.hstack((self.filt, y))[:, -self.window:]
+        self.filt_end = self.index - self.delay
+
+        beats = self._find_beats()
+        if not beats:
+            return [], None, None
+        hr = None
+        if len(self.ibis) >= 3:
+            hr = 60.0 / float(np.median(self.ibis))
+        return beats, hr, self._spo2()
+
+    def _find_beats(self):
+        p = -self.filt[0] # Blood volume peaks are IR absorption peaks (raw dips)
+        base = self.filt_end - p.size
+        lo = max(1, self.scanned - base)
+        hi = p.size - 1 # The newest sample has no right neighbour yet
+        self.scanned = base + hi
+        if hi <= lo or p.size < self.fs: # Wait for 1 s of signal to set the threshold
+            return []
+        seg = p[lo - 1:hi + 1]
+        mid = seg[1:-1]
+        thr = 0.5 * p[-int(2.5 * self.fs):].std()
+        idx = np.flatnonzero((mid > seg[:-2]) & (mid >= seg[2:]) & (mid > thr)) + lo
+        if not len(idx):
+            return []
+        a, b, c = p[idx - 1], p[idx], p[idx + 1]
+        den = a - 2 * b + c
+        off = np.where(den < 0, 0.5 * (a - c) / np.where(den < 0, den, 1.0), 0.0)
+
+        beats = []
+        lo_ibi, hi_ibi = PPG_MIN_IBI, 60.0 / PPG_HR_RANGE[0]
+        for pos, height in zip(base + idx + off, b):
+            if self.last_peak is not None and (pos - self.last_peak) / self.fs > hi_ibi:
+                self.amp = None # No beat for too long: an artifact set the level
+            if self.amp is not None and height < 0.5 * self.amp:
+                continue # Dicrotic wave / noise: well below the beats so far
+            if self.last_peak is not None:
+                ibi = (pos - self.last_peak) / self.fs
+                refractory = max(lo_ibi, 0.5 * self.ibis[-1]) if self.ibis else lo_ibi
+                if ibi < refractory:
+                    continue # Dicrotic wave or noise right after a beat
+                if ibi < hi_ibi:
+                    self.ibis = (self.ibis + [ibi])[-5:]
+            self.last_peak = pos
+            self.amp = height if self.amp is None else self.amp + 0.3 * (height - self.amp)
+            beats.append(self.anchor + (pos + 1) / self.fs)
+        return beats
+
+    def _spo2(self):
+        if self.filt.shape[1] < self.window // 2:
+            return self.spo2
+        ac = self.filt.std(axis=1)
+        dc = self.raw[:, -self.filt.shape[1]:].mean(axis=1)
+        if ac[0] <= 0 or dc[1] <= 0:
+            return self.spo2
+        r = (ac[1] / dc[1]) / (ac[0] / dc[0])
+        spo2 = min(100.0, max(70.0, 110.0 - 25.0 * r))
+        self.spo2 = spo2 if self.spo2 is None else self.spo2 + 0.3 * (spo2 - self.spo2)
+        return self.spo2
+
+
+class SyntheticPPG:
+    """
+    Synthetic MAX30100-like IR / red samples standing in for the hardware.
+    Pulses (systolic wave plus a smaller dicrotic wave) follow hr with
+    breathing-driven interval swing (rsa_ms at breath_hz); red AC/DC is set
+    from spo2 through the same ratio-of-ratios line the pipeline inverts.
+    Baseline wander and sensor noise are added; contact=False gives the
+    no-finger level. All parameters can be changed between blocks.
+    """
+    def __init__(self, fs=PPG_SAMPLE_HZ, hr=70.0, rsa_ms=40.0, breath_hz=0.1, spo2=98.0,
+                 perfusion=0.01, noise=0.0005, seed=None):
+        self.fs = fs
+        self.hr = hr
+        self.rsa_ms = rsa_ms
+        self.breath_hz = breath_hz
+        self.spo2 = spo2
+        self.perfusion = perfusion # IR AC / DC
+        self.noise = noise # Noise std / DC
+        self.contact = True
+        self.dc = (50000.0, 40000.0)
+        self.rng = np.random.default_rng(seed)
+        self.t = 0.0
+        self.phase = 0.0 # Cardiac cycles since start
+
+    def generate(self, n):
+        """Next n samples: (ir uint16, red uint16, systolic peak times in seconds)."""
+        t = self.t + np.arange(1, n + 1) / self.fs
+        ibi = 60.0 / self.hr
+        if self.breath_hz > 0:
+            ibi = ibi + self.rsa_ms / 1000.0 * np.sin(2 * math.pi * self.breath_hz * t)
+        phase = self.phase + np.cumsum(np.broadcast_to(1.0 / (ibi * self.fs), (n,)))
+        peak_at = 0.15 # Systole, as a fraction of the cycle
+        crossed = np.flatnonzero(np.diff(np.floor(np.concatenate(([self.phase], phase)) - peak_at)))
+        prev = np.concatenate(([self.phase], phase))[crossed]
+        frac = (np.ceil(prev - peak_at) + peak_at - prev) / (phase[crossed] - prev)
+        beats = (self.t + (crossed + frac) / self.fs).tolist()
+        self.t, self.phase = float(t[-1]), float(phase[-1])
+
+        f = phase % 1.0
+        pulse = np.exp(-((f - peak_at) / 0.07) ** 2) + 0.35 * np.exp(-((f - 0.45) / 0.08) ** 2)
+        wander = 0.004 * np.sin(2 * math.pi * max(self.breath_hz, 0.1) * t)
+        r = (110.0 - self.spo2) / 25.0
+        out = []
+        for dc, ac in zip(self.dc, (self.perfusion, self.perfusion * r)):
+            if not self.contact:
+                dc, ac = 2000.0, 0.0
+            x = dc * (1.0 + wander - ac * pulse + self.noise * self.rng.standard_normal(n))
+            out.append(np.clip(x, 0, 65535).astype(np.uint16))
+        if not self.contact:
+            beats = []
+        return out[0], out[1], beats
@@ -0,0 +1,117 @@
+import time
+
+from timing import Debouncer
+
+# ============================================================
+#   RENDER QUALITY TIERS
+#   Low / medium / high visual tiers and a governor that steps
+#   between them from measured frame times, with hysteresis,
+#   plus a manual override (cycled from a key in the app).
+# ============================================================
+
+QUALITY_LOW = 0
+QUALITY_MEDIUM = 1
+QUALITY_HIGH = 2
+QUALITY_NAMES = ("Low", "Medium", "High")
+
+# What each tier draws. Low drops the glow passes, aura overlays, the level
+# bar halo, flag waving and particle effects; medium keeps them all but
+# halves particle caps and graph resolution.
+QUALITY_SETTINGS = {
+    QUALITY_LOW: {
+        "glow": False, "aura": False, "halo": False, "flag_wave": False,
+        "particles": False, "particle_scale": 0.0, "graph_resolution": 0.5,
+    },
+    QUALITY_MEDIUM: {
+        "glow": True, "aura": True, "halo": True, "flag_wave": True,
+        "particles": True, "particle_scale": 0.5, "graph_resolution": 0.5,
+    },
+    QUALITY_HIGH: {
+        "glow": True, "aura": True, "halo": True, "flag_wave": True,
+        "particles": True, "particle_scale": 1.0, "graph_resolution": 1.0,
+    },
+}
+
+
+class QualityGovernor:
+    """
+    Chooses the render tier from per-frame work time (seconds spent on a
+    frame, excluding the wait for the camera / display).
+    The smoothed frame time must stay over budget for down_secs before
+    stepping down, and under budget * up_ratio for up_secs before stepping
+    back up, so the tier doesn't flicker around the threshold. After any
+    change both conditions restart, giving the new tier time to settle.
+    cycle_override() steps Auto -> Low -> Medium -> High -> Auto.
+    """
+    def __init__(self, target_fps=24.0, start=QUALITY_HIGH, down_secs=1.0, up_secs=5.0,
+                 up_ratio=0.7, smoothing=0.9):
+        self.budget = 1.0 / target_fps
+        self.up_ratio = up_ratio
+        self.smoothing = smoothing
+        self.auto_level = start
+        self.override = None # None = automatic
+        self.avg_frame_time = 0.0
+        self.changes = 0
+        self._slow = Debouncer(on_secs=down_secs)
+        self._fast = Debouncer(on_secs=up_secs)
+
+    @property
+    def level(self):
+        return self.auto_level if self.override is None else self.override
+
+    @property
+    def settings(self):
+        return QUALITY_SETTINGS[self.level]
+
+    # Tier flags
+    @property
+    def glow(self): return self.settings["glow"]
+    @property
+    def aura(self): return self.settings["aura"]
+    @property
+    def halo(self): return self.settings["halo"]
+    @property
+    def flag_wave(self): return self.settings["flag_wave"]
+    @property
+    def particles(self): return self.settings["particles"]
+    @property
+    def particle_scale(self): return self.settings["particle_scale"]
+    @property
+    def graph_resolution(self): return self.settings["graph_resolution"]
+
+    def update(self, frame_time, now=None):
+        """Feeds one frame's work time; returns the tier to render with."""
+        if now is None:
+            now = time.monotonic()
+        if self.avg_frame_time == 0.0:
+            self.avg_frame_time = frame_time
+        else:
+            a = self.smoothing
+            self.avg_frame_time = a * self.avg_frame_time + (1 - a) * frame_time
+
+        slow = self._slow.update(self.avg_frame_time > self.budget, now)
+        fast = self._fast.update(self.avg_frame_time < self.budget * self.up_ratio, now)
+        if slow and self.auto_level > QUALITY_LOW:
+            self._step(-1)
+        elif fast and self.auto_level < QUALITY_HIGH:
+            self._step(1)
+        return self.level
+
+    def _step(self, delta):
+        self.auto_level += delta
+        self.changes += 1
+        self._slow.reset()
+        self._fast.reset()
+
+    def cycle_override(self):
+        if self.override is None:
+            self.override = QUALITY_LOW
+        elif self.override < QUALITY_HIGH:
+            self.override += 1
+        else:
+            self.override = None
+        return self.override
+
+    def label(self):
+        mode = "auto" if self.override is None else "manual"
+        return f"{QUALITY_NAMES[self.level]} ({mode})"
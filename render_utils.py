@@ -0,0 +1,822 @@
+import cv2
+import math
+import os
+from collections import OrderedDict
+import numpy as np
+
+# ============================================================
+#   RENDER HELPERS
+#   Premultiplied BGRA sprites and a cached HUD compositor.
+#   Static HUD chrome is rasterised once per resolution and
+#   blitted over its bounding box instead of being redrawn
+#   with full-frame copy + addWeighted passes every frame.
+# ============================================================
+
+
+class PremultSprite:
+    """
+    Premultiplied BGRA image ready for fast blitting.
+    color     : (h, w, 3) uint8, BGR already multiplied by alpha
+    inv_alpha : (h, w, 3) uint8, 255 - alpha (replicated per channel)
+    x, y      : top-left position of the sprite on the target frame
+    """
+    def __init__(self, color, inv_alpha, x=0, y=0):
+        self.color = color
+        self.inv_alpha = inv_alpha
+        self.x = x
+        self.y = y
+
+    @property
+    def shape(self):
+        return self.color.shape[:2]
+
+    @classmethod
+    def from_bgra(cls, bgra, x=0, y=0, crop=True):
+        """Builds a sprite from a straight (non-premultiplied) uint8 BGRA image."""
+        alpha = bgra[:, :, 3]
+        if crop:
+            bx, by, bw, bh = cv2.boundingRect(alpha)
+            if bw == 0 or bh == 0:
+                return None
+            bgra = bgra[by:by + bh, bx:bx + bw]
+            alpha = bgra[:, :, 3]
+            x, y = x + bx, y + by
+        a3 = cv2.merge([alpha, alpha, alpha])
+        color = cv2.multiply(bgra[:, :, :3], a3, scale=1.0 / 255)
+        return cls(np.ascontiguousarray(color), 255 - a3, x, y)
+
+    @classmethod
+    def from_float(cls, color_premult, alpha, x=0, y=0, crop=True):
+        """Builds a sprite from float32 premultiplied color (0-255) and alpha (0-1)."""
+        alpha8 = np.clip(alpha * 255.0 + 0.5, 0, 255).astype(np.uint8)
+        color8 = np.clip(color_premult + 0.5, 0, 255).astype(np.uint8)
+        if crop:
+            bx, by, bw, bh = cv2.boundingRect(alpha8)
+            if bw == 0 or bh == 0:
+                return None
+            alpha8 = alpha8[by:by + bh, bx:bx + bw]
+            color8 = color8[by:by + bh, bx:bx + bw]
+            x, y = x + bx, y + by
+        inv = 255 - cv2.merge([alpha8, alpha8, alpha8])
+        return cls(np.ascontiguousarray(color8), inv, x, y)
+
+
+def blit_premultiplied(frame, sprite, x=None, y=None, alpha=1.0):
+    """
+    Composites a PremultSprite onto frame in place: dst = color + dst * (1 - a).
+    Only the sprite's bounding box is touched, with uint8 saturating math.
+    alpha < 1 fades the whole sprite (color and coverage scaled together).
+    """
+    if sprite is None:
+        return
+    if x is None: x = sprite.x
+    if y is None: y = sprite.y
+    fh, fw = frame.shape[:2]
+    sh, sw = sprite.shape
+
+    # Clip to frame
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(fw, x + sw), min(fh, y + sh)
+    if x2 <= x1 or y2 <= y1:
+        return
+    sx1, sy1 = x1 - x, y1 - y
+    sx2, sy2 = sx1 + (x2 - x1), sy1 + (y2 - y1)
+
+    if alpha <= 0.0:
+        return
+    roi = frame[y1:y2, x1:x2]
+    color = sprite.color[sy1:sy2, sx1:sx2]
+    inv = sprite.inv_alpha[sy1:sy2, sx1:sx2]
+    if alpha < 1.0:
+        color = cv2.convertScaleAbs(color, alpha=alpha)
+        inv = 255 - cv2.convertScaleAbs(255 - inv, alpha=alpha)
+    scaled = cv2.multiply(roi, inv, scale=1.0 / 255)
+    cv2.add(scaled, color, dst=roi)
+
+
+def premultiply_bgra(img):
+    """Returns a premultiplied uint8 BGRA copy of a BGR / BGRA image (BGR -> opaque)."""
+    if img.ndim == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+    elif img.shape[2] == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+    alpha = img[:, :, 3]
+    a4 = cv2.merge([alpha, alpha, alpha, np.full_like(alpha, 255)])
+    return cv2.multiply(img, a4, scale=1.0 / 255)
+
+
+class SpriteCache:
+    """
+    Image assets stored premultiplied and pre-scaled per requested size.
+    Resizing happens once per (name, w, h) on the premultiplied data (so edges
+    don't pick up dark fringes); drawing is a single integer ROI blend.
+    """
+    def __init__(self):
+        self.sources = {}
+        self.cache = {}
+
+    def load(self, name, path):
+        """Loads an image file as a sprite source. Returns False if missing."""
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED) if os.path.exists(path) else None
+        if img is None:
+            return False
+        self.add(name, img)
+        return True
+
+    def add(self, name, img):
+        self.sources[name] = premultiply_bgra(img)
+        for key in [k for k in self.cache if k[0] == name]:
+            del self.cache[key]
+
+    def has(self, name):
+        return name in self.sources
+
+    def get(self, name, w, h=None):
+        if h is None:
+            h = w
+        key = (name, int(w), int(h))
+        sprite = self.cache.get(key)
+        if sprite is None:
+            src = self.sources[name]
+            sh, sw = src.shape[:2]
+            interp = cv2.INTER_AREA if (w < sw or h < sh) else cv2.INTER_LINEAR
+            scaled = cv2.resize(src, (key[1], key[2]), interpolation=interp)
+            alpha = scaled[:, :, 3]
+            inv = 255 - cv2.merge([alpha, alpha, alpha])
+            sprite = PremultSprite(np.ascontiguousarray(scaled[:, :, :3]), inv)
+            self.cache[key] = sprite
+        return sprite
+
+    def draw(self, frame, name, cx, cy, w, h=None, alpha=1.0):
+        """Draws the sprite centred on (cx, cy), clipped to the frame."""
+        if name not in self.sources:
+            return
+        sprite = self.get(name, w, h)
+        sh, sw = sprite.shape
+        blit_premultiplied(frame, sprite, int(cx) - sw // 2, int(cy) - sh // 2, alpha)
+
+
+class Layer:
+    """
+    Float32 premultiplied canvas used only while building cached layers.
+    Every paint call composites a shape "over" what is already there, so
+    several translucent passes collapse into one stored image.
+    """
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+        self.color = np.zeros((h, w, 3), np.float32)
+        self.alpha = np.zeros((h, w), np.float32)
+        self._mask = np.zeros((h, w), np.uint8)
+
+    def paint(self, draw_fn, color, alpha=1.0):
+        """draw_fn(mask) must draw the shape on the uint8 mask with value 255."""
+        mask = self._mask
+        mask[:] = 0
+        draw_fn(mask)
+        x, y, bw, bh = cv2.boundingRect(mask)
+        if bw == 0 or bh == 0:
+            return
+        sl = (slice(y, y + bh), slice(x, x + bw))
+        a = mask[sl].astype(np.float32) * (alpha / 255.0)
+        inv = 1.0 - a
+        col = np.array(color, np.float32)
+        self.color[sl] = self.color[sl] * inv[:, :, None] + a[:, :, None] * col
+        self.alpha[sl] = self.alpha[sl] * inv + a
+
+    # Convenience wrappers mirroring the cv2 drawing calls
+    def rect(self, p1, p2, color, thickness=-1, alpha=1.0):
+        self.paint(lambda m: cv2.rectangle(m, p1, p2, 255, thickness), color, alpha)
+
+    def line(self, p1, p2, color, thickness=1, alpha=1.0, line_type=cv2.LINE_8):
+        self.paint(lambda m: cv2.line(m, p1, p2, 255, thickness, line_type), color, alpha)
+
+    def circle(self, center, radius, color, thickness=-1, alpha=1.0, line_type=cv2.LINE_8):
+        self.paint(lambda m: cv2.circle(m, center, radius, 255, thickness, line_type), color, alpha)
+
+    def arrow(self, p1, p2, color, thickness=1, tip_length=0.1, alpha=1.0):
+        self.paint(lambda m: cv2.arrowedLine(m, p1, p2, 255, thickness, tipLength=tip_length), color, alpha)
+
+    def text(self, text, org, font, scale, color, thickness=1, alpha=1.0, line_type=cv2.LINE_AA):
+        self.paint(lambda m: cv2.putText(m, text, org, font, scale, 255, thickness, line_type), color, alpha)
+
+    def to_sprite(self):
+        return PremultSprite.from_float(self.color, self.alpha)
+
+
+class HudCompositor:
+    """
+    Caches static HUD layers per resolution.
+    add_static(name, builder) registers builder(layer, w, h) which paints the
+    chrome once; compose(frame, names) blits the cached sprites (one ROI blend
+    per layer) in registration order.
+    """
+    def __init__(self):
+        self.builders = {}
+        self.order = []
+        self.cache = {}
+        self.size = None
+
+    def add_static(self, name, builder):
+        if name not in self.builders:
+            self.order.append(name)
+        self.builders[name] = builder
+        self.cache.pop(name, None)
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(name, None)
+
+    def get(self, name, w, h):
+        if self.size != (w, h):
+            # Resolution changed -> rebuild everything lazily
+            self.cache.clear()
+            self.size = (w, h)
+        if name not in self.cache:
+            layer = Layer(w, h)
+            self.builders[name](layer, w, h)
+            self.cache[name] = layer.to_sprite()
+        return self.cache[name]
+
+    def compose(self, frame, names=None):
+        h, w = frame.shape[:2]
+        for name in self.order:
+            if names is not None and name not in names:
+                continue
+            blit_premultiplied(frame, self.get(name, w, h))
+
+
+class BlendRegion:
+    """
+    ROI-restricted replacement for the `overlay = frame.copy(); draw(overlay);
+    cv2.addWeighted(overlay, a, frame, 1 - a, 0, frame)` pattern.
+    Shapes are recorded in frame coordinates; apply(alpha) copies and blends
+    only their (clipped) bounding box instead of the whole frame.
+    """
+    def __init__(self, frame):
+        self.frame = frame
+        self.ops = []
+        self.x1 = self.y1 = None
+        self.x2 = self.y2 = None
+
+    def _grow(self, x1, y1, x2, y2, pad=0):
+        x1, y1 = int(math.floor(x1)) - pad - 1, int(math.floor(y1)) - pad - 1
+        x2, y2 = int(math.ceil(x2)) + pad + 2, int(math.ceil(y2)) + pad + 2
+        if self.x1 is None:
+            self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+        else:
+            self.x1, self.y1 = min(self.x1, x1), min(self.y1, y1)
+            self.x2, self.y2 = max(self.x2, x2), max(self.y2, y2)
+
+    @staticmethod
+    def _pad(thickness):
+        return max(1, thickness) if thickness > 0 else 0
+
+    def rect(self, p1, p2, color, thickness=-1, line_type=cv2.LINE_8):
+        self._grow(min(p1[0], p2[0]), min(p1[1], p2[1]), max(p1[0], p2[0]), max(p1[1], p2[1]), self._pad(thickness))
+        self.ops.append(("rect", p1, p2, color, thickness, line_type))
+        return self
+
+    def line(self, p1, p2, color, thickness=1, line_type=cv2.LINE_8):
+        self._grow(min(p1[0], p2[0]), min(p1[1], p2[1]), max(p1[0], p2[0]), max(p1[1], p2[1]), self._pad(thickness))
+        self.ops.append(("line", p1, p2, color, thickness, line_type))
+        return self
+
+    def circle(self, center, radius, color, thickness=-1, line_type=cv2.LINE_8):
+        cx, cy = center
+        self._grow(cx - radius, cy - radius, cx + radius, cy + radius, self._pad(thickness))
+        self.ops.append(("circle", center, radius, color, thickness, line_type))
+        return self
+
+    def ellipse(self, center, axes, angle, start, end, color, thickness=-1, line_type=cv2.LINE_8):
+        cx, cy = center
+        r = max(axes)
+        self._grow(cx - r, cy - r, cx + r, cy + r, self._pad(thickness))
+        self.ops.append(("ellipse", center, axes, angle, start, end, color, thickness, line_type))
+        return self
+
+    def fill_poly(self, polys, color, line_type=cv2.LINE_8):
+        polys = [np.asarray(p, np.int32).reshape(-1, 2) for p in polys]
+        for p in polys:
+            if len(p):
+                self._grow(p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max())
+        self.ops.append(("fill_poly", polys, color, line_type))
+        return self
+
+    def polylines(self, polys, closed, color, thickness=1, line_type=cv2.LINE_8):
+        polys = [np.asarray(p, np.int32).reshape(-1, 2) for p in polys]
+        for p in polys:
+            if len(p):
+                self._grow(p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max(), self._pad(thickness))
+        self.ops.append(("polylines", polys, closed, color, thickness, line_type))
+        return self
+
+    def text(self, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_8):
+        (tw, th), base = cv2.getTextSize(text, font, scale, thickness)
+        x, y = org
+        self._grow(x, y - th, x + tw, y + base, self._pad(thickness))
+        self.ops.append(("text", text, org, font, scale, color, thickness, line_type))
+        return self
+
+    def custom(self, draw_fn, x1, y1, x2, y2):
+        """draw_fn(img, ox, oy) draws with every coordinate shifted by (-ox, -oy)."""
+        self._grow(x1, y1, x2, y2)
+        self.ops.append(("custom", draw_fn))
+        return self
+
+    def fill(self, color):
+        """Covers the whole frame (full-screen flashes)."""
+        h, w = self.frame.shape[:2]
+        return self.rect((0, 0), (w, h), color)
+
+    def _draw(self, img, ox, oy):
+        def sh(p):
+            return (int(p[0]) - ox, int(p[1]) - oy)
+        off = np.array([ox, oy], np.int32)
+        for op in self.ops:
+            kind = op[0]
+            if kind == "rect":
+                _, p1, p2, color, t, lt = op
+                cv2.rectangle(img, sh(p1), sh(p2), color, t, lt)
+            elif kind == "line":
+                _, p1, p2, color, t, lt = op
+                cv2.line(img, sh(p1), sh(p2), color, t, lt)
+            elif kind == "circle":
+                _, c, r, color, t, lt = op
+                cv2.circle(img, sh(c), int(r), color, t, lt)
+            elif kind == "ellipse":
+                _, c, axes, angle, a0, a1, color, t, lt = op
+                cv2.ellipse(img, sh(c), axes, angle, a0, a1, color, t, lt)
+            elif kind == "fill_poly":
+                _, polys, color, lt = op
+                cv2.fillPoly(img, [p - off for p in polys], color, lt)
+            elif kind == "polylines":
+                _, polys, closed, color, t, lt = op
+                cv2.polylines(img, [p - off for p in polys], closed, color, t, lt)
+            elif kind == "text":
+                _, text, org, font, scale, color, t, lt = op
+                cv2.putText(img, text, sh(org), font, scale, color, t, lt)
+            elif kind == "custom":
+                op[1](img, ox, oy)
+
+    def apply(self, alpha, beta=None):
+        """Blends the recorded shapes onto the frame: roi = overlay*alpha + roi*beta."""
+        if self.x1 is None:
+            return
+        if beta is None:
+            beta = 1.0 - alpha
+        fh, fw = self.frame.shape[:2]
+        x1, y1 = max(0, self.x1), max(0, self.y1)
+        x2, y2 = min(fw, self.x2), min(fh, self.y2)
+        if x2 <= x1 or y2 <= y1:
+            return
+        roi = self.frame[y1:y2, x1:x2]
+        overlay = roi.copy()
+        self._draw(overlay, x1, y1)
+        cv2.addWeighted(overlay, alpha, roi, beta, 0, roi)
+
+
+class AccumLayer:
+    """
+    Frame-sized straight-alpha accumulation layer.
+    Many small translucent shapes (particles) are drawn into one color buffer
+    plus a per-pixel alpha buffer, then blended onto the frame in a single
+    pass. Touched areas are tracked on a coarse tile grid so scattered
+    particles don't turn into one frame-sized blend.
+    """
+    TILE = 32
+
+    def __init__(self):
+        self.color = None
+        self.alpha = None
+        self.tiles = None
+
+    def begin(self, frame):
+        h, w = frame.shape[:2]
+        if self.color is None or self.color.shape[:2] != (h, w):
+            self.color = np.zeros((h, w, 3), np.uint8)
+            self.alpha = np.zeros((h, w), np.uint8)
+            t = self.TILE
+            self.tiles = np.zeros(((h + t - 1) // t, (w + t - 1) // t), bool)
+        self.tiles[:] = False
+
+    def _grow(self, x1, y1, x2, y2):
+        t = self.TILE
+        gh, gw = self.tiles.shape
+        tx1, ty1 = max(0, (int(x1) - 2) // t), max(0, (int(y1) - 2) // t)
+        tx2, ty2 = min(gw - 1, (int(x2) + 3) // t), min(gh - 1, (int(y2) + 3) // t)
+        if tx2 >= tx1 and ty2 >= ty1:
+            self.tiles[ty1:ty2 + 1, tx1:tx2 + 1] = True
+
+    def _grow_many(self, x1, y1, x2, y2):
+        """_grow for int arrays of boxes: tile ranges painted with a 2D difference grid."""
+        t = self.TILE
+        gh, gw = self.tiles.shape
+        tx1, ty1 = np.maximum(0, (x1 - 2) // t), np.maximum(0, (y1 - 2) // t)
+        tx2, ty2 = np.minimum(gw - 1, (x2 + 3) // t), np.minimum(gh - 1, (y2 + 3) // t)
+        ok = (tx2 >= tx1) & (ty2 >= ty1)
+        if not ok.any():
+            return
+        tx1, ty1, tx2, ty2 = tx1[ok], ty1[ok], tx2[ok] + 1, ty2[ok] + 1
+        d = np.zeros((gh + 1, gw + 1), np.int32)
+        np.add.at(d, (ty1, tx1), 1)
+        np.add.at(d, (ty1, tx2), -1)
+        np.add.at(d, (ty2, tx1), -1)
+        np.add.at(d, (ty2, tx2), 1)
+        self.tiles |= d.cumsum(axis=0).cumsum(axis=1)[:gh, :gw] > 0
+
+    @staticmethod
+    def _a8(alpha):
+        return int(max(0.0, min(1.0, alpha)) * 255 + 0.5)
+
+    def circle(self, center, radius, color, alpha, thickness=-1, line_type=cv2.LINE_8):
+        if radius < 0:
+            return
+        cx, cy = int(center[0]), int(center[1])
+        pad = radius + max(0, thickness)
+        self._grow(cx - pad, cy - pad, cx + pad, cy + pad)
+        cv2.circle(self.color, (cx, cy), int(radius), color, thickness, line_type)
+        cv2.circle(self.alpha, (cx, cy), int(radius), self._a8(alpha), thickness, line_type)
+
+    def ellipse(self, center, axes, angle, start, end, color, alpha, thickness=-1, line_type=cv2.LINE_8):
+        cx, cy = int(center[0]), int(center[1])
+        pad = max(axes) + max(0, thickness)
+        self._grow(cx - pad, cy - pad, cx + pad, cy + pad)
+        cv2.ellipse(self.color, (cx, cy), axes, angle, start, end, color, thickness, line_type)
+        cv2.ellipse(self.alpha, (cx, cy), axes, angle, start, end, self._a8(alpha), thickness, line_type)
+
+    def circles(self, x, y, radius, colors, alpha, thickness=-1, line_type=cv2.LINE_8):
+        """
+        Many circles sharing one alpha: x / y / radius are int arrays, colors an
+        (n, 3) array. Tiles are marked in one vectorised pass and the shapes
+        drawn from plain lists, without per-circle conversions.
+        """
+        keep = radius >= 0
+        x, y, radius, colors = x[keep], y[keep], radius[keep], colors[keep]
+        if not len(x):
+            return
+        pad = radius + max(0, thickness)
+        self._grow_many(x - pad, y - pad, x + pad, y + pad)
+        a = self._a8(alpha)
+        color_img, alpha_img = self.color, self.alpha
+        for cx, cy, r, col in zip(x.tolist(), y.tolist(), radius.tolist(), colors.tolist()):
+            cv2.circle(color_img, (cx, cy), r, col, thickness, line_type)
+            cv2.circle(alpha_img, (cx, cy), r, a, thickness, line_type)
+
+    def ellipses(self, x, y, axes_x, axes_y, angle, colors, alpha, thickness=-1, line_type=cv2.LINE_8):
+        """Full ellipses sharing one angle and alpha; arrays as in circles()."""
+        keep = (axes_x >= 0) & (axes_y >= 0)
+        x, y, axes_x, axes_y, colors = x[keep], y[keep], axes_x[keep], axes_y[keep], colors[keep]
+        if not len(x):
+            return
+        pad = np.maximum(axes_x, axes_y) + max(0, thickness)
+        self._grow_many(x - pad, y - pad, x + pad, y + pad)
+        a = self._a8(alpha)
+        color_img, alpha_img = self.color, self.alpha
+        for cx, cy, ax, ay, col in zip(x.tolist(), y.tolist(), axes_x.tolist(), axes_y.tolist(), colors.tolist()):
+            cv2.ellipse(color_img, (cx, cy), (ax, ay), angle, 0, 360, col, thickness, line_type)
+            cv2.ellipse(alpha_img, (cx, cy), (ax, ay), angle, 0, 360, a, thickness, line_type)
+
+    def custom(self, draw_fn, alpha, x1, y1, x2, y2):
+        """draw_fn(color_img, alpha_img, alpha_value) draws in frame coordinates."""
+        self._grow(x1, y1, x2, y2)
+        draw_fn(self.color, self.alpha, self._a8(alpha))
+
+    def _blend(self, frame, x1, y1, x2, y2):
+        roi = frame[y1:y2, x1:x2]
+        a = self.alpha[y1:y2, x1:x2]
+        a3 = cv2.merge([a, a, a])
+        src = cv2.multiply(self.color[y1:y2, x1:x2], a3, scale=1.0 / 255)
+        dst = cv2.multiply(roi, 255 - a3, scale=1.0 / 255)
+        cv2.add(src, dst, dst=roi)
+        self.color[y1:y2, x1:x2] = 0
+        self.alpha[y1:y2, x1:x2] = 0
+
+    def apply(self, frame):
+        """Blends everything drawn since begin() and clears the used area."""
+        if self.tiles is None or not self.tiles.any():
+            return
+        t = self.TILE
+        fh, fw = frame.shape[:2]
+        # One blend per horizontal run of dirty tiles
+        for ty in np.flatnonzero(self.tiles.any(axis=1)):
+            row = np.concatenate(([False], self.tiles[ty], [False]))
+            edges = np.flatnonzero(row[1:] != row[:-1])
+            for start, end in zip(edges[::2], edges[1::2]):
+                self._blend(frame, start * t, ty * t, min(fw, end * t), min(fh, (ty + 1) * t))
+        self.tiles[:] = False
+
+
+class GradientCache:
+    """
+    Linear gradient strips built once with numpy and pasted with a slice
+    assignment. Keyed by (start, end, length, thickness, vertical); entry i of
+    a strip of `length` has color start + (end - start) * i / length.
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+
+    def get(self, start, end, length, thickness, vertical=False):
+        key = (tuple(start), tuple(end), int(length), int(thickness), bool(vertical))
+        strip = self.cache.get(key)
+        if strip is not None:
+            self.cache.move_to_end(key)
+            return strip
+        n = max(0, int(length))
+        ratio = np.arange(n, dtype=np.float64) / max(1, n)
+        s = np.asarray(start, np.float64)
+        e = np.asarray(end, np.float64)
+        colors = (s[None, :] + (e - s)[None, :] * ratio[:, None]).astype(np.uint8)
+        if vertical:
+            strip = np.ascontiguousarray(np.repeat(colors[:, None, :], thickness, axis=1))
+        else:
+            strip = np.ascontiguousarray(np.repeat(colors[None, :, :], thickness, axis=0))
+        self.cache[key] = strip
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return strip
+
+    def fill(self, frame, x, y, start, end, length, thickness, vertical=False):
+        """Pastes the strip with its top-left at (x, y), clipped to the frame."""
+        if length <= 0 or thickness <= 0:
+            return
+        strip = self.get(start, end, length, thickness, vertical)
+        sh, sw = strip.shape[:2]
+        fh, fw = frame.shape[:2]
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(fw, x + sw), min(fh, y + sh)
+        if x2 <= x1 or y2 <= y1:
+            return
+        frame[y1:y2, x1:x2] = strip[y1 - y:y2 - y, x1 - x:x2 - x]
+
+
+class TextCache:
+    """
+    Rasterized text labels, keyed by (text, font, scale, strokes, line_type)
+    where strokes is a sequence of (color, thickness) drawn bottom to top
+    (e.g. black shadow, white outline, colored core). Each label is stored
+    once as a premultiplied sprite with its metrics and blitted afterwards;
+    least recently used labels are evicted past max_entries.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.sizes = OrderedDict()
+
+    def size(self, text, font, scale, thickness):
+        """Cached cv2.getTextSize: ((w, h), baseline)."""
+        key = (text, font, float(scale), int(thickness))
+        metrics = self.sizes.get(key)
+        if metrics is not None:
+            self.sizes.move_to_end(key)
+            return metrics
+        metrics = cv2.getTextSize(text, font, scale, thickness)
+        self.sizes[key] = metrics
+        if len(self.sizes) > self.max_entries:
+            self.sizes.popitem(last=False)
+        return metrics
+
+    def get(self, text, font, scale, strokes, line_type=cv2.LINE_8):
+        """Returns the label sprite; its x, y are offsets from the text origin."""
+        strokes = tuple((tuple(color), int(thick)) for color, thick in strokes)
+        key = (text, font, float(scale), strokes, line_type)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        thick = max(t for _, t in strokes)
+        (tw, th), baseline = self.size(text, font, scale, thick)
+        pad = thick + 2
+        layer = Layer(tw + 2 * pad, th + baseline + 2 * pad)
+        org = (pad, pad + th)
+        for color, t in strokes:
+            layer.text(text, org, font, scale, color, t, line_type=line_type)
+        sprite = layer.to_sprite()
+        if sprite is not None: # None for blank labels (e.g. only spaces)
+            sprite.x -= org[0]
+            sprite.y -= org[1]
+        self.cache[key] = sprite
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return sprite
+
+    def draw(self, frame, text, org, font, scale, strokes, line_type=cv2.LINE_8, alpha=1.0):
+        """Same placement as cv2.putText(frame, text, org, ...) for each stroke."""
+        if not text:
+            return
+        sprite = self.get(text, font, scale, strokes, line_type)
+        if sprite is None:
+            return
+        blit_premultiplied(frame, sprite, org[0] + sprite.x, org[1] + sprite.y, alpha)
+
+
+class PanelCache:
+    """
+    Last rendered image of a screen region whose content depends only on a
+    few inputs. draw(frame, key, render_fn) re-renders only when key (a tuple
+    of those inputs, e.g. the displayed integers or an animation tick)
+    changes and otherwise blits the cached premultiplied image.
+
+    render_fn(img) draws in frame coordinates with ordinary cv2 / BlendRegion
+    calls. It is run once over black and once over white scratch frames:
+    over black the result is the premultiplied color, and white minus black
+    is 255 * (1 - alpha), so translucent blends are captured exactly.
+    """
+    _scratch = {} # frame shape -> (black, white), shared by all panels
+
+    def __init__(self, x1, y1, x2, y2):
+        self.rect = (x1, y1, x2, y2)
+        self.key = None
+        self.shape = None
+        self.sprite = None
+        self.renders = 0
+
+    def invalidate(self):
+        self.key = None
+
+    def _render(self, shape, render_fn):
+        scratch = PanelCache._scratch.get(shape)
+        if scratch is None:
+            scratch = (np.zeros(shape, np.uint8), np.zeros(shape, np.uint8))
+            PanelCache._scratch[shape] = scratch
+        black, white = scratch
+        fh, fw = shape[:2]
+        x1, y1, x2, y2 = self.rect
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(fw, x2), min(fh, y2)
+        if x2 <= x1 or y2 <= y1:
+            self.sprite = None
+            return
+        sl = (slice(y1, y2), slice(x1, x2))
+        black[sl] = 0
+        white[sl] = 255
+        render_fn(black)
+        render_fn(white)
+        color = black[sl].copy()
+        inv = cv2.subtract(white[sl], black[sl])
+        self.sprite = PremultSprite(color, inv, x1, y1)
+        self.renders += 1
+
+    def draw(self, frame, key, render_fn):
+        shape = frame.shape
+        if key != self.key or shape != self.shape:
+            self._render(shape, render_fn)
+            self.key = key
+            self.shape = shape
+        blit_premultiplied(frame, self.sprite)
+
+
+class RadialGlowCache:
+    """
+    Soft radial halos. Coverage masks are cached per radius bucket (uint8,
+    1 inside `core` of the radius, smooth falloff to 0 at the edge). For
+    drawing, each (radius bucket, alpha bucket, color) also caches the
+    3-channel transparency (1 - a) and the premultiplied tint (color * a),
+    so a halo costs one multiply and one add over its own box, with no
+    per-frame mask scaling or channel merging. Halos drawn one after another
+    with the same color combine exactly like one 1 - prod(1 - a_i) pass.
+    """
+    def __init__(self, bucket=4, core=0.5, alpha_steps=16, max_entries=64, max_tints=256):
+        self.bucket = bucket
+        self.core = core
+        self.alpha_steps = alpha_steps
+        self.max_entries = max_entries
+        self.max_tints = max_tints
+        self.cache = OrderedDict()
+        self.tints = OrderedDict()
+
+    def mask(self, radius):
+        r = max(self.bucket, int(round(radius / self.bucket)) * self.bucket)
+        mask = self.cache.get(r)
+        if mask is not None:
+            self.cache.move_to_end(r)
+            return mask
+        yy, xx = np.mgrid[-r:r + 1, -r:r + 1].astype(np.float32)
+        d = np.sqrt(xx * xx + yy * yy) / r
+        a = np.clip((1.0 - d) / (1.0 - self.core), 0.0, 1.0)
+        a = a * a * (3.0 - 2.0 * a) # smoothstep
+        mask = (a * 255 + 0.5).astype(np.uint8)
+        self.cache[r] = mask
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return mask
+
+    def tinted(self, radius, alpha, color):
+        """(inverse coverage, premultiplied tint), both (2r+1, 2r+1, 3) uint8."""
+        mask = self.mask(radius)
+        steps = max(1, int(round(min(1.0, alpha) * self.alpha_steps)))
+        key = (mask.shape[0], steps, color)
+        entry = self.tints.get(key)
+        if entry is not None:
+            self.tints.move_to_end(key)
+            return entry
+        cov = cv2.convertScaleAbs(mask, alpha=steps / self.alpha_steps)
+        cov3 = cv2.merge([cov, cov, cov])
+        tint = cv2.multiply(cov3, np.full(cov3.shape, color, np.uint8), scale=1.0 / 255)
+        entry = self.tints[key] = (255 - cov3, tint)
+        if len(self.tints) > self.max_tints:
+            self.tints.popitem(last=False)
+        return entry
+
+    def draw(self, frame, center, radius, color, alpha=1.0):
+        self.draw_many(frame, [(center, radius, alpha)], color)
+
+    def draw_many(self, frame, halos, color):
+        """halos: iterable of (center, radius, alpha), all tinted with color."""
+        fh, fw = frame.shape[:2]
+        color = tuple(int(c) for c in color)
+        for center, radius, alpha in halos:
+            if radius <= 0 or alpha <= 0:
+                continue
+            inv, tint = self.tinted(radius, alpha, color)
+            r = inv.shape[0] // 2
+            x, y = int(center[0]) - r, int(center[1]) - r
+            x1, y1 = max(0, x), max(0, y)
+            x2, y2 = min(fw, x + inv.shape[1]), min(fh, y + inv.shape[0])
+            if x2 <= x1 or y2 <= y1:
+                continue
+            # dst = dst * (1 - a) + color * a
+            roi = frame[y1:y2, x1:x2]
+            src = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+            cv2.multiply(roi, inv[src], dst=roi, scale=1.0 / 255)
+            cv2.add(roi, tint[src], dst=roi)
+
+
+# Hand topology (MediaPipe's 21 landmarks): wrist 0, then four joints per
+# finger from thumb (1-4) to pinky (17-20). Same edges as HAND_CONNECTIONS.
+HAND_EDGES = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+], np.intp)
+
+
+def landmarks_to_pixels(landmark_list, width, height):
+    """
+    (N, 2) int32 pixel coordinates of a landmark list, plus a visibility mask
+    (False for points outside the image, which draw_landmarks would skip).
+    """
+    norm = np.array([(p.x, p.y) for p in landmark_list.landmark], np.float32)
+    visible = np.all((norm >= 0.0) & (norm <= 1.0), axis=1)
+    px = np.empty(norm.shape, np.int32)
+    px[:, 0] = np.minimum(np.floor(norm[:, 0] * width), width - 1)
+    px[:, 1] = np.minimum(np.floor(norm[:, 1] * height), height - 1)
+    return px, visible
+
+
+def _circle_offsets(radius, thickness):
+    """Pixel offsets cv2.circle touches for a circle centred on the origin."""
+    r = radius + max(thickness, 1) + 1
+    canvas = np.zeros((2 * r + 1, 2 * r + 1), np.uint8)
+    cv2.circle(canvas, (r, r), radius, 255, thickness)
+    dy, dx = np.nonzero(canvas)
+    return dy - r, dx - r
+
+
+class HandSkeleton:
+    """
+    Hand landmark renderer with the look of mp_drawing.draw_landmarks: bones
+    as lines, joints as circles with a white border ring. All bones go out in
+    one cv2.polylines call; joints are stamped together with one flat-index
+    write using pixel offsets precomputed from cv2.circle (border then joint,
+    point by point, the same painting order as draw_landmarks).
+    """
+    BORDER_COLOR = (255, 255, 255)
+
+    def __init__(self, joint_color, bone_color, joint_radius=2, joint_thickness=2, bone_thickness=2,
+                 edges=HAND_EDGES):
+        self.bone_color = bone_color
+        self.bone_thickness = bone_thickness
+        self.edges = edges
+        border_r = max(joint_radius + 1, int(joint_radius * 1.2))
+        by, bx = _circle_offsets(border_r, joint_thickness)
+        jy, jx = _circle_offsets(joint_radius, joint_thickness)
+        self.dy = np.concatenate([by, jy])
+        self.dx = np.concatenate([bx, jx])
+        self.colors = np.array([self.BORDER_COLOR] * len(by) + [joint_color] * len(jy), np.uint8)
+
+    def draw(self, frame, points, visible=None):
+        """points: (N, 2) int pixel coordinates, e.g. from landmarks_to_pixels."""
+        points = np.asarray(points, np.int32)
+        edges = self.edges
+        joints = points
+        if visible is not None:
+            edges = edges[visible[edges].all(axis=1)]
+            joints = points[visible]
+        if len(edges):
+            cv2.polylines(frame, list(points[edges]), False, self.bone_color, self.bone_thickness)
+        if len(joints) == 0:
+            return
+        fh, fw = frame.shape[:2]
+        ys = (joints[:, 1, None] + self.dy).ravel()
+        xs = (joints[:, 0, None] + self.dx).ravel()
+        colors = np.tile(self.colors, (len(joints), 1))
+        inside = (ys >= 0) & (ys < fh) & (xs >= 0) & (xs < fw)
+        if frame.flags.c_contiguous:
+            frame.reshape(-1, 3)[(ys * fw + xs)[inside]] = colors[inside]
+        else:
+            frame[ys[inside], xs[inside]] = colors[inside]
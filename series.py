@@ -0,0 +1,62 @@
+import numpy as np
+
+# ============================================================
+#   TIME SERIES
+#   Fixed-capacity numpy ring buffers for rolling sensor and
+#   graph histories: O(1) append and a contiguous, oldest-first
+#   view for plotting without copying or list.pop(0).
+# ============================================================
+
+
+class RingSeries:
+    """
+    Rolling window of the last `capacity` samples.
+    Samples are written twice (at i and i + capacity) into a buffer of twice
+    the capacity, so the window is always one contiguous slice of it.
+    Starts full of `fill`, like the [0.0] * max_len lists it replaces.
+    """
+    def __init__(self, capacity, fill=0.0, dtype=np.float64):
+        self.capacity = int(capacity)
+        self._buf = np.full(2 * self.capacity, fill, dtype)
+        self._head = 0 # Index of the oldest sample in the window
+
+    def append(self, value):
+        cap = self.capacity
+        i = self._head
+        self._buf[i] = value
+        self._buf[i + cap] = value
+        self._head = i + 1 if i + 1 < cap else 0
+
+    def extend(self, values):
+        for v in values:
+            self.append(v)
+
+    def set_tail(self, values):
+        """Overwrites the newest len(values) samples in place (no scrolling)."""
+        values = np.asarray(values, self._buf.dtype)
+        k = min(len(values), self.capacity)
+        if k == 0:
+            return
+        cap = self.capacity
+        # Window positions cap - k .. cap - 1, mapped back into the ring
+        idx = (self._head + np.arange(cap - k, cap)) % cap
+        self._buf[idx] = values[-k:]
+        self._buf[idx + cap] = values[-k:]
+
+    def view(self):
+        """Contiguous oldest-first window (a view: do not modify, do not keep)."""
+        return self._buf[self._head:self._head + self.capacity]
+
+    @property
+    def last(self):
+        return self._buf[self._head + self.capacity - 1]
+
+    def fill(self, value):
+        self._buf[:] = value
+        self._head = 0
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __len__(self):
+        return self.capacity
@@ -0,0 +1,173 @@
+import math
+import os
+import threading
+import time
+
+import pytest
+
+from hr_emulator import HeartRateEmulator, PtyLink, benchmark
+from hr_sensor import HeartRateMonitor
+from physiology import PhysiologyEngine
+from ppg import PPGPipeline
+from timing import FrameClock, SimulatedClock
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "openpty"), reason="the emulator needs a pty (POSIX)")
+
+SPEED = 10.0 # Scenario seconds per real second; the app's clock runs at the same speed
+FRAME_HZ = 30.0
+
+
+@pytest.fixture
+def link():
+    link = PtyLink()
+    yield link
+    link.close()
+
+
+def run_app(link, scenario, secs, raw=False, seed=1, speed=SPEED):
+    """
+    Plays `scenario` for secs (scenario time) into HeartRateMonitor and
+    PhysiologyEngine, ticking a simulated frame clock at FRAME_HZ like the
+    render loop (speed: both run this much faster than real time). The
+    emulator starts once the monitor holds the port.
+    Returns (emulator, beats drained, per-frame log, monitor, engine).
+    """
+    clock = FrameClock(SimulatedClock(speed=speed))
+    monitor = HeartRateMonitor(clock=clock, port=link.port, raw=raw)
+    engine = PhysiologyEngine(clock)
+    emulator = HeartRateEmulator(link.write, scenario, speed=speed, seed=seed, raw=raw)
+    log = []
+    beats = 0
+    try:
+        deadline = time.monotonic() + 5.0
+        while not monitor.connected:
+            assert time.monotonic() < deadline, "monitor never opened the pty"
+            time.sleep(0.01)
+            clock.tick()
+            monitor.update()
+        thread = threading.Thread(target=emulator.run, args=(secs,), daemon=True)
+        start = clock.now
+        thread.start()
+        settle = 0
+        while thread.is_alive() or settle < 10: # A few more frames for the tail
+            settle += not thread.is_alive()
+            time.sleep(1.0 / FRAME_HZ)
+            clock.tick()
+            monitor.update()
+            hr, spo2, _, _, _ = monitor.get_data()
+            engine.set_connection(monitor.connection_id)
+            metrics = engine.analyze(hr, monitor.frame_beats, now=clock.now)
+            beats += len(monitor.frame_beats)
+            log.append({"t": clock.now - start, "hr": hr, "spo2": spo2, "conn": monitor.connection_id,
+                        "beats": list(monitor.frame_beats), "hrv_count": engine.hrv.count,
+                        "rmssd": metrics.get("hrv_rmssd_ms", 0.0)})
+    finally:
+        emulator.stop()
+        monitor.close()
+        engine.spectral.stop(timeout=1.0)
+    return emulator, beats, log, monitor, engine
+
+
+def during(log, lo, hi, period=None):
+    """Log entries with scenario time in [lo, hi) (of each period, if given)."""
+    return [e for e in log if lo <= (e["t"] % period if period else e["t"]) < hi]
+
+
+# ---------------- Serial path (SerialReader) ----------------
+
+@pytest.mark.parametrize("scenario", ["rest", "burst"])
+def test_reader_frames_every_line_at_high_rate(link, scenario):
+    # 20x the board's report rate, played at 5x: ~1000 lines/s
+    emulator = HeartRateEmulator(link.write, scenario, report_hz=200.0, speed=5.0, seed=1)
+    stats = benchmark(link, emulator, 2.0)
+    assert stats["reader_error"] is None
+    assert stats["lines_framed"] == stats["lines_sent"]
+    assert stats["beats_received"] == stats["beats_sent"] > 0
+
+
+# ---------------- HeartRateMonitor + PhysiologyEngine ----------------
+
+def test_rest(link):
+    emulator, beats, log, _, engine = run_app(link, "rest", 30.0)
+    assert beats == emulator.beats
+    settled = during(log, 5.0, 30.0)
+    assert all(60 <= e["hr"] <= 76 and e["spo2"] == 98 for e in settled)
+    # Breathing swing (40 ms RSA) plus jitter, measured on the frame clock
+    assert 8.0 <= settled[-1]["rmssd"] <= 40.0
+    assert engine.hrv.count >= emulator.beats - 3
+
+
+def test_breath_hold_slows_the_heart(link):
+    emulator, beats, log, _, _ = run_app(link, "breath_hold", 60.0)
+    assert beats == emulator.beats
+    breathing = [e["hr"] for e in during(log, 10.0, 30.0)]
+    holding = [e["hr"] for e in during(log, 50.0, 60.0)]
+    assert sum(holding) / len(holding) < sum(breathing) / len(breathing) - 5.0
+    assert min(e["spo2"] for e in during(log, 50.0, 60.0)) <= 96
+
+
+def test_burst_delivers_every_beat(link):
+    # Bursts arrive every 0.5 s, so intervals are lost but no beat is
+    emulator, beats, _, _, _ = run_app(link, "burst", 20.0)
+    assert beats == emulator.beats > 0
+
+
+def test_noisy_contact(link):
+    emulator, beats, log, _, _ = run_app(link, "noisy", 40.0)
+    assert emulator.garbled > 0
+    # Only a line that a garbled fragment ran into can be lost
+    assert emulator.beats - emulator.garbled <= beats <= emulator.beats
+    # Motion artifacts (180 / 35 BPM) stay outside the accepted window
+    assert all(e["hr"] == 0 or 55 < e["hr"] < 115 for e in log)
+
+
+def test_finger_off_zeroes_and_recovers(link):
+    _, _, log, _, _ = run_app(link, "finger_off", 40.0)
+    off = during(log, 15.5, 20.0, period=20.0)
+    assert off and all(e["hr"] == 0 and e["spo2"] == 0 and not e["beats"] for e in off)
+    back = during(log, 23.0, 35.0)
+    assert back and all(e["hr"] > 0 for e in back)
+
+
+def test_disconnect_reconnects(link):
+    _, _, log, monitor, _ = run_app(link, "disconnect", 40.0)
+    # Silent from 23 s: HR drops after the 3 s beat timeout, the port is
+    # reopened after the 5 s data timeout, and data flows again from 30 s
+    assert all(e["hr"] == 0 for e in during(log, 26.5, 28.0))
+    assert monitor.connection_id >= 2
+    assert all(e["conn"] == 1 for e in during(log, 0.0, 23.0))
+    resumed = during(log, 32.0, 40.0)
+    assert resumed and all(e["conn"] >= 2 and e["hr"] > 0 for e in resumed)
+    # The HRV window restarted with the new connection
+    assert during(log, 30.0, 31.0)[0]["hrv_count"] <= 2
+
+
+# ---------------- Raw PPG mode ----------------
+
+def warmup_beats(hr, placements=1):
+    """Beats raw mode cannot report: each filter warm-up, plus the filter-delayed tail."""
+    return placements * math.ceil(PPGPipeline().warmup_secs * hr / 60.0) + 1
+
+
+@pytest.mark.parametrize("scenario, hr", [("rest", 68.0), ("noisy", 74.0)])
+def test_raw_reader_beats_after_warmup(link, scenario, hr):
+    emulator = HeartRateEmulator(link.write, scenario, speed=SPEED, seed=1, raw=True)
+    stats = benchmark(link, emulator, 3.0)
+    assert stats["reader_error"] is None
+    # Only the warm-up is lost; corrupted frames (noisy) cost at most one more beat
+    sent = emulator.beats
+    assert sent - warmup_beats(hr) - (scenario == "noisy") <= stats["beats_received"] <= sent
+
+
+def test_raw_monitor_finger_off(link):
+    # Real time: raw beats are stamped on the 100 Hz sample clock, which only
+    # lines up with the frame clock when the emulator isn't accelerated
+    _, _, log, _, _ = run_app(link, "finger_off", 27.0, raw=True, speed=1.0)
+    on = during(log, 8.0, 15.0)
+    assert on and all(abs(e["hr"] - 68.0) <= 6.0 for e in on)
+    assert sum(len(e["beats"]) for e in on) >= 7
+    off = during(log, 16.0, 20.0)
+    assert off and all(e["hr"] == 0 and not e["beats"] for e in off)
+    # Placed again at 20 s: beats after the warm-up, HR once three intervals are in
+    assert any(e["beats"] for e in during(log, 22.0, 27.0))
+    assert during(log, 26.5, 27.0)[-1]["hr"] > 0
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from ppg import (PPG_BLOCK, PPG_FRAME_SIZE, PPG_HR_RANGE, PPG_SAMPLE_HZ, FrameDecoder, PPGPipeline,
+                 SyntheticPPG, encode_frames)
+
+
+def stream(gen, secs, corrupt=None):
+    """
+    Feeds secs of SyntheticPPG through encode_frames -> FrameDecoder ->
+    PPGPipeline a block at a time, stamped with the sample clock.
+    corrupt(data) may damage each block's bytes. Returns (sent beats,
+    detected beats, hr reports, last spo2, pipeline, decoder).
+    """
+    decoder, pipeline = FrameDecoder(), PPGPipeline()
+    buf = bytearray()
+    sent, got, hrs, spo2 = [], [], [], None
+    for i in range(int(secs * PPG_SAMPLE_HZ / PPG_BLOCK)):
+        ir, red, beats = gen.generate(PPG_BLOCK)
+        sent += beats
+        data = bytearray(encode_frames(i * PPG_BLOCK, ir, red))
+        if corrupt:
+            corrupt(data)
+        buf += data
+        ir, red, gap = decoder.decode(buf)
+        t = (i + 1) * PPG_BLOCK / PPG_SAMPLE_HZ
+        beats, hr, s = pipeline.process(ir, red, t, gap)
+        got += beats
+        if hr:
+            hrs.append(hr)
+        if s:
+            spo2 = s
+    return sent, got, hrs, spo2, pipeline, decoder
+
+
+def recall(sent, got, after, tol=0.05):
+    """Share of the beats sent after `after` seconds that were detected within tol."""
+    expected = [b for b in sent if b > after]
+    got = np.asarray(got)
+    hits = sum(1 for b in expected if len(got) and np.abs(got - b).min() <= tol)
+    return hits / len(expected)
+
+
+@pytest.mark.parametrize("hr", [45, 60, 75, 90, 120, 150, 180])
+def test_hr_spo2_and_recall(hr):
+    # Beat-to-beat swing of 4% of the interval, like resting RSA
+    gen = SyntheticPPG(hr=hr, rsa_ms=2400.0 / hr, spo2=97.0, seed=hr)
+    sent, got, hrs, spo2, pipeline, _ = stream(gen, 40)
+    after = pipeline.warmup_secs + 0.5
+    assert recall(sent, got, after) >= 0.97
+    assert len(got) <= len(sent) + 1 # No dicrotic double counts
+    assert abs(np.median(hrs[-20:]) - hr) <= 3.0
+    assert abs(spo2 - 97.0) <= 2.0
+
+
+@pytest.mark.parametrize("level", [90.0, 94.0, 99.0])
+def test_spo2_follows_saturation(level):
+    _, _, _, spo2, _, _ = stream(SyntheticPPG(hr=70, spo2=level, seed=1), 20)
+    assert abs(spo2 - level) <= 2.0
+
+
+def test_tracks_up_to_the_range_limit():
+    hr = PPG_HR_RANGE[1]
+    sent, got, hrs, _, pipeline, _ = stream(SyntheticPPG(hr=hr, rsa_ms=2400.0 / hr, seed=2), 40)
+    assert recall(sent, got, pipeline.warmup_secs + 0.5) >= 0.95
+    assert abs(np.median(hrs[-20:]) - hr) <= 8.0
+
+
+def test_nothing_before_warmup():
+    sent, got, _, _, pipeline, _ = stream(SyntheticPPG(hr=90, seed=3), 10)
+    assert got and min(got) >= pipeline.warmup_secs - 0.5
+
+
+def test_finger_off_reports_zero():
+    gen = SyntheticPPG(hr=70, seed=4)
+    gen.contact = False
+    ir, red, beats = gen.generate(PPG_BLOCK)
+    assert beats == []
+    assert PPGPipeline().process(ir, red, 1.0) == ([], 0, 0)
+
+
+def test_beats_survive_corrupted_bytes():
+    rng = np.random.default_rng(5)
+
+    def corrupt(data):
+        if rng.random() < 0.1:
+            data[rng.integers(len(data))] ^= 0x55
+
+    sent, got, hrs, _, pipeline, decoder = stream(SyntheticPPG(hr=72, seed=5), 40, corrupt)
+    assert decoder.lost > 0
+    assert recall(sent, got, pipeline.warmup_secs + 0.5) >= 0.95
+    assert abs(np.median(hrs[-20:]) - 72) <= 3.0
+
+
+def frames(n, seq=0):
+    ir = np.arange(1000, 1000 + n)
+    red = np.arange(2000, 2000 + n)
+    return encode_frames(seq, ir, red), ir, red
+
+
+def test_decoder_skips_text_and_partial_frames():
+    data, ir, red = frames(20)
+    noisy = b"MAX30100 ok\r\n" + data[:40] + b"\xa5junk\xa5\x5a" + data[40:]
+    decoder = FrameDecoder()
+    buf = bytearray()
+    out = []
+    for i in range(0, len(noisy), 7): # Arrives in odd-sized pieces
+        buf += noisy[i:i + 7]
+        got_ir, _, gap = decoder.decode(buf)
+        assert gap == 0
+        out.extend(got_ir.tolist())
+    assert out == ir.tolist()
+    assert decoder.lost == 0
+
+
+def test_decoder_holds_samples_through_a_dropped_frame():
+    data, ir, red = frames(10)
+    data = bytearray(data)
+    data[4 * PPG_FRAME_SIZE + 3] ^= 0xFF # Bad checksum: frame 4 is dropped
+    got_ir, got_red, gap = FrameDecoder().decode(data)
+    assert gap == 0
+    assert len(got_ir) == 10 # The gap is filled, so the sample clock holds
+    assert got_ir[4] == ir[3] and got_red[4] == red[3]
+    assert got_ir.tolist()[5:] == ir.tolist()[5:]
+
+
+def test_decoder_resyncs_after_lost_bytes():
+    data, ir, _ = frames(10)
+    cut = data[:3 * PPG_FRAME_SIZE + 2] + data[3 * PPG_FRAME_SIZE + 5:] # Half of frame 3 lost
+    decoder = FrameDecoder()
+    got_ir, _, _ = decoder.decode(bytearray(cut))
+    assert decoder.lost == 1
+    assert got_ir.tolist() == ir.tolist()[:3] + [ir[2]] + ir.tolist()[4:]
+
+
+def test_decoder_reports_a_gap_between_reads():
+    first, ir, _ = frames(5)
+    second, _, _ = frames(5, seq=8) # Frames 5-7 never arrived
+    decoder = FrameDecoder()
+    decoder.decode(bytearray(first))
+    got_ir, _, gap = decoder.decode(bytearray(second))
+    assert gap == 3 and len(got_ir) == 5
@@ -0,0 +1,308 @@
+import time
+
+# ============================================================
+#   TIMING HELPERS
+#   Per-frame clock, fixed-timestep stepping and time-based
+#   debouncers, so app behaviour is defined in seconds rather
+#   than frames and can run on simulated or replayed time.
+# ============================================================
+
+
+# ---------------- Clock Sources -----------------
+# A clock source only has to provide now() -> seconds (monotonic).
+# FrameClock calls it exactly once per frame.
+
+class WallClock:
+    """Real time (monotonic, unaffected by system clock changes)."""
+    def now(self):
+        return time.monotonic()
+
+
+class SimulatedClock:
+    """
+    Synthetic time for benchmarks and fast-forward runs.
+    frame_dt=None : real elapsed time scaled by `speed` (e.g. 10x)
+    frame_dt=0.033: deterministic, every tick advances frame_dt * speed seconds
+    """
+    def __init__(self, speed=1.0, frame_dt=None, start=0.0):
+        self.speed = speed
+        self.frame_dt = frame_dt
+        self.t = start
+        self._real_start = time.monotonic()
+        self._start = start
+
+    def now(self):
+        if self.frame_dt is None:
+            return self._start + (time.monotonic() - self._real_start) * self.speed
+        self.t += self.frame_dt * self.speed
+        return self.t
+
+
+class ReplayClock:
+    """
+    Replays recorded per-frame timestamps (e.g. from a captured session,
+    see RecordingClock). Logic sees the recorded time unchanged; the loop
+    runs the frames as fast as it can, so a replay is as fast as rendering
+    allows. Once the timestamps run out, now() holds the last one and
+    finished turns True.
+    """
+    def __init__(self, timestamps):
+        self.timestamps = list(timestamps)
+        if not self.timestamps:
+            raise ValueError("ReplayClock needs at least one recorded timestamp")
+        self.index = 0
+        self.t0 = self.timestamps[0]
+
+    def now(self):
+        i = min(self.index, len(self.timestamps) - 1)
+        self.index += 1
+        return self.timestamps[i] - self.t0
+
+    @property
+    def finished(self):
+        """True once now() has been asked past the last recorded timestamp."""
+        return self.index > len(self.timestamps)
+
+
+class RecordingClock:
+    """Wraps another source and keeps every timestamp it returns (for replay)."""
+    def __init__(self, source):
+        self.source = source
+        self.timestamps = []
+
+    @property
+    def speed(self):
+        return getattr(self.source, "speed", 1.0)
+
+    def now(self):
+        t = self.source.now()
+        self.timestamps.append(t)
+        return t
+
+    def save(self, path):
+        save_timestamps(path, self.timestamps)
+
+
+def load_timestamps(path):
+    """Reads recorded frame timestamps: one number per line, '#' comments allowed."""
+    timestamps = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                timestamps.append(float(line))
+    return timestamps
+
+
+def save_timestamps(path, timestamps):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{t:.6f}\n" for t in timestamps)
+
+
+def make_clock_source(mode="wall", speed=1.0, frame_dt=None, timestamps=None, replay_path=None):
+    """
+    Builds a clock source from a config string: 'wall', 'sim' or 'replay'.
+    Replay takes `timestamps` or a file written by RecordingClock.save
+    (`replay_path`); speed does not apply to it.
+    """
+    if mode == "sim":
+        return SimulatedClock(speed=speed, frame_dt=frame_dt)
+    if mode == "replay":
+        if timestamps is None and replay_path:
+            timestamps = load_timestamps(replay_path)
+        if not timestamps:
+            raise ValueError("Replay clock mode needs recorded timestamps (set a replay file)")
+        return ReplayClock(timestamps)
+    return WallClock()
+
+
+class FrameClock:
+    """
+    One timestamp per frame.
+    Call tick() once at the top of the frame loop; everything that frame reads
+    clock.now (and clock.dt) so values never drift within a frame.
+    """
+    def __init__(self, source=None):
+        self.source = source or WallClock()
+        self.now = self.source.now()
+        self.real = time.monotonic() # Real time when now was captured
+        self.start = self.now
+        self.dt = 0.0
+        self.frame_index = 0
+
+    def tick(self):
+        t = self.source.now()
+        self.real = time.monotonic()
+        self.dt = max(0.0, t - self.now)
+        self.now = t
+        self.frame_index += 1
+        return t
+
+    def from_real(self, t):
+        """
+        This clock's time for a time.monotonic() timestamp t (e.g. when a
+        sensor line arrived), so device events share the frame timeline.
+        Real time runs at the source's speed (1 for wall and replay clocks).
+        """
+        return self.now + (t - self.real) * getattr(self.source, "speed", 1.0)
+
+    def elapsed(self):
+        """Seconds since the clock was created."""
+        return self.now - self.start
+
+    def set_source(self, source):
+        self.source = source
+        self.now = self.source.now()
+        self.real = time.monotonic()
+        self.start = self.now
+        self.dt = 0.0
+
+
+class FixedTimestep:
+    """
+    Accumulator-based fixed-rate simulation clock.
+    Each frame call advance(now); it returns how many fixed steps (of self.dt
+    seconds) the simulation should run. self.alpha is the leftover fraction of
+    a step, used by the render side to interpolate between the last two states.
+    """
+    def __init__(self, hz=20.0, max_steps=5):
+        self.hz = float(hz)
+        self.dt = 1.0 / self.hz
+        self.max_steps = max_steps # Avoid "spiral of death" after a long stall
+        self.accumulator = 0.0
+        self.last_time = None
+        self.alpha = 0.0
+        self.total_steps = 0
+
+    def advance(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        if self.last_time is None:
+            self.last_time = now
+            return 0
+
+        frame_dt = max(0.0, now - self.last_time)
+        self.last_time = now
+        self.accumulator += frame_dt
+
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # Drop the backlog instead of trying to catch up in one frame
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+
+        self.alpha = self.accumulator / self.dt
+        self.total_steps += steps
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.last_time = None
+        self.alpha = 0.0
+
+
+def lerp(a, b, t):
+    """Linear interpolation between a and b (t in 0..1)."""
+    return a + (b - a) * t
+
+
+class Debouncer:
+    """
+    Time-based boolean debouncer.
+    The output turns ON once the input has stayed True for on_secs and turns
+    OFF once it has stayed False for off_secs (a grace period), measured with
+    timestamps instead of frame counts so it behaves the same at any FPS.
+    """
+    def __init__(self, on_secs=0.0, off_secs=0.0):
+        self.on_secs = on_secs
+        self.off_secs = off_secs
+        self.state = False
+        self.changed_at = None   # When the output last changed
+        self._pending_since = None # When the input started disagreeing with the output
+
+    def update(self, value, now=None):
+        if now is None:
+            now = time.monotonic()
+        value = bool(value)
+        if value == self.state:
+            self._pending_since = None
+            return self.state
+
+        if self._pending_since is None:
+            self._pending_since = now
+        delay = self.on_secs if value else self.off_secs
+        if now - self._pending_since >= delay:
+            self.state = value
+            self.changed_at = now
+            self._pending_since = None
+        return self.state
+
+    def held_for(self, now=None):
+        """Seconds the output has been in its current state."""
+        if self.changed_at is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        return now - self.changed_at
+
+    def reset(self, state=False):
+        self.state = state
+        self.changed_at = None
+        self._pending_since = None
+
+
+class IntervalTimer:
+    """Fires at most once every `interval` seconds (first window starts on first call)."""
+    def __init__(self, interval):
+        self.interval = interval
+        self.last_fire = None
+
+    def ready(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        if self.last_fire is None:
+            self.last_fire = now
+            return False
+        if now - self.last_fire >= self.interval:
+            self.last_fire = now
+            return True
+        return False
+
+
+class TimedHistory:
+    """
+    Rolling history covering a fixed time window.
+    Values pushed faster than sample_hz are dropped, values older than
+    window_secs are trimmed, so the series spans the same time at any FPS.
+    """
+    def __init__(self, window_secs, sample_hz=None):
+        self.window_secs = window_secs
+        self.min_interval = (1.0 / sample_hz) if sample_hz else 0.0
+        self.times = []
+        self.values = []
+
+    def append(self, value, now=None):
+        if now is None:
+            now = time.monotonic()
+        if self.times and now - self.times[-1] < self.min_interval:
+            return False
+        self.times.append(now)
+        self.values.append(value)
+        # Trim expired samples
+        cutoff = now - self.window_secs
+        drop = 0
+        while drop < len(self.times) and self.times[drop] < cutoff:
+            drop += 1
+        if drop:
+            del self.times[:drop]
+            del self.values[:drop]
+        return True
+
+    def clear(self):
+        self.times = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
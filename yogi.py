@@ -8,9 +8,15 @@ import os
 import random
 import speech_recognition as sr
 import pyttsx3
-import serial
-import serial.tools.list_ports
 import ai_explainer
+from timing import FrameClock, FixedTimestep, Debouncer, IntervalTimer, lerp, make_clock_source, RecordingClock
+from render_utils import HudCompositor, BlendRegion, SpriteCache, PremultSprite, blit_premultiplied, GradientCache, Layer, TextCache, PanelCache, RadialGlowCache, HandSkeleton, landmarks_to_pixels
+from particles import ParticleEngine
+from series import RingSeries
+from quality import QualityGovernor
+from image_writer import ImageWriter
+from hr_sensor import HeartRateMonitor
+from physiology import PhysiologyEngine
 
 # ============================================================
 #   AI CHAKRAFLOW — FULL VERSION (MUSIC + VOICE + SUMMARY)
@@ -96,7 +102,10 @@ CHAKRA_SCRIPTURES = [
 # Thresholds
 # Thresholds
 EYE_CLOSED_THRESHOLD = 0.30 # EAR Ratio (Increased to 0.30 for very robust detection)
-EYE_CLOSED_FRAMES_REQUIRED = 15 # ~0.5-1 sec.5s
+EYE_CLOSED_SECS_REQUIRED = 0.5 # Eyes must stay closed this long (was 15 frames)
+NAMASTE_GRACE_SECS = 0.5 # Tolerate flickering Namaste detection (was 15 frames)
+THIRD_EYE_DWELL_SECS = 0.7 # Gaze dwell before Third Eye locks (was 20 frames)
+MIND_STATE_SECS = 1.0 # Mind-wave state re-evaluation period (was 30 frames)
 
 AI_REFRESH_SECS = 6  # refresh AI tip every few seconds
 
@@ -104,6 +113,38 @@ AI_REFRESH_SECS = 6  # refresh AI tip every few seconds
 SKIP_FRAMES = 2  # Process AI every 3rd frame (0, 1, 2 -> process on 0)
 AI_RESOLUTION_SCALE = 0.5 # Scale down image for AI processing (0.5 = half width/height)
 
+# SIMULATION CLOCK
+# XP, levels, concentration, alignment and Kumbhaka advance on a fixed tick,
+# so practice progress does not depend on how fast frames are rendered.
+SIM_HZ = 20
+TUNED_FPS = 30.0 # Old per-frame rates were tuned at ~30fps; rates below are per second
+GRAPH_SAMPLE_HZ = TUNED_FPS # Bio-analytics graphs scroll at a fixed sample rate
+PHYSIO_HISTORY_SECS = 20 / TUNED_FPS # BPM / dosha history window (was 20 frames)
+HRV_WINDOW_SECS = 60.0 # Time-domain HRV window (30 s - 5 min)
+SPECTRAL_HRV_SECS = 2.0 # LF / HF and coherence are recomputed this often (worker thread)
+SPECTRAL_HRV_WINDOW_SECS = 300.0 # Beat window for LF / HF (5 min, as short-term HRV is defined)
+# Sensor port: None = auto-detect by description; a device path (e.g. the pty
+# printed by hr_emulator.py) is opened directly
+HR_SENSOR_PORT = os.environ.get("HR_SENSOR_PORT") or None
+# Raw PPG mode: the arduino_raw_ppg sketch streams IR / red samples and beats,
+# HR and SpO2 are computed here (ppg.py) instead of the firmware's clamped HR
+HR_SENSOR_RAW = os.environ.get("HR_SENSOR_RAW", "0") == "1"
+
+# FRAME CLOCK
+# One timestamp is captured per frame (frame_clock.tick()) and passed to the
+# analysis and render code. "wall" = live, "sim" = accelerated / deterministic
+# benchmark time (CLOCK_SPEED x), "replay" = recorded frame timestamps from
+# CLOCK_REPLAY_FILE, played back as fast as frames render. CLOCK_RECORD_FILE
+# saves this run's frame timestamps on exit for a later replay.
+CLOCK_MODE = "wall"
+CLOCK_SPEED = 1.0
+CLOCK_REPLAY_FILE = None
+CLOCK_RECORD_FILE = None
+clock_source = make_clock_source(CLOCK_MODE, CLOCK_SPEED, replay_path=CLOCK_REPLAY_FILE)
+if CLOCK_RECORD_FILE:
+    clock_source = RecordingClock(clock_source)
+frame_clock = FrameClock(clock_source)
+
 
 # ---------------- Pygame audio init -----------------
 pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
@@ -130,6 +171,7 @@ def mouse_callback(event, x, y, flags, param):
         mouse_x, mouse_y = x, y
 
 import threading
+from collections import OrderedDict
 import queue
 
 # [FIX] TTS Worker to prevent freezing
@@ -175,7 +217,7 @@ def speak_threaded(text):
     """Adds text to the TTS queue."""
     tts_worker.queue.put(text)
 
-def check_hover_and_speak(w, h):
+def check_hover_and_speak(w, h, now):
     global last_speak_time, current_speaking_graph
     
     # [FIX] Debounce logic
@@ -217,10 +259,10 @@ def check_hover_and_speak(w, h):
             # Speak if:
             # 1. New graph hovered
             # 2. OR Same graph but time > 5s
-            if current_speaking_graph != name or (time.time() - last_speak_time > 5.0):
+            if current_speaking_graph != name or (now - last_speak_time > 5.0):
                 print(f"[SPEAK] {name}")
                 speak_threaded(text)
-                last_speak_time = time.time()
+                last_speak_time = now
                 current_speaking_graph = name
             return
 
@@ -234,10 +276,10 @@ def check_hover_and_speak(w, h):
     dist = ((mouse_x - cx)**2 + (mouse_y - cy)**2)**0.5
     if dist < r:
         hovered_something = True
-        if current_speaking_graph != "Energy Coherence" or (time.time() - last_speak_time > 5.0):
+        if current_speaking_graph != "Energy Coherence" or (now - last_speak_time > 5.0):
             print("[SPEAK] Energy Coherence")
             speak_threaded("Yeh Energy Coherence radar hai. Yeh aapki poori body aur mind ka balance dikhata hai. Jab yeh bada aur gol hota hai, iska matlab aapki energy peak par hai aur aap poori tarah se aligned hain.")
-            last_speak_time = time.time()
+            last_speak_time = now
             current_speaking_graph = "Energy Coherence"
         return
         
@@ -279,7 +321,7 @@ def draw_status_panel(frame, center_x, center_y, radius, status):
     max_w = 0
     line_heights = []
     for line in lines:
-        (w, h), baseline = cv2.getTextSize(line['text'], cv2.FONT_HERSHEY_SIMPLEX, line['scale'], line['thick'])
+        (w, h), baseline = text_cache.size(line['text'], cv2.FONT_HERSHEY_SIMPLEX, line['scale'], line['thick'])
         lh = h + baseline + 10 # 10px padding
         line_heights.append(lh)
         total_h += lh
@@ -300,14 +342,12 @@ def draw_status_panel(frame, center_x, center_y, radius, status):
         color = line['color']
         lh = line_heights[i]
         
-        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thick)
+        (w, h), _ = text_cache.size(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thick)
         x = center_x - (w // 2)
         
-        # Draw Shadow/Outline for better visibility
-        # [FIX] Much thicker outline (4px minimum)
-        cv2.putText(frame, text, (x, current_y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), thick + 4, cv2.LINE_AA)
-        # Draw Main Text
-        cv2.putText(frame, text, (x, current_y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thick, cv2.LINE_AA)
+        # Shadow/Outline for better visibility ([FIX] 4px thicker), then Main Text
+        text_cache.draw(frame, text, (x, current_y), cv2.FONT_HERSHEY_SIMPLEX, scale,
+                        (((0, 0, 0), thick + 4), (color, thick)), cv2.LINE_AA)
         
         current_y += lh
 
@@ -322,11 +362,8 @@ def draw_text_with_bg(frame, text, x, y, font_scale=0.6, color=(255, 255, 255),
     y2 = min(h, y + 5)
     
     if x2 > x1 and y2 > y1:
-        roi = frame[y1:y2, x1:x2]
-        overlay = roi.copy()
-        cv2.rectangle(overlay, (0, 0), (x2-x1, y2-y1), bg_color, -1)
-        cv2.addWeighted(overlay, bg_alpha, roi, 1 - bg_alpha, 0, roi)
-        frame[y1:y2, x1:x2] = roi
+        # x2 / y2 are exclusive; rect() corners are inclusive
+        BlendRegion(frame).rect((x1, y1), (x2 - 1, y2 - 1), bg_color).apply(bg_alpha)
         
     cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
 
@@ -373,9 +410,7 @@ def draw_paragraph_with_bg(frame, text, x, y, max_width=600, font_scale=0.5, col
     box_h = total_h + 20
     
     # Draw Background
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (box_x, box_y), (box_x + box_w, box_y + box_h), bg_color, -1)
-    cv2.addWeighted(overlay, bg_alpha, frame, 1 - bg_alpha, 0, frame)
+    BlendRegion(frame).rect((box_x, box_y), (box_x + box_w, box_y + box_h), bg_color).apply(bg_alpha)
     
     # Draw Text
     cur_y = box_y + 10 + txt_h # First line baseline
@@ -658,18 +693,18 @@ class BreathingTracker:
         self.prev_y = None
         self.smoothed = 0.0
         self.smoothing = smoothing
-        self.last_time = time.time()
+        self.last_time = frame_clock.now
         self.breath_phase = 0.0
 
-    def update(self, nose_y):
+    def update(self, nose_y, now):
         if self.prev_y is None:
             self.prev_y = nose_y
             return
         dy = nose_y - self.prev_y
         self.prev_y = nose_y
         self.smoothed = self.smoothing * self.smoothed + (1 - self.smoothing) * dy
-        dt = max(1e-3, time.time() - self.last_time)
-        self.last_time = time.time()
+        dt = max(1e-3, now - self.last_time)
+        self.last_time = now
         self.breath_phase += self.smoothed * 50
         if self.breath_phase > 2 * math.pi:
             self.breath_phase -= 2 * math.pi
@@ -680,17 +715,20 @@ class BreathingTracker:
         return 1.0 + 0.3 * math.sin(self.breath_phase)
 
 
+# Radial-gradient chakra halos, shared across frames (bucketed by color and radius)
+chakra_glow_cache = RadialGlowCache(bucket=4)
+
 def draw_chakras(frame, center_x, top_y, bottom_y,
                  active_index, energies, aura_color,
-                 breath_factor, t):
+                 breath_factor, t, glow=True):
     num_chakras = 7
     ys = np.linspace(bottom_y, top_y, num_chakras)
 
     music_pulse = 0.8 + 0.35 * math.sin(2.0 * t)
 
+    # Column geometry first, so all halos can be composited in one pass
+    chakras = []
     for i in range(num_chakras):
-        chakra_name = CHAKRA_NAMES[i]
-        base_color = CHAKRA_COLORS[i]
         energy = energies[i]
 
         wobble = 8 * math.sin(t * 1.4 + i * 0.9)
@@ -704,84 +742,97 @@ def draw_chakras(frame, center_x, top_y, bottom_y,
 
         aura_radius = int(radius * (1.5 + 0.3 * music_pulse))
         aura_alpha = min(0.9, 0.25 + 0.5 * energy * music_pulse)
+        chakras.append((center, radius, aura_radius, aura_alpha))
 
-        overlay = frame.copy()
-        cv2.circle(overlay, center, aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay, aura_alpha, frame, 1 - aura_alpha, 0, frame)
+    # Soft halos from cached radial masks, one tint over the column's bbox
+    if glow:
+        chakra_glow_cache.draw_many(frame, [(c, ar, aa) for c, _, ar, aa in chakras], aura_color)
 
-        cv2.circle(frame, center, radius, base_color, -1)
+    for i, (center, radius, _, _) in enumerate(chakras):
+        cv2.circle(frame, center, radius, CHAKRA_COLORS[i], -1)
 
         if i == active_index:
             cv2.circle(frame, center, radius + 6, (255, 255, 255), 2)
 
-        cv2.putText(frame, chakra_name, (center[0] + 30, center[1] + 5),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+        text_cache.draw(frame, CHAKRA_NAMES[i], (center[0] + 30, center[1] + 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (((255, 255, 255), 1),), cv2.LINE_AA)
 
 
-def draw_chakra_meter(frame, energies):
-    # PREMIUM CHAKRA METER - Highly Visible
-    bar_w = 25  # Keep width same
-    bar_h = 50  # [FIX] Reduced height (was 65) to fit screen
-    gap = 5     # [FIX] Reduced gap (was 10)
-    x0 = 30
-    y0 = 130    # [FIX] Moved down (was 70) to make room for Indian Flag in Top Left
-    
-    for i, energy in enumerate(energies):
+# Shared gradient strips for bar / meter fills (keyed by color and length)
+gradient_cache = GradientCache()
+
+# Shared rasterized HUD labels (keyed by text, font, scale and stroke stack)
+text_cache = TextCache()
+
+# PREMIUM CHAKRA METER - Highly Visible
+CHAKRA_BAR_W = 25   # Keep width same
+CHAKRA_BAR_H = 50   # [FIX] Reduced height (was 65) to fit screen
+CHAKRA_BAR_GAP = 5  # [FIX] Reduced gap (was 10)
+CHAKRA_METER_X = 30
+CHAKRA_METER_Y = 130 # [FIX] Moved down (was 70) to make room for Indian Flag in Top Left
+
+def build_chakra_meter_layer(layer, w, h):
+    # Static chrome (glow, frame, names) - rendered once per resolution
+    bar_w, bar_h, gap = CHAKRA_BAR_W, CHAKRA_BAR_H, CHAKRA_BAR_GAP
+    x0, y0 = CHAKRA_METER_X, CHAKRA_METER_Y
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    for i, color in enumerate(CHAKRA_COLORS):
         y_top = y0 + i * (bar_h + gap)
-        color = CHAKRA_COLORS[i]
         
         # PREMIUM GLOW EFFECT - Outer aura
         for glow_i in range(4):
             alpha = 0.1 - (glow_i * 0.025)
             offset = 4 - glow_i
-            overlay_glow = frame.copy()
-            cv2.rectangle(overlay_glow, (x0 - offset, y_top - offset), 
-                         (x0 + bar_w + offset, y_top + bar_h + offset), color, -1)
-            cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+            layer.rect((x0 - offset, y_top - offset), (x0 + bar_w + offset, y_top + bar_h + offset), color, alpha=alpha)
         
         # Dark Background with Premium Border
-        cv2.rectangle(frame, (x0, y_top), (x0 + bar_w, y_top + bar_h),
-                      (15, 15, 20), -1)  # Very dark background
-        # Bright colored border
-        cv2.rectangle(frame, (x0, y_top), (x0 + bar_w, y_top + bar_h),
-                      color, 2)  # Thicker colored border
+        layer.rect((x0, y_top), (x0 + bar_w, y_top + bar_h), (15, 15, 20))  # Very dark background
+        layer.rect((x0, y_top), (x0 + bar_w, y_top + bar_h), color, thickness=2)  # Thicker colored border
+        
+        # Chakra Name - Black Border + Bright Yellow Text
+        text_y = y_top + int(bar_h * 0.4)
+        name = CHAKRA_NAMES[i].split()[0]
+        layer.text(name, (x0 + 35, text_y + 25), font, 0.45, (0, 0, 0), 3)
+        layer.text(name, (x0 + 35, text_y + 25), font, 0.45, (0, 255, 255), 1)
+
+chakra_meter_panel = PanelCache(CHAKRA_METER_X, CHAKRA_METER_Y - 20,
+                                CHAKRA_METER_X + 140, CHAKRA_METER_Y + 7 * (CHAKRA_BAR_H + CHAKRA_BAR_GAP))
+
+def draw_chakra_meter(frame, energies):
+    # Frame, glow and names come from the cached "chakra_meter" HUD layer.
+    # The fills and percentages are re-rendered only when a drawn fill height
+    # or percentage changes.
+    hud.compose(frame, ("chakra_meter",))
+    key = tuple((int(CHAKRA_BAR_H * e), int(e * 100)) for e in energies)
+    chakra_meter_panel.draw(frame, key, lambda img: render_chakra_meter(img, energies))
+
+def render_chakra_meter(frame, energies):
+    bar_w, bar_h, gap = CHAKRA_BAR_W, CHAKRA_BAR_H, CHAKRA_BAR_GAP
+    x0, y0 = CHAKRA_METER_X, CHAKRA_METER_Y
+    
+    for i, energy in enumerate(energies):
+        y_top = y0 + i * (bar_h + gap)
+        color = CHAKRA_COLORS[i]
                       
         # Filled Energy with GRADIENT
         filled_h = int(bar_h * energy)
         y_fill = y_top + (bar_h - filled_h)
         
-        # Draw gradient fill
-        for j in range(filled_h):
-            ratio = j / max(1, filled_h)
-            # Darken color at top, brighten at bottom
-            b, g, r = color
-            dark_factor = 0.5 + (0.5 * ratio)  # 0.5 to 1.0
-            gradient_color = (int(b * dark_factor), int(g * dark_factor), int(r * dark_factor))
-            cv2.line(frame, (x0 + 1, y_fill + j), (x0 + bar_w - 1, y_fill + j), gradient_color, 1)
+        # Draw gradient fill (cached strip)
+        # Darken color at top (0.5x), brighten at bottom (1.0x)
+        dark = tuple(c * 0.5 for c in color)
+        gradient_cache.fill(frame, x0 + 1, y_fill, dark, color, filled_h, bar_w - 1, vertical=True)
         
         # Inner glow on filled portion
         if filled_h > 0:
-            overlay_fill = frame.copy()
-            cv2.rectangle(overlay_fill, (x0 + 1, y_fill), (x0 + bar_w - 1, y_top + bar_h - 1),
-                         (255, 255, 255), -1)
-            cv2.addWeighted(overlay_fill, 0.15, frame, 0.85, 0, frame)
+            BlendRegion(frame).rect((x0 + 1, y_fill), (x0 + bar_w - 1, y_top + bar_h - 1),
+                                    (255, 255, 255)).apply(0.15)
                       
         # Percentage Text - Brighter and Bolder
         text_y = y_top + int(bar_h * 0.4)
-        # [FIX] Black Border for Contrast
-        cv2.putText(frame, f"{int(energy * 100)}%", (x0 + 35, text_y),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 4, cv2.LINE_AA)
-        # [FIX] Bright Yellow Text
-        cv2.putText(frame, f"{int(energy * 100)}%", (x0 + 35, text_y),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 255), 2, cv2.LINE_AA)
-        
-        # Chakra Name - Colored to match chakra
-        # [FIX] Black Border
-        cv2.putText(frame, CHAKRA_NAMES[i].split()[0], (x0 + 35, text_y + 25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 3, cv2.LINE_AA)
-        # [FIX] Bright Yellow Text (User Request)
-        cv2.putText(frame, CHAKRA_NAMES[i].split()[0], (x0 + 35, text_y + 25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1, cv2.LINE_AA)
+        # [FIX] Black Border for Contrast, Bright Yellow Text
+        text_cache.draw(frame, f"{int(energy * 100)}%", (x0 + 35, text_y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (((0, 0, 0), 4), ((0, 255, 255), 2)), cv2.LINE_AA)
 
 
 def generate_smart_coach_message(energies, mood_label, alignment_mode, gyan_active):
@@ -801,14 +852,14 @@ def generate_smart_coach_message(energies, mood_label, alignment_mode, gyan_acti
 
 
 def draw_gyan_sparkles(frame, center_x, center_y, radius):
-    overlay = frame.copy()
+    overlay = BlendRegion(frame)
     for _ in range(35):
         angle = random.uniform(0, 2 * math.pi)
         r = random.uniform(radius * 0.6, radius * 1.1)
         x = int(center_x + r * math.cos(angle))
         y = int(center_y + r * math.sin(angle))
-        cv2.circle(overlay, (x, y), random.randint(2, 4), (0, 215, 255), -1)
-    cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
+        overlay.circle((x, y), random.randint(2, 4), (0, 215, 255))
+    overlay.apply(0.8, 0.2)
 
 
 def draw_revolving_aura(frame, center_x, center_y, radius, t):
@@ -818,9 +869,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
-    cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
-    cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+    BlendRegion(frame).circle((center_x, center_y), radius, golden_color).apply(0.2)
     
     # Revolving particles
     num_particles = 8
@@ -881,55 +930,6 @@ class PostureAnalyzer:
         return score, label
 
 
-def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
-    """
-    Draws 'smart' tracking overlays:
-    - 21 hand points with connections
-    - Face mesh (contours)
-    - Dynamic style based on yoga_mode
-    """
-    if not yoga_mode:
-        # Subtle mode
-        hand_style = mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=1, circle_radius=1)
-        face_style = mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1, circle_radius=1)
-        conn_style = mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1)
-    else:
-        # "Extra Smart" Yoga Mode - Golden/High-tech look
-        # Gold BGR: (0, 215, 255)
-        hand_style = mp_drawing.DrawingSpec(color=(0, 215, 255), thickness=2, circle_radius=3)
-        face_style = mp_drawing.DrawingSpec(color=(0, 215, 255), thickness=1, circle_radius=1)
-        conn_style = mp_drawing.DrawingSpec(color=(0, 165, 255), thickness=2)
-
-    # Draw Hands
-    if hand_results.multi_hand_landmarks:
-        for hand_landmarks in hand_results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                frame,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                hand_style,
-                conn_style
-            )
-
-    # Draw Face Mesh
-    # Draw Face Mesh (Hidden for cleaner visuals, but tracking remains active)
-    # if face_results.multi_face_landmarks:
-    #     for face_landmarks in face_results.multi_face_landmarks:
-    #         mp_drawing.draw_landmarks(
-    #             frame,
-    #             face_landmarks,
-    #             mp_face.FACEMESH_TESSELATION,
-    #             landmark_drawing_spec=None,
-    #             connection_drawing_spec=mp_drawing.DrawingSpec(color=(100, 100, 100), thickness=1, circle_radius=1)
-    #         )
-    #         mp_drawing.draw_landmarks(
-    #             frame,
-    #             face_landmarks,
-    #             mp_face.FACEMESH_CONTOURS,
-    #             landmark_drawing_spec=None,
-    #             connection_drawing_spec=face_style
-    #         )
-
 def detect_namaste(hand_results):
     """
     Detects if two hands are present and close together (Namaste/Anjali gesture).
@@ -1052,11 +1052,8 @@ def draw_mudra_sidebar(frame, active_mudra):
     sidebar_w = 280 
     
     # --- Premium Glow Background ---
-    overlay = frame.copy()
-    
     # 1. Ultra Dark Glass Background (Almost Black with slight blue tint)
-    cv2.rectangle(overlay, (w - sidebar_w, 0), (w, h), (2, 2, 5), -1)
-    cv2.addWeighted(overlay, 0.95, frame, 0.05, 0, frame)
+    BlendRegion(frame).rect((w - sidebar_w, 0), (w, h), (2, 2, 5)).apply(0.95, 0.05)
     
     # 2. Glowing Left Border (Cyan/Gold Gradient Effect)
     # Stronger Glow
@@ -1064,9 +1061,7 @@ def draw_mudra_sidebar(frame, active_mudra):
         alpha = 0.15 - (i * 0.01)
         thickness = 30 - (i * 2)
         if thickness < 1: thickness = 1
-        overlay_glow = frame.copy()
-        cv2.line(overlay_glow, (w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), thickness)
-        cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+        BlendRegion(frame).line((w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), thickness).apply(alpha)
         
     # Solid thin line for sharpness
     cv2.line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), 2)
@@ -1102,9 +1097,7 @@ def draw_mudra_sidebar(frame, active_mudra):
             border_col = (0, 255, 255) # Yellow border
             
             # Glow effect for active item
-            overlay_item = frame.copy()
-            cv2.rectangle(overlay_item, (w - sidebar_w + 10, y - 25), (w - 10, y + 45), (0, 255, 255), -1)
-            cv2.addWeighted(overlay_item, 0.2, frame, 0.8, 0, frame)
+            BlendRegion(frame).rect((w - sidebar_w + 10, y - 25), (w - 10, y + 45), (0, 255, 255)).apply(0.2)
             
         # Background for item
         cv2.rectangle(frame, (w - sidebar_w + 10, y - 25), (w - 10, y + 45), bg_col, -1)
@@ -1160,9 +1153,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
-    cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
-    cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
+    BlendRegion(frame).circle((center_x, center_y), radius, golden_color).apply(0.2)
     
     # Revolving particles
     num_particles = 8
@@ -1223,6 +1214,16 @@ class PostureAnalyzer:
         return score, label
 
 
+# Hand skeleton styles, keyed by yoga_mode (built once, not per frame)
+SMART_HAND_STYLES = {
+    # Subtle mode
+    False: HandSkeleton(joint_color=(0, 255, 255), bone_color=(255, 255, 255),
+                        joint_radius=1, joint_thickness=1, bone_thickness=1),
+    # "Extra Smart" Yoga Mode - Glowing/High-tech look
+    True: HandSkeleton(joint_color=(0, 255, 0), bone_color=(50, 205, 50),
+                       joint_radius=3, joint_thickness=2, bone_thickness=2),
+}
+
 def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     """
     Draws 'smart' tracking overlays:
@@ -1230,27 +1231,14 @@ def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     - Face mesh (contours)
     - Dynamic style based on yoga_mode
     """
-    if not yoga_mode:
-        # Subtle mode
-        hand_style = mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=1, circle_radius=1)
-        face_style = mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1, circle_radius=1)
-        conn_style = mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1)
-    else:
-        # "Extra Smart" Yoga Mode - Glowing/High-tech look
-        hand_style = mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3)
-        face_style = mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=1, circle_radius=1)
-        conn_style = mp_drawing.DrawingSpec(color=(50, 205, 50), thickness=2)
+    skeleton = SMART_HAND_STYLES[bool(yoga_mode)]
+    h, w = frame.shape[:2]
 
     # Draw Hands
     if hand_results.multi_hand_landmarks:
         for hand_landmarks in hand_results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                frame,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                hand_style,
-                conn_style
-            )
+            points, visible = landmarks_to_pixels(hand_landmarks, w, h)
+            skeleton.draw(frame, points, visible)
 
     # Draw Face Mesh
     # Draw Face Mesh (Hidden for cleaner visuals, but tracking remains active)
@@ -1285,9 +1273,10 @@ def detect_namaste(hand_results):
     dist = math.sqrt((h1.x - h2.x)**2 + (h1.y - h2.y)**2)
     return dist < 0.20  # Relaxed threshold
 
-def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
+def mini_hand_strokes(cx, cy, mudra_name, scale=1.0):
     """
-    Draws a stylized colorful hand skeleton representing the mudra.
+    Geometry of the stylized colorful hand skeleton representing the mudra,
+    as (p1, p2, color) bones; joints sit at p2.
     cx, cy: Center of the visualization
     """
     # Colors for fingers (Thumb, Index, Middle, Ring, Pinky)
@@ -1359,144 +1348,167 @@ def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
         pts['ring_tip'] = (s*0.2, -s*1.8)
         pts['pinky_tip'] = (s*0.3, -s*1.6)
 
-    # Helper to draw line - REFINED
-    def dline(p1_name, p2_name, color):
+    # Bones: wrist -> finger base in white, base -> tip in the finger color
+    def bone(p1_name, p2_name, color):
         p1 = (int(cx + pts[p1_name][0]), int(cy + pts[p1_name][1]))
         p2 = (int(cx + pts[p2_name][0]), int(cy + pts[p2_name][1]))
+        return p1, p2, color
+
+    return [
+        bone('wrist', 'thumb_base', wrist_color), bone('thumb_base', 'thumb_tip', colors[0]),   # Thumb
+        bone('wrist', 'index_base', wrist_color), bone('index_base', 'index_tip', colors[1]),   # Index
+        bone('wrist', 'mid_base', wrist_color),   bone('mid_base', 'mid_tip', colors[2]),       # Middle
+        bone('wrist', 'ring_base', wrist_color),  bone('ring_base', 'ring_tip', colors[3]),     # Ring
+        bone('wrist', 'pinky_base', wrist_color), bone('pinky_base', 'pinky_tip', colors[4]),   # Pinky
+    ]
+
+def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
+    """Draws the mudra's mini hand straight onto the frame."""
+    for p1, p2, color in mini_hand_strokes(cx, cy, mudra_name, scale):
         # Thinner, crisp lines
         cv2.line(frame, p1, p2, color, 1, cv2.LINE_AA)
         # Glowing joints (small white center, colored rim)
         cv2.circle(frame, p2, 2, color, -1, cv2.LINE_AA)
         cv2.circle(frame, p2, 1, (255, 255, 255), -1, cv2.LINE_AA)
 
-    # Draw Connections
-    # Thumb
-    dline('wrist', 'thumb_base', wrist_color)
-    dline('thumb_base', 'thumb_tip', colors[0])
-    
-    # Index
-    dline('wrist', 'index_base', wrist_color)
-    dline('index_base', 'index_tip', colors[1])
-    
-    # Middle
-    dline('wrist', 'mid_base', wrist_color)
-    dline('mid_base', 'mid_tip', colors[2])
-    
-    # Ring
-    dline('wrist', 'ring_base', wrist_color)
-    dline('ring_base', 'ring_tip', colors[3])
-    
-    # Pinky
-    dline('wrist', 'pinky_base', wrist_color)
-    dline('pinky_base', 'pinky_tip', colors[4])
+def paint_mini_hand(layer, cx, cy, mudra_name, scale=1.0):
+    """Same as draw_mini_hand, painted on a Layer (for cached sidebar rows)."""
+    for p1, p2, color in mini_hand_strokes(cx, cy, mudra_name, scale):
+        layer.line(p1, p2, color, 1, line_type=cv2.LINE_AA)
+        layer.circle(p2, 2, color, line_type=cv2.LINE_AA)
+        layer.circle(p2, 1, (255, 255, 255), line_type=cv2.LINE_AA)
 
 
-def draw_mudra_sidebar(frame, active_mudra):
-    h, w, _ = frame.shape
-    sidebar_w = 280 
+SIDEBAR_W = 280
+
+def build_sidebar_layer(layer, w, h):
+    # Static sidebar chrome - rendered once per resolution
+    sidebar_w = SIDEBAR_W
     
     # Glassmorphism Background - HIGH VISIBILITY
-    # Optimized: Use ROI to avoid full frame copy
-    roi = frame[0:h, w-sidebar_w:w]
-    overlay = roi.copy()
     # Much lighter background (Dark Grey/Blue) for contrast
-    cv2.rectangle(overlay, (0, 0), (sidebar_w, h), (60, 70, 80), -1)
     # High alpha (0.85) to block out background noise
-    cv2.addWeighted(overlay, 0.85, roi, 0.15, 0, roi)
-    frame[0:h, w-sidebar_w:w] = roi
+    layer.rect((w - sidebar_w, 0), (w, h), (60, 70, 80), alpha=0.85)
     
     # Vertical Accent Line (Left Edge)
-    cv2.line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (100, 255, 100), 2, cv2.LINE_AA)
+    layer.line((w - sidebar_w, 0), (w - sidebar_w, h), (100, 255, 100), 2, line_type=cv2.LINE_AA)
+    
+    # Background Box for Instruction
+    box_y = 15
+    box_h = 90
+    layer.rect((w - sidebar_w + 5, box_y), (w - 5, box_y + box_h), (20, 30, 40)) # Dark BG
+    layer.rect((w - sidebar_w + 5, box_y), (w - 5, box_y + box_h), (0, 255, 255), thickness=1) # Border
+    
+    # Arrow pointing Left (towards Face/Nose)
+    arrow_tip = (w - sidebar_w - 15, box_y + 35)
+    arrow_base = (w - sidebar_w + 5, box_y + 35)
+    layer.arrow(arrow_base, arrow_tip, (0, 255, 255), 2, tip_length=0.3)
+    
+    # Title
+    layer.text("Mudra Guide", (w - sidebar_w + 20, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+MUDRA_ROWS = [
+    ("Gyan", "Wisdom"),
+    ("Prana", "Vitality"),
+    ("Apana", "Detox"),
+    ("Surya", "Fire/Wt"),
+    ("Varun", "Water"),
+    ("Anjali", "Prayer")
+]
+MUDRA_ROW_Y = 170 # [FIX] Moved Down to avoid title overlap (was 140)
+MUDRA_ROW_STEP = 55 # [FIX] Compacted spacing (was 65)
+
+# Pre-rendered sidebar rows, keyed by (name, active)
+mudra_row_sprites = {}
+
+def mudra_row_sprite(name, desc, active):
+    """
+    One sidebar row (background, highlight border, labels and mini hand) as a
+    sprite positioned relative to (w - SIDEBAR_W, row baseline y).
+    """
+    key = (name, active)
+    sprite = mudra_row_sprites.get(key)
+    if sprite is not None:
+        return sprite
+
+    # Local origin: sidebar edge at ox, row baseline at oy (the mini hand
+    # reaches ~30px above the baseline, the active border 3px left of the edge)
+    ox, oy = 3, 32
+    layer = Layer(SIDEBAR_W + ox, oy + 35)
+
+    # Item Background
+    # Default: visible but subtle
+    bg_col = (255, 255, 255)
+    bg_alpha = 0.15
+    text_col = (255, 255, 255) # Pure White
+    desc_col = (220, 220, 220) # Light Grey
+
+    if active:
+        # Active: Bright Green Highlight
+        bg_col = (50, 200, 50) # Green
+        bg_alpha = 0.6 # Stronger highlight
+        text_col = (255, 255, 255)
+        desc_col = (255, 255, 255)
+
+        # Glowing Left Border for active item - GREEN
+        layer.line((ox, oy - 20), (ox, oy + 30), (0, 255, 0), 5, line_type=cv2.LINE_AA)
+
+    layer.rect((ox + 2, oy - 20), (ox + SIDEBAR_W, oy + 30), bg_col, alpha=bg_alpha)
+
+    # Text
+    layer.text(name, (ox + 20, oy), cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_col, 1)
+    layer.text(desc, (ox + 20, oy + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, desc_col, 1)
+
+    # Mini Hand Visual
+    paint_mini_hand(layer, ox + SIDEBAR_W - 60, oy + 5, name, scale=0.6)
+
+    sprite = layer.to_sprite()
+    sprite.x -= ox
+    sprite.y -= oy
+    mudra_row_sprites[key] = sprite
+    return sprite
+
+def draw_mudra_sidebar(frame, active_mudra, now):
+    h, w, _ = frame.shape
+    sidebar_w = SIDEBAR_W
+    # Background, accent line, instruction box and title: cached HUD layer;
+    # rows and the info panel are cached sprites
+    hud.compose(frame, ("sidebar",))
     
     # [NEW] Animated Instruction (Premium UI)
     # "Touch nose to enable breathing exercise please touch heart rate sensor at this time"
-    import time
-    pulse = abs(math.sin(time.time() * 3)) # Smooth pulse
+    pulse = abs(math.sin(now * 3)) # Smooth pulse
     
     # Dynamic Colors & Scale
     text_color = (0, 255, 255) # Cyan
     if pulse > 0.7: text_color = (0, 215, 255) # Gold peak
     
-    scale = 0.45 + (0.05 * pulse) # Subtle pop (0.45 to 0.50)
+    # Subtle pop (0.45 to 0.50), in 0.01 steps so the labels stay cached
+    scale = round(0.45 + (0.05 * pulse), 2)
     
-    # Background Box for Visibility
     box_y = 15
-    box_h = 90 # Increased height (was 75)
-    cv2.rectangle(frame, (w - sidebar_w + 5, box_y), (w - 5, box_y + box_h), (20, 30, 40), -1) # Dark BG
-    cv2.rectangle(frame, (w - sidebar_w + 5, box_y), (w - 5, box_y + box_h), (0, 255, 255), 1) # Border
-    
-    # [NEW] Arrow pointing Left (towards Face/Nose)
-    # Tip at (w - sidebar_w - 10, box_y + 30)
-    arrow_tip = (w - sidebar_w - 15, box_y + 35)
-    arrow_base = (w - sidebar_w + 5, box_y + 35)
-    cv2.arrowedLine(frame, arrow_base, arrow_tip, (0, 255, 255), 2, tipLength=0.3)
     
     # Text Lines (Centered in Sidebar)
     font = cv2.FONT_HERSHEY_SIMPLEX
     
     # Line 1: "Touch Nose to Enable"
-    cv2.putText(frame, "Touch Nose to Enable", (w - sidebar_w + 20, box_y + 25), 
-                font, scale, (255, 255, 255), 1, cv2.LINE_AA)
+    text_cache.draw(frame, "Touch Nose to Enable", (w - sidebar_w + 20, box_y + 25),
+                    font, scale, (((255, 255, 255), 1),), cv2.LINE_AA)
                 
     # Line 2: "Breathing Exercise"
-    cv2.putText(frame, "Breathing Exercise", (w - sidebar_w + 35, box_y + 50), # Spaced out
-                font, scale, text_color, 1, cv2.LINE_AA)
+    text_cache.draw(frame, "Breathing Exercise", (w - sidebar_w + 35, box_y + 50), # Spaced out
+                    font, scale, ((text_color, 1),), cv2.LINE_AA)
                 
     # Line 3: "Touch Heart Sensor"
-    cv2.putText(frame, "Touch Heart Sensor", (w - sidebar_w + 30, box_y + 75), # Spaced out
-                font, scale, (200, 200, 200), 1, cv2.LINE_AA)
+    text_cache.draw(frame, "Touch Heart Sensor", (w - sidebar_w + 30, box_y + 75), # Spaced out
+                    font, scale, (((200, 200, 200), 1),), cv2.LINE_AA)
     
-    # Title
-    cv2.putText(frame, "Mudra Guide", (w - sidebar_w + 20, 135), # Moved down significantly (was 90)
-                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
-    
-    mudras = [
-        ("Gyan", "Wisdom"),
-        ("Prana", "Vitality"),
-        ("Apana", "Detox"),
-        ("Surya", "Fire/Wt"),
-        ("Varun", "Water"),
-        ("Anjali", "Prayer")
-    ]
-    
-    y = 170 # [FIX] Moved Down to avoid title overlap (was 140)
-    for name, desc in mudras:
-        is_active = (active_mudra and name in active_mudra)
-        
-        # Item Background
-        # Default: visible but subtle
-        bg_col = (255, 255, 255)
-        bg_alpha = 0.15
-        text_col = (255, 255, 255) # Pure White
-        desc_col = (220, 220, 220) # Light Grey
-        
-        if is_active:
-            # Active: Bright Green Highlight
-            bg_col = (50, 200, 50) # Green
-            bg_alpha = 0.6 # Stronger highlight
-            text_col = (255, 255, 255)
-            desc_col = (255, 255, 255)
-            
-        # Glowing Left Border for active item - GREEN
-            cv2.line(frame, (w - sidebar_w, y - 20), (w - sidebar_w, y + 30), (0, 255, 0), 5, cv2.LINE_AA)
-            
-        # Draw Item Background
-        overlay_item = frame.copy()
-        cv2.rectangle(overlay_item, (w - sidebar_w + 2, y - 20), (w, y + 30), bg_col, -1)
-        cv2.addWeighted(overlay_item, bg_alpha, frame, 1 - bg_alpha, 0, frame)
-            
-        # Text
-        cv2.putText(frame, f"{name}", (w - sidebar_w + 20, y), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_col, 1, cv2.LINE_AA)
-        cv2.putText(frame, f"{desc}", (w - sidebar_w + 20, y + 20), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, desc_col, 1, cv2.LINE_AA)
-        
-        # Draw Mini Hand Visual
-        mx = w - 60
-        my = y + 5
-        draw_mini_hand(frame, mx, my, name, scale=0.6)
-            
-        y += 55 # [FIX] Compacted spacing (was 65)
+    y = MUDRA_ROW_Y
+    for name, desc in MUDRA_ROWS:
+        is_active = bool(active_mudra and name in active_mudra)
+        sprite = mudra_row_sprite(name, desc, is_active)
+        blit_premultiplied(frame, sprite, w - sidebar_w + sprite.x, y + sprite.y)
+        y += MUDRA_ROW_STEP
 
     # Draw Info Panel
     # If active mudra, show its info. Else show Default Guide.
@@ -1560,36 +1572,38 @@ MUDRA_INFO = {
     ]
 }
 
-def draw_mudra_info_panel(frame, mudra_name=None):
-    """
-    Draws a stylish info panel vertically stacked BELOW the Anjali mudra in the sidebar.
-    """
-    h, w, _ = frame.shape
-    sidebar_w = 280
+# Pre-rendered info panels, keyed by mudra name (None = default guide)
+mudra_info_sprites = {}
+
+def mudra_info_sprite(mudra_name=None):
+    """The info panel as a sprite positioned relative to its top-left corner."""
+    key = mudra_name if mudra_name in MUDRA_INFO else None
+    sprite = mudra_info_sprites.get(key)
+    if sprite is not None:
+        return sprite
+
+    sidebar_w = SIDEBAR_W
     
     # Panel Size - Fit within sidebar width
     panel_w = sidebar_w - 20 # 260
     panel_h = 120 # [FIX] Increased height (was 110)
-    
-    # Position: Inside Sidebar Column, Below Anjali
-    # Anjali ends at ~500. Next slot is safe at 510.
-    x = w - sidebar_w + 10
-    y = 510 # [FIX] Moved UP significantly (was 580) to fit screen
+
+    # Local origin leaves room for the 2px border
+    x, y = 2, 2
+    layer = Layer(panel_w + 5, panel_h + 5)
     
     # Background
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (x, y), (x + panel_w, y + panel_h), (40, 50, 60), -1)
-    cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
+    layer.rect((x, y), (x + panel_w, y + panel_h), (40, 50, 60), alpha=0.9)
     
     # Border
-    cv2.rectangle(frame, (x, y), (x + panel_w, y + panel_h), (0, 255, 0), 2)
+    layer.rect((x, y), (x + panel_w, y + panel_h), (0, 255, 0), thickness=2)
     
     lines = []
     title_color = (0, 255, 0)
     
-    if mudra_name and mudra_name in MUDRA_INFO:
+    if key is not None:
         # Specific Mudra Info
-        lines = MUDRA_INFO[mudra_name]
+        lines = MUDRA_INFO[key]
     else:
         # Default Guide
         lines = [
@@ -1613,14 +1627,11 @@ def draw_mudra_info_panel(frame, mudra_name=None):
             col = (200, 255, 200)
             scale = 0.45 # Slightly larger header
             thick = 1
-            cv2.putText(frame, line, (x + 15, py), 
-                        cv2.FONT_HERSHEY_SIMPLEX, scale, col, thick, cv2.LINE_AA)
+            layer.text(line, (x + 15, py), cv2.FONT_HERSHEY_SIMPLEX, scale, col, thick)
         elif line.startswith("Hint:"):
             # [FIX] Bright Yellow with Border for Hint
-            cv2.putText(frame, line, (x + 15, py), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3, cv2.LINE_AA) # Border
-            cv2.putText(frame, line, (x + 15, py), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1, cv2.LINE_AA) # Yellow
+            layer.text(line, (x + 15, py), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3) # Border
+            layer.text(line, (x + 15, py), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1) # Yellow
         else:
             # Keyword Highlighting Logic
             parts = line.split('**')
@@ -1634,14 +1645,32 @@ def draw_mudra_info_panel(frame, mudra_name=None):
                     curr_col = (0, 255, 255) 
                     curr_thick = 1 # Thinner for smaller text
                 
-                cv2.putText(frame, part, (px, py), 
-                            cv2.FONT_HERSHEY_SIMPLEX, scale, curr_col, curr_thick, cv2.LINE_AA)
+                layer.text(part, (px, py), cv2.FONT_HERSHEY_SIMPLEX, scale, curr_col, curr_thick)
                 
                 (txt_w, _), _ = cv2.getTextSize(part, cv2.FONT_HERSHEY_SIMPLEX, scale, curr_thick)
                 px += txt_w
                 
         py += 20 # [FIX] Tighter spacing (was 25)
 
+    sprite = layer.to_sprite()
+    sprite.x -= x
+    sprite.y -= y
+    mudra_info_sprites[key] = sprite
+    return sprite
+
+def draw_mudra_info_panel(frame, mudra_name=None):
+    """
+    Draws a stylish info panel vertically stacked BELOW the Anjali mudra in the sidebar.
+    """
+    h, w, _ = frame.shape
+    
+    # Position: Inside Sidebar Column, Below Anjali
+    # Anjali ends at ~500. Next slot is safe at 510.
+    x = w - SIDEBAR_W + 10
+    y = 510 # [FIX] Moved UP significantly (was 580) to fit screen
+    
+    sprite = mudra_info_sprite(mudra_name)
+    blit_premultiplied(frame, sprite, x + sprite.x, y + sprite.y)
 
 class AnalyticsTracker:
     def __init__(self):
@@ -1650,10 +1679,9 @@ class AnalyticsTracker:
         self.posture_samples = []
         self.chakra_time = [0.0] * 7
         self.last_chakra_idx = None
-        self.last_chakra_time = time.time()
+        self.last_chakra_time = frame_clock.now
 
-    def record_chakra(self, idx):
-        now = time.time()
+    def record_chakra(self, idx, now):
         if self.last_chakra_idx is not None:
             self.chakra_time[self.last_chakra_idx] += now - self.last_chakra_time
         self.last_chakra_idx = idx
@@ -1679,137 +1707,6 @@ class AnalyticsTracker:
 
 
 
-class HeartRateMonitor:
-    def __init__(self, baud_rate=115200):
-        self.ser = None
-        self.heart_rate = 0
-        self.spo2 = 0
-        self.last_beat_time = 0
-        self.connected = False
-        self.buffer = ""
-        self.baud_rate = baud_rate
-        self.beat_detected_flag = False # New flag for visualizer
-        self.hr_history = [] # History for stability analysis
-        
-        # [FIX] Reconnection Logic
-        self.last_data_time = time.time()
-        self.last_reconnect_attempt = 0
-        
-        self.connect()
-
-    def connect(self):
-        try:
-            if self.connected and self.ser:
-                self.ser.close()
-            
-            # Auto-detect Arduino
-            ports = list(serial.tools.list_ports.comports())
-            # print(f"[DEBUG] Found ports: {[p.description for p in ports]}") # DEBUG PRINT
-            
-            arduino_port = None
-            for p in ports:
-                # Added "Serial" generic match for some clones
-                if "Arduino" in p.description or "CH340" in p.description or "USB Serial" in p.description or "Serial" in p.description:
-                    arduino_port = p.device
-                    break
-            
-            if arduino_port:
-                self.ser = serial.Serial(arduino_port, self.baud_rate, timeout=0.1)
-                self.connected = True
-                self.last_data_time = time.time() # Reset timeout timer
-                print(f"[INFO] Heart Rate Sensor connected on {arduino_port}")
-            else:
-                # print("[WARN] No Arduino found for Heart Rate Sensor.")
-                self.connected = False
-        except Exception as e:
-            print(f"[ERROR] Connection failed: {e}")
-            self.connected = False
-
-    def update(self):
-        self.beat_detected_flag = False # Reset flag each frame
-        
-        # [FIX] Auto-Reconnection Logic
-        if not self.connected:
-            if time.time() - self.last_reconnect_attempt > 2.0:
-                self.last_reconnect_attempt = time.time()
-                # print("[INFO] Attempting to reconnect sensor...")
-                self.connect()
-            return
-
-        # [FIX] Timeout Detection (Sensor Freeze)
-        # If no data received for 5 seconds, assume connection is dead
-        if time.time() - self.last_data_time > 5.0:
-            print("[WARN] Sensor timeout (no data for 5s). Resetting connection...")
-            self.connected = False
-            if self.ser:
-                try:
-                    self.ser.close()
-                except:
-                    pass
-            self.ser = None
-            return
-
-        try:
-            while self.ser.in_waiting:
-                char = self.ser.read().decode('utf-8', errors='ignore')
-                if char == '\n':
-                    self.parse_data(self.buffer)
-                    self.buffer = ""
-                    self.last_data_time = time.time() # [FIX] Update timestamp
-                else:
-                    self.buffer += char
-        except Exception as e:
-            print(f"[WARN] Serial read error: {e}")
-            self.connected = False
-            if self.ser:
-                try:
-                    self.ser.close()
-                except:
-                    pass
-            self.ser = None
-
-    def parse_data(self, line):
-        line = line.strip()
-        if line == "BEAT":
-            self.last_beat_time = time.time()
-            self.beat_detected_flag = True
-        elif line.startswith("HR:"):
-            # Format: HR:75;SpO2:98
-            try:
-                parts = line.split(';')
-                for part in parts:
-                    if "HR:" in part:
-                        raw_val = float(part.split(':')[1])
-                        
-                        # [ACCURACY MODE] Direct Passthrough
-                        # Trust the Arduino's sophisticated processing.
-                        
-                        # [FIX] Handle "0" from Arduino immediately
-                        if raw_val == 0:
-                            self.heart_rate = 0
-                            self.spo2 = 0
-                            self.hr_history = []
-                        elif 55 < raw_val < 115:
-                            self.heart_rate = raw_val
-                            self.last_beat_time = time.time()
-                        
-                    if "SpO2:" in part:
-                        val = float(part.split(':')[1])
-                        self.spo2 = min(val, 100.0) # Clamp to 100%
-            except:
-                pass
-
-    def get_data(self):
-        # TIMEOUT LOGIC: If no beat for 3.0 seconds (was 1.5), reset data (Synced with Arduino)
-        # This ensures "Instant Reset" in the UI but allows for slower heart rates.
-        if time.time() - self.last_beat_time > 3.0:
-            self.heart_rate = 0
-            self.spo2 = 0
-            self.hr_history = [] # Clear history
-            self.beat_detected_flag = False
-            
-        return self.heart_rate, self.spo2, self.last_beat_time, self.beat_detected_flag, self.hr_history
-
 class PulseWaveVisualizer:
     def __init__(self):
         self.data = [0.0] * 100
@@ -1862,15 +1759,13 @@ class MindWaveVisualizer:
         self.data = [0.0] * 100
         self.phase = 0.0
         self.current_state = "Neutral"
-        self.state_timer = 0
+        self.state_timer = IntervalTimer(MIND_STATE_SECS)
         
-    def update(self, hr, hr_history):
+    def update(self, hr, hr_history, now):
         self.data.pop(0)
         
         # Determine State (with Hysteresis/Smoothing)
-        self.state_timer += 1
-        if self.state_timer > 30: # Only update state every ~1 second (30 frames)
-            self.state_timer = 0
+        if self.state_timer.ready(now): # Only update state every ~1 second
             variance = 0
             if len(hr_history) > 5:
                 variance = np.var(hr_history)
@@ -1961,13 +1856,13 @@ class KumbhakaTracker:
         self.prana_level = 0.0 # 0 to 100
         self.is_holding = False
         self.max_prana = 100.0
-        self.charge_rate = 0.8 # How fast it fills per frame
-        self.decay_rate = 2.0  # How fast it drops when breathing
+        self.charge_rate = 0.8 * TUNED_FPS # How fast it fills (% per second)
+        self.decay_rate = 2.0 * TUNED_FPS  # How fast it drops when breathing (% per second)
         
-    def update(self, current_hr, is_touching_nose=False):
+    def update(self, current_hr, is_touching_nose=False, dt=1.0 / SIM_HZ):
         if current_hr <= 10: # Ignore noise/zeros
             self.is_holding = False
-            self.prana_level = max(0, self.prana_level - self.decay_rate)
+            self.prana_level = max(0, self.prana_level - self.decay_rate * dt)
             return self.prana_level, self.is_holding
             
         self.hr_buffer.append(current_hr)
@@ -1984,10 +1879,10 @@ class KumbhakaTracker:
         # Logic: Hold ONLY if Nose Touch Detected (User Request)
         if is_touching_nose: 
             self.is_holding = True
-            self.prana_level = min(self.max_prana, self.prana_level + self.charge_rate)
+            self.prana_level = min(self.max_prana, self.prana_level + self.charge_rate * dt)
         else:
             self.is_holding = False
-            self.prana_level = max(0, self.prana_level - self.decay_rate)
+            self.prana_level = max(0, self.prana_level - self.decay_rate * dt)
             
         return self.prana_level, self.is_holding
 
@@ -2019,9 +1914,7 @@ def draw_kumbhaka_bar(frame, prana_level, is_holding):
         
         # Glow Effect
         if is_holding:
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (x, y), (x + fill_w, y + bar_h), (255, 255, 255), -1)
-            cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
+            BlendRegion(frame).rect((x, y), (x + fill_w, y + bar_h), (255, 255, 255)).apply(0.3)
             
     # Text
     status = "KUMBHAKA ACTIVE - CHARGING PRANA" if is_holding else "Releasing..."
@@ -2031,31 +1924,37 @@ def draw_kumbhaka_bar(frame, prana_level, is_holding):
     cv2.putText(frame, f"{int(prana_level)}%", (x + bar_w + 10, y + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 200, 0), 2)
 
 # --- ELEMENTAL MASTERY EFFECTS ---
+PARTICLE_CAPACITY = 512
+PARTICLE_BUDGET_MS = 2.0 # Per-frame draw budget for each particle engine
+SUN_ICON_SIZE = 90
+BRAIN_ICON_SIZE = 80
+
+# Shared cache of pre-scaled, premultiplied image sprites (sun, brain, Om)
+sprite_cache = SpriteCache()
+
 class ElementalEffects:
     def __init__(self):
-        self.particles = [] # List of [x, y, vx, vy, life, type, color]
-        self.max_particles = 100
-        
-        # Load Brain Image for Gyan Mudra
-        self.brain_img = None
-        if os.path.exists("brain_glow.png"):
-            self.brain_img = cv2.imread("brain_glow.png", cv2.IMREAD_UNCHANGED)
-            # Ensure alpha
-            if self.brain_img is not None and self.brain_img.shape[2] != 4:
-                self.brain_img = cv2.cvtColor(self.brain_img, cv2.COLOR_BGR2BGRA)
-        else:
+        # Struct-of-arrays particles; one accumulation layer, one blend per frame
+        self.particles = ParticleEngine(capacity=PARTICLE_CAPACITY, budget_ms=PARTICLE_BUDGET_MS)
+        self.particles.add_kind("fire", cap=150, decay=0.05, draw_fn=self._draw_fire)
+        self.particles.add_kind("water", cap=150, decay=0.05, draw_fn=self._draw_water)
+        self.particles.add_kind("nature", cap=150, decay=0.05, draw_fn=self._draw_nature)
+        self.now = 0.0
+        self.glow = True # Extra glow circles around the icons (render quality tier)
+        
+        # Brain (Gyan Mudra) and Sun (Surya Mudra) icons live in the shared
+        # sprite cache: premultiplied and pre-scaled to the sizes drawn below
+        self.sprites = sprite_cache
+        if not self.sprites.load("brain", "brain_glow.png"):
             print("[WARN] brain_glow.png not found for Gyan Mudra effect.")
-        
-        # Load Sun Image for Surya Mudra
-        self.sun_img = None
-        if os.path.exists("sun_glow.png"):
-            self.sun_img = cv2.imread("sun_glow.png", cv2.IMREAD_UNCHANGED)
-            if self.sun_img is not None and self.sun_img.shape[2] != 4:
-                self.sun_img = cv2.cvtColor(self.sun_img, cv2.COLOR_BGR2BGRA)
-        else:
+        if not self.sprites.load("sun", "sun_glow.png"):
             print("[WARN] sun_glow.png not found for Surya Mudra effect.")
+        # Warm the cache so the first mudra frame doesn't pay for the resize
+        for name, size in (("brain", BRAIN_ICON_SIZE), ("sun", SUN_ICON_SIZE)):
+            if self.sprites.has(name):
+                self.sprites.get(name, size)
         
-    def update_and_draw(self, frame, mudra_name, hand_landmarks_list, face_landmarks):
+    def update_and_draw(self, frame, mudra_name, hand_landmarks_list, face_landmarks, now):
         h, w, _ = frame.shape
         
         # 1. Spawn Particles based on Mudra
@@ -2070,48 +1969,42 @@ class ElementalEffects:
             # [FIX] Replaced Book with Glowing Brain in Palm
             self._draw_glowing_brain(frame, hand_landmarks_list, w, h)
             
-        # 2. Update & Draw Particles
-        new_particles = []
-        for p in self.particles:
-            x, y, vx, vy, life, p_type, col = p
-            
-            # Physics
-            x += vx
-            y += vy
-            life -= 0.05
-            
-            # Render
-            if life > 0:
-                alpha = life
-                overlay = frame.copy()
-                
-                if p_type == "fire":
-                    # Rise up, flicker
-                    vy -= 0.5 
-                    radius = int(life * 15)
-                    cv2.circle(overlay, (int(x), int(y)), radius, col, -1)
-                    cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
-                    
-                elif p_type == "water":
-                    # Rise slowly, wobble
-                    vy = -2 + math.sin(time.time() * 10 + x) 
-                    radius = int(life * 10)
-                    cv2.circle(overlay, (int(x), int(y)), radius, col, 1) # Bubble
-                    cv2.circle(overlay, (int(x - radius*0.3), int(y - radius*0.3)), int(radius*0.2), (255, 255, 255), -1) # Highlight
-                    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
-                    
-                elif p_type == "nature":
-                    # Float around
-                    vx = math.sin(time.time() * 5 + y*0.1) * 2
-                    vy = math.cos(time.time() * 5 + x*0.1) * 2
-                    radius = int(life * 8)
-                    # Draw Leaf shape (ellipse)
-                    cv2.ellipse(overlay, (int(x), int(y)), (radius, radius//2), int(time.time()*100), 0, 360, col, -1)
-                    cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
-
-                new_particles.append([x, y, vx, vy, life, p_type, col])
-                
-        self.particles = new_particles
+        # 2. Update & Draw Particles (vectorised physics)
+        eng = self.particles
+        eng.integrate()
+        n = eng.count
+        x, y = eng.x[:n], eng.y[:n]
+        vx, vy = eng.vx[:n], eng.vy[:n]
+        
+        # Fire: Rise up, flicker
+        fire = eng.mask("fire")
+        vy[fire] -= 0.5
+        # Water: Rise slowly, wobble
+        water = eng.mask("water")
+        vy[water] = -2 + np.sin(now * 10 + x[water])
+        # Nature: Float around
+        nature = eng.mask("nature")
+        vx[nature] = np.sin(now * 5 + y[nature] * 0.1) * 2
+        vy[nature] = np.cos(now * 5 + x[nature] * 0.1) * 2
+        
+        eng.compact()
+        self.now = now
+        eng.draw(frame)
+
+    def _draw_fire(self, layer, x, y, vx, vy, life, size, col):
+        layer.circles(x.astype(np.int32), y.astype(np.int32), (life * 15).astype(np.int32), col, 0.5)
+
+    def _draw_water(self, layer, x, y, vx, vy, life, size, col):
+        radius = (life * 10).astype(np.int32)
+        layer.circles(x.astype(np.int32), y.astype(np.int32), radius, col, 0.6, 1) # Bubbles
+        white = np.broadcast_to(np.uint8(255), col.shape)
+        layer.circles((x - radius * 0.3).astype(np.int32), (y - radius * 0.3).astype(np.int32),
+                      (radius * 0.2).astype(np.int32), white, 0.6) # Highlights
+
+    def _draw_nature(self, layer, x, y, vx, vy, life, size, col):
+        # Draw Leaf shapes (ellipses)
+        radius = (life * 8).astype(np.int32)
+        layer.ellipses(x.astype(np.int32), y.astype(np.int32), radius, radius // 2, int(self.now*100), col, 0.7)
 
     def _spawn_fire(self, hand_list, w, h):
         # [DEPRECATED] Replaced by Sun Image
@@ -2125,7 +2018,7 @@ class ElementalEffects:
             if random.random() < 0.2:
                 # Water Colors: Blue, Cyan, White
                 col = random.choice([(255, 0, 0), (255, 255, 0), (255, 255, 255)])
-                self.particles.append([cx + random.randint(-40, 40), cy, 0, 0, 1.0, "water", col])
+                self.particles.spawn("water", cx + random.randint(-40, 40), cy, color=col)
 
     def _spawn_nature(self, hand_list, w, h):
         if not hand_list: return
@@ -2135,10 +2028,10 @@ class ElementalEffects:
             if random.random() < 0.2:
                 # Nature Colors: Green, Lime
                 col = random.choice([(0, 255, 0), (50, 205, 50), (0, 255, 127)])
-                self.particles.append([cx, cy, 0, 0, 1.0, "nature", col])
+                self.particles.spawn("nature", cx, cy, color=col)
     
     def _draw_glowing_sun(self, frame, hand_list, w, h):
-        if not hand_list or self.sun_img is None: return
+        if not hand_list or not self.sprites.has("sun"): return
         
         for hand_lm in hand_list:
             # Calculate Palm Center
@@ -2149,7 +2042,7 @@ class ElementalEffects:
             cy = int((wrist.y + middle_mcp.y) / 2 * h)
             
             # Size of Sun Icon
-            size = 90
+            size = SUN_ICON_SIZE
             x1 = cx - size // 2
             y1 = cy - size // 2
             x2 = x1 + size
@@ -2158,27 +2051,15 @@ class ElementalEffects:
             # Bounds Check
             if x1 < 0 or y1 < 0 or x2 >= w or y2 >= h: continue
             
-            # Resize Sun
-            sun_resized = cv2.resize(self.sun_img, (size, size))
-            
-            # Alpha Blending
-            roi = frame[y1:y2, x1:x2]
-            b_b, b_g, b_r, b_a = cv2.split(sun_resized)
-            mask = b_a / 255.0
-            inv_mask = 1.0 - mask
-            
-            for c in range(3):
-                roi[:, :, c] = (mask * sun_resized[:, :, c] + inv_mask * roi[:, :, c])
-                
-            frame[y1:y2, x1:x2] = roi
+            # Pre-scaled premultiplied sprite, one integer blend over the ROI
+            self.sprites.draw(frame, "sun", cx, cy, size)
             
             # Add extra glow (Yellow)
-            overlay = frame.copy()
-            cv2.circle(overlay, (cx, cy), size // 2 + 15, (0, 255, 255), -1) 
-            cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
+            if self.glow:
+                BlendRegion(frame).circle((cx, cy), size // 2 + 15, (0, 255, 255)).apply(0.4)
 
     def _draw_glowing_brain(self, frame, hand_list, w, h):
-        if not hand_list or self.brain_img is None: return
+        if not hand_list or not self.sprites.has("brain"): return
         
         for hand_lm in hand_list:
             # Calculate Palm Center (Approx between Wrist 0 and Middle MCP 9)
@@ -2189,7 +2070,7 @@ class ElementalEffects:
             cy = int((wrist.y + middle_mcp.y) / 2 * h)
             
             # Size of Brain Icon
-            size = 80
+            size = BRAIN_ICON_SIZE
             x1 = cx - size // 2
             y1 = cy - size // 2
             x2 = x1 + size
@@ -2198,40 +2079,23 @@ class ElementalEffects:
             # Bounds Check
             if x1 < 0 or y1 < 0 or x2 >= w or y2 >= h: continue
             
-            # Resize Brain
-            brain_resized = cv2.resize(self.brain_img, (size, size))
-            
-            # Alpha Blending
-            roi = frame[y1:y2, x1:x2]
-            
-            # Separate channels
-            b_b, b_g, b_r, b_a = cv2.split(brain_resized)
-            
-            # Create mask
-            mask = b_a / 255.0
-            inv_mask = 1.0 - mask
-            
-            # Blend
-            for c in range(3):
-                roi[:, :, c] = (mask * brain_resized[:, :, c] + inv_mask * roi[:, :, c])
-                
-            frame[y1:y2, x1:x2] = roi
+            # Pre-scaled premultiplied sprite, one integer blend over the ROI
+            self.sprites.draw(frame, "brain", cx, cy, size)
             
             # Add extra glow (simple circle behind)
-            overlay = frame.copy()
-            cv2.circle(overlay, (cx, cy), size // 2 + 10, (255, 255, 0), -1) # Cyan/Yellow glow
-            cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
+            if self.glow:
+                BlendRegion(frame).circle((cx, cy), size // 2 + 10, (255, 255, 0)).apply(0.3) # Cyan/Yellow glow
 
 elemental_effects = ElementalEffects()
 
 # --- THIRD EYE INTERFACE ---
 class ThirdEyeController:
     def __init__(self):
-        self.dwell_time = 0
+        self.dwell = Debouncer(on_secs=THIRD_EYE_DWELL_SECS)
         self.target = None # "Left", "Right", None
         self.beam_color = (255, 0, 255) # Purple default
         
-    def update_and_draw(self, frame, face_landmarks, gaze_x, chakra_energies):
+    def update_and_draw(self, frame, face_landmarks, gaze_x, chakra_energies, now):
         if not face_landmarks: return
         
         h, w, _ = frame.shape
@@ -2260,14 +2124,12 @@ class ThirdEyeController:
             current_target = "Right"
             
         # Dwell Logic
-        if current_target and current_target == self.target:
-            self.dwell_time += 1
-        else:
-            self.dwell_time = 0
+        if current_target != self.target:
+            self.dwell.reset()
             self.target = current_target
             
-        # Action Trigger (Dwell > 30 frames ~ 1 sec)
-        is_locked = self.dwell_time > 20
+        # Action Trigger (gaze held on the same zone for THIRD_EYE_DWELL_SECS)
+        is_locked = self.dwell.update(current_target is not None, now)
         
         # Visuals
         # ALWAYS draw the Divine Glow at Third Eye (Forehead)
@@ -2283,9 +2145,7 @@ class ThirdEyeController:
         cv2.circle(frame, (fx, fy), 20, glow_color, 1)
         
         # Add a "Light" overlay for bloom
-        overlay = frame.copy()
-        cv2.circle(overlay, (fx, fy), 40, glow_color, -1)
-        cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
+        BlendRegion(frame).circle((fx, fy), 40, glow_color).apply(0.3)
 
         # Only perform actions if there is a target (Left or Right)
         if current_target:
@@ -2313,38 +2173,58 @@ third_eye = ThirdEyeController()
 class MultiGraphVisualizer:
     def __init__(self, max_len=100):
         self.max_len = max_len
-        self.hrv_data = [0.0] * max_len
-        self.prana_data = [0.0] * max_len
-        self.focus_data = [0.0] * max_len
-        self.hrv_index_data = [0.0] * max_len # [NEW] HRV Index
-        self.pulse_data = [0.0] * max_len
+        self.hrv_data = RingSeries(max_len)
+        self.prana_data = RingSeries(max_len)
+        self.focus_data = RingSeries(max_len)
+        self.hrv_index_data = RingSeries(max_len) # [NEW] HRV Index
+        self.pulse_data = RingSeries(max_len)
         self.phase = 0.0
-        
-    def update(self, hr, hr_history, spo2, posture_score, beat_detected, avg_energy=0.5, hrv_val=50.0):
+        # Graphs scroll at GRAPH_SAMPLE_HZ whatever the render FPS
+        self.sampler = FixedTimestep(GRAPH_SAMPLE_HZ, max_steps=max_len)
+        self.pending_beats = 0
+        self.resolution = 1.0 # Fraction of samples plotted (render quality tier)
+        
+    def update(self, hr, hr_history, spo2, posture_score, beats, avg_energy=0.5, hrv_val=50.0, now=None, spectral=None):
+        # beats: number of beats since the last update (a bool counts as 0 / 1).
+        # spectral: frequency-domain HRV (hrv.spectral_hrv) once enough beats are in
+        # Queue them so each one stamps its own spike, one per sample, however
+        # many arrive between frames (capped so a backlog can't spike for seconds)
+        self.pending_beats = min(self.pending_beats + int(beats), 8)
+        for _ in range(self.sampler.advance(now)):
+            beat = self.pending_beats > 0
+            if beat:
+                self.pending_beats -= 1
+            self._push_sample(hr, spo2, beat, avg_energy, hrv_val, spectral)
+
+    def _push_sample(self, hr, spo2, beat_detected, avg_energy, hrv_val, spectral=None):
         self.phase += 0.2 # Faster animation
         
         # 1. Heart Rhythm (ECG Style)
         if beat_detected:
-            self.pulse_data[-4:] = [-0.2, 1.0, -0.5, 0.1]
+            self.pulse_data.set_tail([-0.2, 1.0, -0.5, 0.1])
         else:
             self.pulse_data.append(random.uniform(-0.02, 0.02))
-        
-        if len(self.pulse_data) > self.max_len:
-            self.pulse_data.pop(0)
             
         # 2. Stress (HRV) -> "EQ Bars"
-        # Generate varied data 0.0 to 1.0
-        # Stress factor makes bars higher and more erratic
-        stress_factor = max(0.0, min(1.0, (hr - 60) / 40))
-        
-        # Base noise
-        noise = random.uniform(0.0, 0.3)
-        # Add stress spikes
-        if random.random() < stress_factor:
-            noise += random.uniform(0.3, 0.7)
+        if spectral is not None:
+            # Sympathetic balance: LF power in normalised units (LF / (LF + HF)),
+            # minus the part explained by a coherent (slow breathing) rhythm,
+            # which also lands in LF; a small ripple keeps the bars moving
+            stress_factor = spectral['lf_nu'] * (1.0 - spectral['coherence'])
+            level = stress_factor + 0.05 * math.sin(self.phase * 1.7)
+        else:
+            # No spectrum yet: estimate from the heart rate
+            # Generate varied data 0.0 to 1.0
+            # Stress factor makes bars higher and more erratic
+            stress_factor = max(0.0, min(1.0, (hr - 60) / 40))
             
-        self.hrv_data.append(noise)
-        if len(self.hrv_data) > self.max_len: self.hrv_data.pop(0)
+            # Base noise
+            level = random.uniform(0.0, 0.3)
+            # Add stress spikes
+            if random.random() < stress_factor:
+                level += random.uniform(0.3, 0.7)
+            
+        self.hrv_data.append(max(0.0, min(1.0, level)))
 
         # 3. Prana (Energy) -> "Double Wave"
         # Now linked to REAL Chakra Energy (avg_energy)
@@ -2357,287 +2237,146 @@ class MultiGraphVisualizer:
         val_prana = max(0.0, min(1.0, val_prana))
         
         self.prana_data.append(val_prana)
-        if len(self.prana_data) > self.max_len: self.prana_data.pop(0)
         
         # 4. Focus -> "Glow Beam"
         # Value near 0.5 (center). 
         # Focused = Tight line. Distracted = Wide wobble.
-        focus_score = 1.0 - stress_factor
+        if spectral is not None:
+            # Heart coherence: one dominant, regular rhythm -> tight beam
+            focus_score = spectral['coherence']
+            jitter = 0.0
+        else:
+            focus_score = 1.0 - stress_factor
+            jitter = random.uniform(-0.05, 0.05)
         wobble = (1.0 - focus_score) * 0.3
-        val_focus = 0.5 + math.sin(self.phase * 0.3) * wobble + random.uniform(-0.05, 0.05)
+        val_focus = 0.5 + math.sin(self.phase * 0.3) * wobble + jitter
         self.focus_data.append(val_focus)
-        if len(self.focus_data) > self.max_len: self.focus_data.pop(0)
 
         # 5. HRV Index -> "Filled Area"
         # Normalize HRV (typically 20-100ms) to 0.0-1.0
         norm_hrv = max(0.0, min(1.0, (hrv_val - 20) / 80))
         self.hrv_index_data.append(norm_hrv)
-        if len(self.hrv_index_data) > self.max_len: self.hrv_index_data.pop(0)
 
-    def draw_graph(self, frame, x, y, w, h, data, color, label, fill=False, style="line"):
-        # Background
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (10, 15, 20), -1)
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (50, 50, 50), 1)
+    def _plot_samples(self, data, w):
+        """
+        Returns (sample indices, values, history length) to plot. Histories longer than the
+        graph is wide (or than self.resolution allows) are reduced to one sample
+        per bucket, keeping the largest deviation in each so ECG spikes survive.
+        """
+        vals = data.view() if isinstance(data, RingSeries) else np.asarray(data, np.float64)
+        n = len(vals)
+        limit = max(2, int(min(n, w) * self.resolution))
+        if n <= limit or w <= 0:
+            return np.arange(n), vals, n
+        per_col = -(-n // limit)
+        cols = -(-n // per_col)
+        pad = cols * per_col - n
+        padded = np.concatenate([vals, np.full(pad, vals[-1], vals.dtype)]) if pad else vals
+        buckets = padded.reshape(cols, per_col)
+        pick = np.argmax(np.abs(buckets - np.median(vals)), axis=1)
+        idx = np.minimum(np.arange(cols) * per_col + pick, n - 1)
+        return idx, vals[idx], n
+
+    @staticmethod
+    def _points(idx, vals, n, x, w, h, base, gain):
+        """Index-to-pixel mapping: px = x + i / n * w, py = base - val * h * gain."""
+        px = (x + (idx / n) * w).astype(np.int32)
+        py = (base - vals.astype(np.float64) * (h * gain)).astype(np.int32)
+        return np.stack([px, py], axis=1)
+
+    def _draw_bars(self, frame, x, y, w, h, data, color):
+        """EQ bars as one masked column fill instead of a rectangle per sample."""
+        _, vals, _ = self._plot_samples(data, w)
+        n = len(vals)
+        if n == 0:
+            return
+        bar_w = max(1, w // n)
+        bottom = y + h
+        tops = bottom - (vals.astype(np.float64) * h * 0.8).astype(np.int32) # by per bar
+        # Color by height: red tips for high stress, yellow mid
+        cols = np.empty((n, 3), np.uint8)
+        cols[:] = color
+        cols[vals > 0.3] = (0, 255, 255)
+        cols[vals > 0.6] = (0, 0, 255)
+        # Expand per-bar values to pixel columns
+        tops = np.repeat(np.minimum(tops, bottom), bar_w)
+        cols = np.repeat(cols, bar_w, axis=0)
+        fh, fw = frame.shape[:2]
+        x1, x2 = max(0, x), min(fw, x + n * bar_w)
+        y1, y2 = max(0, int(tops.min())), min(fh, bottom + 1)
+        if x2 <= x1 or y2 <= y1:
+            return
+        tops = tops[x1 - x:x2 - x]
+        cols = cols[x1 - x:x2 - x]
+        mask = np.arange(y1, y2)[:, None] >= tops[None, :]
+        roi = frame[y1:y2, x1:x2]
+        np.copyto(roi, np.broadcast_to(cols[None], roi.shape), where=mask[:, :, None])
+
+    def draw_graph(self, frame, x, y, w, h, data, color, label, fill=False, style="line", draw_bg=True):
+        # Background (skipped when a cached HUD layer already provides it)
+        if draw_bg:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (10, 15, 20), -1)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (50, 50, 50), 1)
         
         # Label
-        cv2.putText(frame, label, (x + 5, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        text_cache.draw(frame, label, (x + 5, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (((200, 200, 200), 1),))
         
         if style == "bars":
             # EQ Bar Style
-            bar_w = max(1, w // len(data))
-            for i, val in enumerate(data):
-                bx = int(x + i * bar_w)
-                bh = int(val * h * 0.8) # Scale to height
-                by = int(y + h - bh)
-                
-                # Color gradient based on height
-                c = color
-                if val > 0.6: c = (0, 0, 255) # Red tips for high stress
-                elif val > 0.3: c = (0, 255, 255) # Yellow mid
-                
-                cv2.rectangle(frame, (bx, by), (bx + bar_w - 1, y + h), c, -1)
+            self._draw_bars(frame, x, y, w, h, data, color)
+            return
+
+        idx, vals, n = self._plot_samples(data, w)
+        if len(vals) < 2:
+            return
                 
-        elif style == "double_wave":
+        if style == "double_wave":
             # Double Sine Wave
-            points1 = []
-            points2 = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                
-                # Wave 1 (Main)
-                py1 = int(y + h - (val * h * 0.9))
-                points1.append((px, py1))
+            # Wave 1 (Main)
+            points1 = self._points(idx, vals, n, x, w, h, y + h, 0.9)
+            # Wave 2 (Phase shifted, smaller)
+            vals2 = vals * 0.8 + 0.1 * np.sin(idx * 0.2 + self.phase)
+            points2 = self._points(idx, vals2, n, x, w, h, y + h, 0.9)
                 
-                # Wave 2 (Phase shifted, smaller)
-                val2 = val * 0.8 + 0.1 * math.sin(i * 0.2 + self.phase)
-                py2 = int(y + h - (val2 * h * 0.9))
-                points2.append((px, py2))
+            # Fill between waves? Or just draw two lines
+            cv2.polylines(frame, [points1], False, color, 2, cv2.LINE_AA)
+            cv2.polylines(frame, [points2], False, (255, 255, 255), 1, cv2.LINE_AA)
                 
-            if len(points1) > 1:
-                # Fill between waves? Or just draw two lines
-                cv2.polylines(frame, [np.array(points1)], False, color, 2, cv2.LINE_AA)
-                cv2.polylines(frame, [np.array(points2)], False, (255, 255, 255), 1, cv2.LINE_AA)
-                
-                # Fill bottom
-                poly_pts = np.vstack([np.array(points1), [x+w, y+h], [x, y+h]])
-                overlay = frame.copy()
-                cv2.fillPoly(overlay, [poly_pts], color)
-                cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
+            # Fill bottom
+            poly_pts = np.vstack([points1, [[x+w, y+h], [x, y+h]]])
+            BlendRegion(frame).fill_poly([poly_pts], color).apply(0.3)
 
         elif style == "glow_beam":
             # Glowing Line
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-                
-            if len(points) > 1:
-                pts_arr = np.array(points, dtype=np.int32)
-                # Outer Glow
-                cv2.polylines(frame, [pts_arr], False, color, 6, cv2.LINE_AA) # Thick colored
-                # Inner Core
-                cv2.polylines(frame, [pts_arr], False, (255, 255, 255), 2, cv2.LINE_AA) # White core
+            pts_arr = self._points(idx, vals, n, x, w, h, y + h, 0.9)
+            # Outer Glow
+            cv2.polylines(frame, [pts_arr], False, color, 6, cv2.LINE_AA) # Thick colored
+            # Inner Core
+            cv2.polylines(frame, [pts_arr], False, (255, 255, 255), 2, cv2.LINE_AA) # White core
 
         elif style == "ecg":
             # ECG look
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h/2 - (val * h * 0.4))
-                points.append((px, py))
-            if len(points) > 1:
-                cv2.polylines(frame, [np.array(points)], False, color, 2, cv2.LINE_AA)
+            points = self._points(idx, vals, n, x, w, h, y + h/2, 0.4)
+            cv2.polylines(frame, [points], False, color, 2, cv2.LINE_AA)
                 
         elif style == "filled_area":
             # Filled Area Graph
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-            
-            if len(points) > 1:
-                # Close the polygon
-                poly_pts = np.vstack([np.array(points), [x+w, y+h], [x, y+h]])
-                overlay = frame.copy()
-                cv2.fillPoly(overlay, [poly_pts], color)
-                cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
-                cv2.polylines(frame, [np.array(points)], False, (255, 255, 255), 1, cv2.LINE_AA)
+            points = self._points(idx, vals, n, x, w, h, y + h, 0.9)
+            # Close the polygon
+            poly_pts = np.vstack([points, [[x+w, y+h], [x, y+h]]])
+            BlendRegion(frame).fill_poly([poly_pts], color).apply(0.4)
+            cv2.polylines(frame, [points], False, (255, 255, 255), 1, cv2.LINE_AA)
 
         else:
             # Default Line
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-            if len(points) > 1:
-                cv2.polylines(frame, [np.array(points)], False, color, 2, cv2.LINE_AA)
-
-class PhysiologyEngine:
-    def __init__(self):
-        self.history_bpm = []
-        self.history_ibi = []
-        self.last_beat_time = time.time()
-        self.min_ibi = 300  # 200 BPM
-        self.max_ibi = 1500 # 40 BPM
-        
-        # [NEW] Nadi Pariksha History
-        self.history_vata = []
-        self.history_pitta = []
-        self.history_kapha = []
-        
-        # [NEW] Insight Timer
-        self.last_insight_time = 0
-        self.current_insight = "Scanning bio-rhythms..."
-        
-    def _get_tiny_graph(self, data, length=7):
-        if not data or len(data) < 2: return "       "
-        # Unicode bars:   ▂ ▃ ▄ ▅ ▆ ▇ █
-        bars = "  ▂▃▄▅▆▇█"
-        # Normalize last 'length' points
-        recent = data[-length:]
-        if not recent: return "       "
-        mn, mx = min(recent), max(recent)
-        if mx == mn: return "▃" * len(recent)
-        
-        graph = ""
-        for v in recent:
-            idx = int((v - mn) / (mx - mn + 1e-6) * (len(bars) - 1))
-            graph += bars[idx]
-        return graph.ljust(length)
-
-    def analyze(self, bpm, beat_detected, gaze_label="Center"):
-        # [FIX] Handle No Sensor Input
-        if bpm <= 0:
-            return {
-                'stress_score': 0.0,
-                'calm_score': 0.0,
-                'focus_score': 0.0,
-                'insight_text': "Waiting for Sensor...",
-                'tiny_graphs': {'vata': [], 'pitta': [], 'kapha': []}
-            }
-
-        now = time.time()
-        
-        # 1. Calculate IBI
-        if beat_detected:
-            ibi = (now - self.last_beat_time) * 1000.0 # ms
-            self.last_beat_time = now
-            if self.min_ibi < ibi < self.max_ibi:
-                self.history_ibi.append(ibi)
-                if len(self.history_ibi) > 20: self.history_ibi.pop(0)
-        
-        # Update BPM history
-        if bpm > 0:
-            self.history_bpm.append(bpm)
-            if len(self.history_bpm) > 20: self.history_bpm.pop(0)
-            
-        # 2. Calculate HRV (RMSSD)
-        hrv_rmssd = 0.0
-        if len(self.history_ibi) > 2:
-            diffs = np.diff(self.history_ibi)
-            sq_diffs = diffs ** 2
-            mean_sq = np.mean(sq_diffs)
-            hrv_rmssd = math.sqrt(mean_sq)
-            
-        # 3. Derive Metrics
-        # Stress: High BPM + Low HRV
-        # Normalize BPM (60-100) -> 0-1
-        norm_bpm = max(0, min(1, (bpm - 60) / 40)) if bpm > 0 else 0
-        # Normalize HRV (10-100) -> 0-1 (Higher is better)
-        norm_hrv = max(0, min(1, (hrv_rmssd - 10) / 90))
-        
-        stress_score = (norm_bpm * 0.7) + ((1.0 - norm_hrv) * 0.3)
-        stress_score = max(0, min(1, stress_score)) * 100
-        
-        calm_score = 100 - stress_score
-        
-        # Focus: Stability of BPM (Inverse of BPM variance)
-        bpm_var = np.var(self.history_bpm) if len(self.history_bpm) > 5 else 10
-        focus_score = max(0, min(100, 100 - bpm_var))
-        
-        # [FIX] Gaze Influence on Focus
-        if gaze_label == "Center":
-            focus_score = max(80.0, focus_score) # Ensure high focus
-        else:
-            focus_score = min(40.0, focus_score) # Cap low focus
-        
-        # [NEW] Calculate Doshas (Nadi Pariksha)
-        # Vata (Air): Linked to Variability/Movement -> Proportional to HRV
-        vata_score = min(100, norm_hrv * 100)
-        
-        # Pitta (Fire): Linked to Intensity/Heat -> Proportional to HR
-        pitta_score = min(100, norm_bpm * 100)
-        
-        # Kapha (Water): Linked to Stability/Calm -> Inverse of HR & HRV
-        # High Kapha = Slow, steady pulse
-        kapha_score = min(100, (1.0 - norm_bpm) * 80 + (1.0 - norm_hrv) * 20)
-        
-        # Update History
-        self.history_vata.append(vata_score)
-        self.history_pitta.append(pitta_score)
-        self.history_kapha.append(kapha_score)
-        
-        # Keep history short (20 frames)
-        if len(self.history_vata) > 20: self.history_vata.pop(0)
-        if len(self.history_pitta) > 20: self.history_pitta.pop(0)
-        if len(self.history_kapha) > 20: self.history_kapha.pop(0)
-        
-        # [NEW] Determine Dominant Dosha & Finding
-        doshas = {'Vata': vata_score, 'Pitta': pitta_score, 'Kapha': kapha_score}
-        dominant = max(doshas, key=doshas.get)
-        
-        finding = "Scanning..."
-        if len(self.history_bpm) > 5:
-            if dominant == 'Vata':
-                finding = "Dominant: Vata (High Movement/Anxiety)"
-            elif dominant == 'Pitta':
-                finding = "Dominant: Pitta (High Energy/Heat)"
-            elif dominant == 'Kapha':
-                finding = "Dominant: Kapha (High Stability/Lethargy)"
-                
-            # Check for Balance (if all are close)
-            avg_d = sum(doshas.values()) / 3
-            if all(abs(v - avg_d) < 15 for v in doshas.values()):
-                finding = "Finding: Tridosha Balanced (Excellent)"
-        
-        # 4. Generate Insight (Every 15 Seconds)
-        if now - self.last_insight_time > 15.0:
-            self.last_insight_time = now
-            
-            if len(self.history_bpm) > 5:
-                if calm_score > 80:
-                    self.current_insight = "Deep state of relaxation detected."
-                elif calm_score > 60:
-                    self.current_insight = "Heart rhythm is steady and calm."
-                elif stress_score > 80:
-                    self.current_insight = "High arousal. Focus on slow exhalations."
-                elif stress_score > 60:
-                    self.current_insight = "Slight tension. Soften your shoulders."
-                elif focus_score > 80:
-                    self.current_insight = "Excellent physiological coherence."
-                else:
-                    self.current_insight = "Breathing is syncing with heart rate."
-            else:
-                self.current_insight = "Scanning bio-rhythms..."
-
-        return {
-            "heart_rate": bpm,
-            "hrv_rmssd_ms": hrv_rmssd,
-            "stress_score": stress_score,
-            "calm_score": calm_score,
-            "focus_score": focus_score,
-            "tiny_graphs": {'vata': self.history_vata, 'pitta': self.history_pitta, 'kapha': self.history_kapha},
-            "insight_text": self.current_insight,
-            "finding": finding # [NEW]
-        }
+            points = self._points(idx, vals, n, x, w, h, y + h, 0.9)
+            cv2.polylines(frame, [points], False, color, 2, cv2.LINE_AA)
 
 multi_visualizer = MultiGraphVisualizer()
 # pulse_visualizer = PulseWaveVisualizer() # Replaced
 # mind_visualizer = MindWaveVisualizer() # Replaced
-physio_engine = PhysiologyEngine() # [NEW] Physiology Engine
+physio_engine = PhysiologyEngine(frame_clock, PHYSIO_HISTORY_SECS, TUNED_FPS, HRV_WINDOW_SECS,
+                                 SPECTRAL_HRV_SECS, SPECTRAL_HRV_WINDOW_SECS) # [NEW] Physiology Engine
 
 def draw_mini_bars(frame, x, y, data, color, h=20, w=100):
     if not data: return
@@ -2651,42 +2390,94 @@ def draw_mini_bars(frame, x, y, data, color, h=20, w=100):
         by = int(y + h - bh)
         cv2.rectangle(frame, (bx, by), (bx + int(bar_w)-1, y + h), color, -1)
 
-def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0, avg_energy=0.5, gaze_label="Center"):
+# Premium Large Panel
+# Moved to LEFT side next to Chakra Meter (x=40) to avoid Mudra Sidebar overlap
+HR_PANEL_X = 140
+HR_PANEL_Y = 20  # Moved UP closer to top
+HR_PANEL_W = 350
+HR_PANEL_H = 610 # [FIX] Slightly increased (was 600) to fit larger graphs
+HR_GRAPH_Y = HR_PANEL_Y + 160 # [FIX] Pushed DOWN to clear SpO2 (was 110)
+HR_GRAPH_H = 40   # [FIX] Reduced height slightly (was 45) to save space
+HR_GRAPH_GAP = 6  # [FIX] Reduced gap (was 8)
+HR_GRAPH_COUNT = 5
+
+def build_heart_rate_panel_layer(layer, w, h):
+    # Static panel chrome - rendered once per resolution
+    panel_x, panel_y, panel_w, panel_h = HR_PANEL_X, HR_PANEL_Y, HR_PANEL_W, HR_PANEL_H
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    
+    # Panel Background (Premium Dark Glass)
+    layer.rect((panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (5, 8, 15), alpha=0.95)
+    # Border (Gold/Cyan Gradient feel)
+    layer.rect((panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (0, 215, 255), thickness=2)
+    
+    # Header
+    layer.text("BIO-ANALYTICS ENGINE", (panel_x + 60, panel_y + 30), font, 0.6, (0, 255, 255), 1, line_type=cv2.LINE_8)
+    # BPM Label
+    hx, hy = panel_x + 40, panel_y + 70
+    layer.text("BPM", (hx + 55, hy + 25), font, 0.5, (200, 255, 255), 1, line_type=cv2.LINE_8)
+    
+    # Graph Backgrounds
+    gx, gw = panel_x + 20, panel_w - 40
+    for i in range(HR_GRAPH_COUNT):
+        gy = HR_GRAPH_Y + i * (HR_GRAPH_H + HR_GRAPH_GAP)
+        layer.rect((gx, gy), (gx + gw, gy + HR_GRAPH_H), (10, 15, 20))
+        layer.rect((gx, gy), (gx + gw, gy + HR_GRAPH_H), (50, 50, 50), thickness=1)
+    
+    # Nadi Pariksha Labels
+    tg_y = HR_GRAPH_Y + HR_GRAPH_COUNT * (HR_GRAPH_H + HR_GRAPH_GAP) + 15
+    layer.text("Nadi Pariksha (Doshas):", (panel_x + 20, tg_y), font, 0.45, (255, 255, 255), 1, line_type=cv2.LINE_8)
+    layer.text("Vata", (panel_x + 20, tg_y + 20), font, 0.5, (255, 200, 100), 1, line_type=cv2.LINE_8)
+    layer.text("Pitta", (panel_x + 100, tg_y + 20), font, 0.5, (0, 0, 255), 1, line_type=cv2.LINE_8)
+    layer.text("Kapha", (panel_x + 180, tg_y + 20), font, 0.5, (0, 255, 0), 1, line_type=cv2.LINE_8)
+    
+    # Radar Background (Energy Coherence)
+    cx, cy = panel_x + panel_w // 2, tg_y + 65
+    layer.circle((cx, cy), 50, (30, 30, 30), thickness=1)
+    layer.line((cx - 50, cy), (cx + 50, cy), (30, 30, 30), 1)
+    layer.line((cx, cy - 50), (cx, cy + 50), (30, 30, 30), 1)
+
+# Dynamic parts of the heart-rate panel, each cached until its inputs change
+# (render_utils.PanelCache). The graphs scroll every GRAPH_SAMPLE_HZ sample,
+# about once per frame, so they are drawn directly.
+PANEL_ANIM_HZ = 15 # Tick rate for continuously animated panel parts
+hr_stats_panel = PanelCache(HR_PANEL_X, HR_PANEL_Y + 20, HR_PANEL_X + 250, HR_GRAPH_Y - 4)
+HR_DOSHA_Y = HR_GRAPH_Y + HR_GRAPH_COUNT * (HR_GRAPH_H + HR_GRAPH_GAP) + 15 # tg_y below
+hr_dosha_panel = PanelCache(HR_PANEL_X, HR_DOSHA_Y - 5, HR_PANEL_X + HR_PANEL_W, HR_DOSHA_Y + 70)
+hr_coherence_panel = PanelCache(HR_PANEL_X, HR_DOSHA_Y + 10, HR_PANEL_X + HR_PANEL_W, HR_DOSHA_Y + 140)
+# The bot's speech bubble is centred on the bot and can run past the panel
+hr_bot_panel = PanelCache(0, HR_DOSHA_Y + 65, 1 << 16, HR_DOSHA_Y + 170)
+
+def mini_bar_heights(data, h):
+    """Bar heights in pixels, exactly as draw_mini_bars computes them."""
+    return tuple(int(max(0, min(1, val / 100.0)) * h) for val in data)
+
+def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0, avg_energy=0.5, gaze_label="Center", now=None):
+    if now is None:
+        now = frame_clock.now
     hr, spo2, last_beat, beat_detected, hr_history = hr_monitor.get_data()
     
     h, w, _ = frame.shape
     
-    # Premium Large Panel
-    panel_w = 350
-    # Premium Large Panel
-    panel_w = 350
-    panel_h = 610 # [FIX] Slightly increased (was 600) to fit larger graphs
-    # Moved to LEFT side next to Chakra Meter (x=40) to avoid Mudra Sidebar overlap
-    # Moved to LEFT side next to Chakra Meter (x=40) to avoid Mudra Sidebar overlap
-    panel_x = 140 
-    panel_y = 20 # Moved UP closer to top
+    panel_x, panel_y, panel_w = HR_PANEL_X, HR_PANEL_Y, HR_PANEL_W
     
     if not hr_monitor.connected:
-        cv2.putText(frame, "Sensor: Not Connected", (panel_x, panel_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
+        text_cache.draw(frame, "Sensor: Not Connected", (panel_x, panel_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (((100, 100, 100), 1),))
         return
 
     # [NEW] Physiology Analysis
-    physio_metrics = physio_engine.analyze(hr, beat_detected, gaze_label)
+    # Every beat event since the last frame, with its arrival time
+    beat_times = hr_monitor.frame_beats
+    physio_engine.set_connection(hr_monitor.connection_id)
+    physio_metrics = physio_engine.analyze(hr, beat_times, gaze_label, now)
     hrv_val = physio_metrics.get('hrv_rmssd_ms', 50.0)
 
     # Update Visualizer with HRV Index
-    multi_visualizer.update(hr, hr_history, spo2, posture_score, beat_detected, avg_energy, hrv_val)
-    
-    # Panel Background (Premium Dark Glass)
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (5, 8, 15), -1) 
-    cv2.addWeighted(overlay, 0.95, frame, 0.05, 0, frame) 
+    multi_visualizer.update(hr, hr_history, spo2, posture_score, len(beat_times), avg_energy, hrv_val, now,
+                            physio_metrics.get('spectral'))
     
-    # Border (Gold/Cyan Gradient feel)
-    cv2.rectangle(frame, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (0, 215, 255), 2)
-
-    # Header
-    cv2.putText(frame, "BIO-ANALYTICS ENGINE", (panel_x + 60, panel_y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
+    # Background, border, header, graph frames and labels: cached HUD layer
+    hud.compose(frame, ("hr_panel",))
 
     # Main Stats Row
     # Heart
@@ -2695,87 +2486,72 @@ def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0
     
     # [FIX] Sync animation with Arduino "BEAT" signal
     # Make it pop: Scale 1.4x for 200ms
-    if time.time() - last_beat < 0.20: 
+    if now - last_beat < 0.20: 
         beat_scale = 1.4 
         
-    # Draw Heart Icon (Custom Shape) - MUCH BIGGER & VISIBLE
-    # Color shifts to Bright Red when beating
-    heart_col = (0, 0, 255) if beat_scale > 1.0 else (0, 0, 200)
-    draw_heart(frame, hx, hy - 5, int(28 * beat_scale), heart_col, outline=True)
-    
-    # HR Value
-    cv2.putText(frame, f"{int(hr)}", (hx + 50, hy), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
-    # BPM Label - Moved below for better visibility
-    cv2.putText(frame, "BPM", (hx + 55, hy + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 255, 255), 1)
-    
-    # SpO2 - Moved DOWN to avoid overlap with BPM
-    cv2.putText(frame, f"Oxygen: {int(spo2)}%", (hx, hy + 55), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (100, 255, 255), 2)
+    def render_stats(img):
+        # Draw Heart Icon (Custom Shape) - MUCH BIGGER & VISIBLE
+        # Color shifts to Bright Red when beating
+        heart_col = (0, 0, 255) if beat_scale > 1.0 else (0, 0, 200)
+        draw_heart(img, hx, hy - 5, int(28 * beat_scale), heart_col, outline=True)
+        
+        # HR Value
+        text_cache.draw(img, f"{int(hr)}", (hx + 50, hy), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (((255, 255, 255), 3),))
+        
+        # SpO2 - Moved DOWN to avoid overlap with BPM
+        text_cache.draw(img, f"Oxygen: {int(spo2)}%", (hx, hy + 55), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (((100, 255, 255), 2),))
+
+    hr_stats_panel.draw(frame, (int(hr), int(spo2), beat_scale), render_stats)
 
     # Graphs - COMPACT MODE
-    gy = panel_y + 160 # [FIX] Pushed DOWN to clear SpO2 (was 110)
-    gh = 40 # [FIX] Reduced height slightly (was 45) to save space
-    gap = 6 # [FIX] Reduced gap (was 8)
+    gy, gh, gap = HR_GRAPH_Y, HR_GRAPH_H, HR_GRAPH_GAP
     
     # 1. Heart Rhythm (Red) -> ECG Style
-    multi_visualizer.draw_graph(frame, panel_x + 20, gy, panel_w - 40, gh, multi_visualizer.pulse_data, (0, 0, 255), "Heart Rhythm", style="ecg")
+    multi_visualizer.draw_graph(frame, panel_x + 20, gy, panel_w - 40, gh, multi_visualizer.pulse_data, (0, 0, 255), "Heart Rhythm", style="ecg", draw_bg=False)
     
     # 2. HRV / Stress (Purple) -> EQ Bars
     curr_stress = multi_visualizer.hrv_data[-1]
     stress_status = "Relaxed" if curr_stress < 0.3 else "High"
-    multi_visualizer.draw_graph(frame, panel_x + 20, gy + gh + gap, panel_w - 40, gh, multi_visualizer.hrv_data, (255, 0, 255), f"Stress: {stress_status}", style="bars")
+    multi_visualizer.draw_graph(frame, panel_x + 20, gy + gh + gap, panel_w - 40, gh, multi_visualizer.hrv_data, (255, 0, 255), f"Stress: {stress_status}", style="bars", draw_bg=False)
     
     # 3. Prana Energy (Gold) -> Double Wave
     curr_prana = multi_visualizer.prana_data[-1]
     prana_status = "High" if curr_prana > 0.6 else "Building"
-    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 2*(gh + gap), panel_w - 40, gh, multi_visualizer.prana_data, (0, 215, 255), f"Prana: {prana_status}", style="double_wave")
+    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 2*(gh + gap), panel_w - 40, gh, multi_visualizer.prana_data, (0, 215, 255), f"Prana: {prana_status}", style="double_wave", draw_bg=False)
     
     # 4. Focus (Blue) -> Glow Beam
     curr_focus = multi_visualizer.focus_data[-1]
     focus_status = "Sharp" if curr_focus > 0.6 else "Drifting"
-    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 3*(gh + gap), panel_w - 40, gh, multi_visualizer.focus_data, (255, 200, 0), f"Focus: {focus_status}", style="glow_beam")
+    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 3*(gh + gap), panel_w - 40, gh, multi_visualizer.focus_data, (255, 200, 0), f"Focus: {focus_status}", style="glow_beam", draw_bg=False)
 
     # 5. [NEW] HRV Index (Teal) -> Filled Area
     # Use real HRV value for label
     hrv_label = f"HRV Index: {int(hrv_val)} ms"
-    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 4*(gh + gap), panel_w - 40, gh, multi_visualizer.hrv_index_data, (200, 255, 200), hrv_label, style="filled_area")
+    multi_visualizer.draw_graph(frame, panel_x + 20, gy + 4*(gh + gap), panel_w - 40, gh, multi_visualizer.hrv_index_data, (200, 255, 200), hrv_label, style="filled_area", draw_bg=False)
 
     # --- NEW: Physiology Engine Tiny Graphs & Bot ---
     # [NEW] Nadi Pariksha (Pulse Diagnosis) Tiny Graphs
-    # --- NEW: Physiology Engine Tiny Graphs & Bot ---
-    # [NEW] Nadi Pariksha (Pulse Diagnosis) Tiny Graphs
-    # --- NEW: Physiology Engine Tiny Graphs & Bot ---
-    # [NEW] Nadi Pariksha (Pulse Diagnosis) Tiny Graphs
-    tg_y = gy + 5*(gh + gap) + 15 # [FIX] Restored spacing
-    
-    cv2.putText(frame, "Nadi Pariksha (Doshas):", (panel_x + 20, tg_y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
-    
-    # [FIX] Move Text ABOVE Bars and Add Spacing
-    # Vata
-    cv2.putText(frame, "Vata", (panel_x + 20, tg_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 200, 100), 1)
-    draw_mini_bars(frame, panel_x + 20, tg_y + 25, physio_metrics['tiny_graphs']['vata'], (255, 200, 100), w=60, h=15)
-    
-    # Pitta
-    cv2.putText(frame, "Pitta", (panel_x + 100, tg_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-    draw_mini_bars(frame, panel_x + 100, tg_y + 25, physio_metrics['tiny_graphs']['pitta'], (0, 0, 255), w=60, h=15)
-    
-    # Kapha
-    cv2.putText(frame, "Kapha", (panel_x + 180, tg_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-    draw_mini_bars(frame, panel_x + 180, tg_y + 25, physio_metrics['tiny_graphs']['kapha'], (0, 255, 0), w=60, h=15)
-
+    tg_y = HR_DOSHA_Y # [FIX] Restored spacing
+    tiny = physio_metrics['tiny_graphs']
     # [NEW] Findings Guide
     finding_text = physio_metrics.get('finding', "Scanning...")
-    cv2.putText(frame, finding_text, (panel_x + 20, tg_y + 55), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 255, 255), 1)
 
-    # [NEW] Horizontal Guide Box (Bottom of Panel)
-    guide_y = tg_y + 65
-    # Removed Legend as per user request
+    def render_doshas(img):
+        # [FIX] Text ABOVE Bars (labels are part of the cached panel layer)
+        # Vata
+        draw_mini_bars(img, panel_x + 20, tg_y + 25, tiny['vata'], (255, 200, 100), w=60, h=15)
+        # Pitta
+        draw_mini_bars(img, panel_x + 100, tg_y + 25, tiny['pitta'], (0, 0, 255), w=60, h=15)
+        # Kapha
+        draw_mini_bars(img, panel_x + 180, tg_y + 25, tiny['kapha'], (0, 255, 0), w=60, h=15)
+        text_cache.draw(img, finding_text, (panel_x + 20, tg_y + 55), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (((200, 255, 255), 1),))
+
+    # Keyed on the drawn bar heights, not the raw samples
+    hr_dosha_panel.draw(frame, (mini_bar_heights(tiny['vata'], 15), mini_bar_heights(tiny['pitta'], 15),
+                                mini_bar_heights(tiny['kapha'], 15), finding_text), render_doshas)
 
     # [NEW] Advanced Premium Graph: "Energy Coherence" (Circular Radar)
     # CONNECTED TO ENERGY: Size & Color changes with avg_energy
-    
-    # [NEW] Advanced Premium Graph: "Energy Coherence" (Circular Radar)
-    # CONNECTED TO ENERGY: Size & Color changes with avg_energy
-    
     coherence_y = tg_y + 65 # [FIX] Adjusted position 
     coherence_x = panel_x + panel_w // 2
     
@@ -2791,51 +2567,40 @@ def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0
         coh_color = (0, 215, 255) # Gold
     else:
         coh_color = (255, 0, 255) # Purple/Whiteish
+    energy_pct = int(avg_energy * 100)
+    # The pulse animates at PANEL_ANIM_HZ
+    anim_tick = int(now * PANEL_ANIM_HZ)
         
-    # Draw Radar Background (Static)
-    cv2.circle(frame, (coherence_x, coherence_y), 50, (30, 30, 30), 1)
-    cv2.line(frame, (coherence_x - 50, coherence_y), (coherence_x + 50, coherence_y), (30, 30, 30), 1)
-    cv2.line(frame, (coherence_x, coherence_y - 50), (coherence_x, coherence_y + 50), (30, 30, 30), 1)
-    
-    # Dynamic Coherence Shape
-    pts = []
-    num_pts = 36
-    
-    for i in range(num_pts):
-        angle = math.radians(i * (360/num_pts))
+    def render_coherence(img):
+        # Radar Background (Static) is part of the cached panel layer
+        
+        # Dynamic Coherence Shape
+        t_anim = anim_tick / PANEL_ANIM_HZ
+        num_pts = 36
+        angles = np.radians(np.arange(num_pts) * (360 / num_pts))
         # Pulse factor
-        pulse = 1.0 + 0.05 * math.sin(time.time() * 4 + i * 0.5)
+        r = radius * (1.0 + 0.05 * np.sin(t_anim * 4 + np.arange(num_pts) * 0.5))
+        pts = np.stack([(coherence_x + r * np.cos(angles)).astype(np.int32),
+                        (coherence_y + r * np.sin(angles)).astype(np.int32)], axis=1)
+        pts = pts.reshape((-1, 1, 2))
         
-        r = radius * pulse
-        px = int(coherence_x + r * math.cos(angle))
-        py = int(coherence_y + r * math.sin(angle))
-        pts.append([px, py])
+        # Draw Filled Coherence Blob
+        BlendRegion(img).fill_poly([pts], coh_color).apply(0.5)
+        cv2.polylines(img, [pts], True, (255, 255, 255), 1, cv2.LINE_AA)
         
-    pts = np.array(pts, np.int32)
-    pts = pts.reshape((-1, 1, 2))
-    
-    # Draw Filled Coherence Blob
-    overlay = frame.copy()
-    cv2.fillPoly(overlay, [pts], coh_color)
-    cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
-    cv2.polylines(frame, [pts], True, (255, 255, 255), 1, cv2.LINE_AA)
-    
-    # Label with Value
-    energy_pct = int(avg_energy * 100)
-    cv2.putText(frame, f"Energy Coherence: {energy_pct}%", (coherence_x - 60, coherence_y + 60), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        # Label with Value
+        text_cache.draw(img, f"Energy Coherence: {energy_pct}%", (coherence_x - 60, coherence_y + 60), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (((200, 200, 200), 1),))
+
+    hr_coherence_panel.draw(frame, (radius, coh_color, energy_pct, anim_tick), render_coherence)
 
     # [NEW] Data Analysis Bot
-    # Position relative to Coherence Graph to ensure visibility
-    # [FIX] Position relative to Coherence Graph (y ~680)
-    # [NEW] Data Analysis Bot
-    # Position relative to Coherence Graph to ensure visibility
     # [FIX] Position relative to Coherence Graph (y ~680)
     bot_y = coherence_y + 65 # [FIX] Adjusted spacing to fit screen
     bot_x = panel_x + 50 # Moved right slightly
     
     # Draw Bot Icon (Animated)
-    t = time.time()
+    t = now
     
     # Blinking Logic (Every 3s for 0.15s)
     is_blink = (t % 3.0) > 2.85
@@ -2846,55 +2611,58 @@ def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0
     if 2.0 < look_cycle < 3.5: eye_dx = -4 # Look Left
     elif 5.0 < look_cycle < 6.5: eye_dx = 4 # Look Right
     
-    # Head
-    # [FIX] Larger Head (Radius 25)
-    cv2.circle(frame, (bot_x, bot_y), 25, (50, 50, 50), -1) # Head Background
-    cv2.circle(frame, (bot_x, bot_y), 25, (0, 255, 255), 2) # Head Outline
-    
-    if is_blink:
-        # Closed Eyes (Lines)
-        cv2.line(frame, (bot_x-12, bot_y-4), (bot_x-4, bot_y-4), (0, 255, 255), 2)
-        cv2.line(frame, (bot_x+4, bot_y-4), (bot_x+12, bot_y-4), (0, 255, 255), 2)
-    else:
-        # Open Eyes (Circles with pupils)
-        # Whites
-        cv2.circle(frame, (bot_x-8, bot_y-4), 7, (255, 255, 255), -1)
-        cv2.circle(frame, (bot_x+8, bot_y-4), 7, (255, 255, 255), -1)
-        # Pupils (Moving)
-        cv2.circle(frame, (bot_x-8+eye_dx, bot_y-4), 3, (0, 0, 0), -1)
-        cv2.circle(frame, (bot_x+8+eye_dx, bot_y-4), 3, (0, 0, 0), -1)
-
-    # Smile (Curve)
-    cv2.ellipse(frame, (bot_x, bot_y+5), (11, 7), 0, 20, 160, (0, 255, 255), 2)
-    
     # Dynamic Typing Text
     advice = physio_metrics['insight_text']
     # Simple typing effect based on time
     typing_speed = 0.05
     # Cycle every few seconds
     cycle_duration = len(advice) * typing_speed + 3.0
-    char_count = int((time.time() % cycle_duration) / typing_speed)
+    char_count = int((now % cycle_duration) / typing_speed)
     current_text = advice[:char_count]
-    
-    # Draw Text Bubble Background
-    # [FIX] Larger Font for Bot Text
-    bot_font_scale = 0.6
-    bot_thickness = 2
-    (tw, th), _ = cv2.getTextSize(current_text, cv2.FONT_HERSHEY_SIMPLEX, bot_font_scale, bot_thickness)
-    if tw > 0:
-        # [FIX] Move text ABOVE bot head to avoid graph overlap
-        bx = bot_x - tw // 2
-        by = bot_y - 45
-        # Ensure within screen
-        if bx < 10: bx = 10
-        if by < 10: by = 10
-        
-        # Bubble Box
-        cv2.rectangle(frame, (bx - 5, by - th - 5), (bx + tw + 5, by + 5), (0, 0, 0), -1)
-        cv2.rectangle(frame, (bx - 5, by - th - 5), (bx + tw + 5, by + 5), (0, 255, 255), 1)
-        
-        # Text
-        cv2.putText(frame, current_text, (bx, by), cv2.FONT_HERSHEY_SIMPLEX, bot_font_scale, (255, 255, 255), bot_thickness)
+
+    def render_bot(img):
+        # Head
+        # [FIX] Larger Head (Radius 25)
+        cv2.circle(img, (bot_x, bot_y), 25, (50, 50, 50), -1) # Head Background
+        cv2.circle(img, (bot_x, bot_y), 25, (0, 255, 255), 2) # Head Outline
+        
+        if is_blink:
+            # Closed Eyes (Lines)
+            cv2.line(img, (bot_x-12, bot_y-4), (bot_x-4, bot_y-4), (0, 255, 255), 2)
+            cv2.line(img, (bot_x+4, bot_y-4), (bot_x+12, bot_y-4), (0, 255, 255), 2)
+        else:
+            # Open Eyes (Circles with pupils)
+            # Whites
+            cv2.circle(img, (bot_x-8, bot_y-4), 7, (255, 255, 255), -1)
+            cv2.circle(img, (bot_x+8, bot_y-4), 7, (255, 255, 255), -1)
+            # Pupils (Moving)
+            cv2.circle(img, (bot_x-8+eye_dx, bot_y-4), 3, (0, 0, 0), -1)
+            cv2.circle(img, (bot_x+8+eye_dx, bot_y-4), 3, (0, 0, 0), -1)
+
+        # Smile (Curve)
+        cv2.ellipse(img, (bot_x, bot_y+5), (11, 7), 0, 20, 160, (0, 255, 255), 2)
+        
+        # Draw Text Bubble Background
+        # [FIX] Larger Font for Bot Text
+        bot_font_scale = 0.6
+        bot_thickness = 2
+        (tw, th), _ = text_cache.size(current_text, cv2.FONT_HERSHEY_SIMPLEX, bot_font_scale, bot_thickness)
+        if tw > 0:
+            # [FIX] Move text ABOVE bot head to avoid graph overlap
+            bx = bot_x - tw // 2
+            by = bot_y - 45
+            # Ensure within screen
+            if bx < 10: bx = 10
+            if by < 10: by = 10
+            
+            # Bubble Box
+            cv2.rectangle(img, (bx - 5, by - th - 5), (bx + tw + 5, by + 5), (0, 0, 0), -1)
+            cv2.rectangle(img, (bx - 5, by - th - 5), (bx + tw + 5, by + 5), (0, 255, 255), 1)
+            
+            # Text
+            text_cache.draw(img, current_text, (bx, by), cv2.FONT_HERSHEY_SIMPLEX, bot_font_scale, (((255, 255, 255), bot_thickness),))
+
+    hr_bot_panel.draw(frame, (is_blink, eye_dx, current_text), render_bot)
 
 # Load Om Image
 OM_IMG = None
@@ -2905,48 +2673,51 @@ if os.path.exists("om_glow.png"):
         # If no alpha, assume black is transparent (fallback)
         tmp = cv2.cvtColor(OM_IMG, cv2.COLOR_BGR2BGRA)
         OM_IMG = tmp
+    if OM_IMG is not None:
+        sprite_cache.add("om", OM_IMG)
 else:
     print("[WARN] om_glow.png not found. Run generate_om.py first.")
 
 class OmParticleSystem:
     def __init__(self):
-        self.particles = []
+        # life doubles as the Om's opacity (fades 0.015 per frame)
+        # [FIX] Only 4-5 particles
+        self.particles = ParticleEngine(capacity=16, budget_ms=PARTICLE_BUDGET_MS)
+        self.particles.add_kind("om", cap=5, decay=0.015, draw_fn=self._draw_om)
         
     def update(self, w, h, energy_level):
         # Spawn new particles if energy is high
-        # [FIX] Only 4-5 particles, larger area, spreading
-        if energy_level > 0.9 and len(self.particles) < 5:
+        # [FIX] Larger area, spreading
+        if energy_level > 0.9:
             if random.random() < 0.1: # Slower spawn rate for fewer particles
                 spawn_x = w // 2 + random.randint(-150, 150) # Larger area
                 # Velocity spreads outwards from center
                 vx = (spawn_x - w // 2) * 0.015 
                 
-                self.particles.append({
-                    'x': spawn_x,
-                    'y': h // 2 + random.randint(-50, 100),
-                    'vy': -0.5 - random.random() * 1.0, # Float up slower
-                    'vx': vx,
-                    'size': random.randint(40, 70), # Larger for image
-                    'alpha': 1.0
-                })
+                self.particles.spawn("om", spawn_x, h // 2 + random.randint(-50, 100),
+                                     vx=vx,
+                                     vy=-0.5 - random.random() * 1.0, # Float up slower
+                                     size=random.randint(40, 70)) # Larger for image
                 
-        # Update existing
-        for p in self.particles:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['alpha'] -= 0.015 # Fade out
-            
-        # Remove dead
-        self.particles = [p for p in self.particles if p['alpha'] > 0]
+        # Update existing (Fade out) & remove dead
+        self.particles.integrate()
+        self.particles.compact()
 
     def draw(self, frame):
-        for p in self.particles:
-            overlay = frame.copy()
-            # Always use procedural drawing for reliability (No boxes!)
-            self.draw_om_shape(overlay, int(p['x']), int(p['y']), p['size'])
-            cv2.addWeighted(overlay, p['alpha'], frame, 1 - p['alpha'], 0, frame)
-
-    def draw_om_shape(self, img, x, y, s):
+        self.particles.draw(frame)
+
+    def _draw_om(self, layer, x, y, vx, vy, life, size, col):
+        # Always use procedural drawing for reliability (No boxes!)
+        # (only a handful alive, so one custom draw each)
+        for px, py, s, opacity in zip(x.astype(np.int32).tolist(), y.astype(np.int32).tolist(),
+                                      size.astype(np.int32).tolist(), life.tolist()):
+            pad = s // 12 + 8 # Outer glow stroke
+            def draw(color_img, alpha_img, a, px=px, py=py, s=s):
+                self.draw_om_shape(color_img, px, py, s)
+                self.draw_om_shape(alpha_img, px, py, s, colors=(a, a, a))
+            layer.custom(draw, opacity, px - s * 0.2 - pad, py - s * 0.5 - pad, px + s * 0.5 + pad, py + s * 0.4 + pad)
+
+    def draw_om_shape(self, img, x, y, s, colors=None):
         # Procedural Golden Glowing Om (Reliable & Beautiful)
         thickness = max(1, int(s / 12))
         
@@ -2985,6 +2756,9 @@ class OmParticleSystem:
         glow_color = (0, 165, 255) # Orange (BGR)
         gold_color = (0, 215, 255) # Gold (BGR)
         white_color = (255, 255, 255)
+        if colors is not None:
+            # e.g. a single value per layer when drawing the alpha mask
+            glow_color, gold_color, white_color = colors
         
         # Layer 1: Outer Glow (Thick Orange)
         t1 = thickness + 6
@@ -3005,43 +2779,14 @@ class OmParticleSystem:
         cv2.circle(img, (int(x + s*0.4), int(y - s*0.5)), max(1, thickness-1), white_color, -1)
 
 def overlay_image_alpha(img, img_overlay, x, y, alpha_mult=1.0):
-    """Overlays an RGBA image onto a BGR image with alpha blending."""
-    h, w, _ = img.shape
-    oh, ow, _ = img_overlay.shape
-    
-    # Crop if out of bounds
-    if x < 0: 
-        ow += x
-        img_overlay = img_overlay[:, -x:]
-        x = 0
-    if y < 0:
-        oh += y
-        img_overlay = img_overlay[-y:, :]
-        y = 0
-    if x + ow > w:
-        ow = w - x
-        img_overlay = img_overlay[:, :ow]
-    if y + oh > h:
-        oh = h - y
-        img_overlay = img_overlay[:oh, :]
-        
-    if ow <= 0 or oh <= 0: return
-
-    # ROI
-    roi = img[y:y+oh, x:x+ow]
-    
-    # Alpha channel
-    alpha = img_overlay[:, :, 3] / 255.0
-    alpha = alpha * alpha_mult # Apply particle alpha
-    
-    # Colors
-    color = img_overlay[:, :, :3]
-    
-    # Blend
-    for c in range(0, 3):
-        roi[:, :, c] = (alpha * color[:, :, c] + (1.0 - alpha) * roi[:, :, c])
-        
-    img[y:y+oh, x:x+ow] = roi
+    """
+    Overlays an RGBA image onto a BGR image with alpha blending.
+    Pass a cached sprite (e.g. sprite_cache.get("om", size)) to skip the
+    per-call premultiply; clipping and the integer blend are ROI-only.
+    """
+    if not isinstance(img_overlay, PremultSprite):
+        img_overlay = PremultSprite.from_bgra(img_overlay, crop=False)
+    blit_premultiplied(img, img_overlay, x, y, alpha_mult)
 
 om_particles = OmParticleSystem()
 
@@ -3060,8 +2805,12 @@ class MeditationTracker:
         self.concentration_level = 0.0
         self.start_time = 0
         self.in_dhyana = False
+        # Concentration rates (% per second)
+        self.gain_closed = 1.0 * TUNED_FPS
+        self.gain_open = 0.5 * TUNED_FPS
+        self.drop_distracted = 0.5 * TUNED_FPS
         
-    def update(self, eye_open, breath_stable, body_still, gaze_label="Center"):
+    def update(self, eye_open, breath_stable, body_still, gaze_label="Center", dt=1.0 / SIM_HZ, now=None):
         # Logic: 
         # 1. Eyes Closed -> Jump to 100%
         # 2. Eyes Open + Center Gaze -> Max 50%
@@ -3070,11 +2819,11 @@ class MeditationTracker:
         if eye_open < EYE_CLOSED_THRESHOLD: # Eyes closed (Using Ratio now)
             if not self.in_dhyana:
                 self.in_dhyana = True
-                self.start_time = time.time()
+                self.start_time = frame_clock.now if now is None else now
                 self.stage = "Dhyana (Meditation)"
             
             # Fast increase to 100%
-            self.concentration_level = min(100.0, self.concentration_level + 1.0) # Faster gain (was 0.5)
+            self.concentration_level = min(100.0, self.concentration_level + self.gain_closed * dt) # Faster gain (was 0.5)
             
             if self.concentration_level > 90 and breath_stable:
                 self.stage = "Samadhi (Absorption)"
@@ -3090,7 +2839,7 @@ class MeditationTracker:
                 # Looking at camera -> Increase to 90% (Max for eyes open)
                 # [FIX] Cap at 90% if eyes open. Must close eyes for 100%.
                 if self.concentration_level < 90.0:
-                    self.concentration_level = min(90.0, self.concentration_level + 0.5) 
+                    self.concentration_level = min(90.0, self.concentration_level + self.gain_open * dt) 
                 
                 # [FIX] Accurate Staging
                 if self.concentration_level > 80:
@@ -3101,7 +2850,7 @@ class MeditationTracker:
                     self.stage = "Focusing..."
             else:
                 # Looking away -> Distracted
-                self.concentration_level = max(0.0, self.concentration_level - 0.5) # Slower drop (was 1.0)
+                self.concentration_level = max(0.0, self.concentration_level - self.drop_distracted * dt) # Slower drop (was 1.0)
                 self.stage = "Distracted"
             
         return self.stage, self.concentration_level
@@ -3130,6 +2879,12 @@ def speak_summary(chakra_energies, total_gyan_count, alignment_count, duration_m
     tts.runAndWait()
 
 
+# Every image the app saves goes through one background writer
+# (bounded queue, batched fsyncs, flushed on exit)
+IMAGE_WRITER_QUEUE = 16        # Writes allowed to wait; beyond that they're dropped
+IMAGE_WRITER_FLUSH_SECS = 10.0 # Max wait for pending writes at shutdown
+image_writer = ImageWriter(max_queue=IMAGE_WRITER_QUEUE, png_level=3, jpeg_quality=90, webp_quality=90)
+
 def create_summary_image(chakra_energies, duration_min, total_gyan_count, alignment_count):
     img = np.zeros((600, 800, 3), dtype=np.uint8)
     img[:] = (15, 15, 15)
@@ -3146,25 +2901,31 @@ def create_summary_image(chakra_energies, duration_min, total_gyan_count, alignm
                 cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 255, 200), 2)
     cv2.putText(img, f"Alignment Mode: {alignment_count}", (80, 520),
                 cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 215, 150), 2)
-    cv2.imwrite("summary_output.png", img)
-    cv2.imwrite("summary_output.png", img)
+    image_writer.submit("summary_output.png", img)
     return img
 
 
+# [FIX] Relocated inside Bio-Analytics Panel (Beside BPM/Oxygen)
+# Panel starts at x=140. Width 350. Right side ~320.
+# Moved to align with Heart Rate stats
+# [FIX] Moved further RIGHT to avoid touching SpO2 text (was 320)
+MED_INFO_X = 360
+MED_INFO_Y = 85 # [FIX] Aligned with HR (was 100)
+meditation_info_panel = PanelCache(MED_INFO_X - 5, MED_INFO_Y - 20, MED_INFO_X + 200, MED_INFO_Y + 60)
+
 def draw_meditation_info_panel(frame, is_meditating, is_eyes_closed, energy_level):
-    h, w, _ = frame.shape
-    # [FIX] Relocated inside Bio-Analytics Panel (Beside BPM/Oxygen)
-    # Panel starts at x=140. Width 350. Right side ~320.
-    # Moved to align with Heart Rate stats
-    # [FIX] Moved further RIGHT to avoid touching SpO2 text (was 320)
-    x = 360
-    y = 85 # [FIX] Aligned with HR (was 100)
+    x, y = MED_INFO_X, MED_INFO_Y
+    energy_pct = int(energy_level * 100)
     
-    # Compact Text
-    med_col = (0, 255, 255) 
-    cv2.putText(frame, f"Meditation: {'ON' if is_meditating else 'OFF'}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
-    cv2.putText(frame, f"Eyes: {'CLOSED' if is_eyes_closed else 'OPEN'}", (x, y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
-    cv2.putText(frame, f"Energy: {int(energy_level * 100)}%", (x, y + 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
+    def render(img):
+        # Compact Text
+        med_col = (0, 255, 255) 
+        cv2.putText(img, f"Meditation: {'ON' if is_meditating else 'OFF'}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
+        cv2.putText(img, f"Eyes: {'CLOSED' if is_eyes_closed else 'OPEN'}", (x, y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
+        cv2.putText(img, f"Energy: {energy_pct}%", (x, y + 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, med_col, 1)
+
+    # Re-rendered only when one of the three readouts changes
+    meditation_info_panel.draw(frame, (bool(is_meditating), bool(is_eyes_closed), energy_pct), render)
 
 
 
@@ -3180,13 +2941,64 @@ def show_chakra_bar_graph(chakra_energies):
         cv2.putText(graph, CHAKRA_NAMES[i].split()[0], (x1, 470),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
     cv2.imshow("Chakra Energy Bar Graph", graph)
-    cv2.imwrite("chakra_graph.png", graph)
+    image_writer.submit("chakra_graph.png", graph)
+
+
+# Bar Dimensions - Adjusted to fit between Left Panel and Right Sidebar
+LEVEL_BAR_W = 220 # [FIX] Reduced width (was 280)
+LEVEL_BAR_H = 15  # [FIX] Reduced height (was 30) for slimmer look
+LEVEL_BAR_Y = 100 # [FIX] Moved up slightly per user request (was 120)
+
+def level_bar_rect(w):
+    # [FIX] Right-Aligned Position (Close to Arrow/Sidebar)
+    # bar_x = (Sidebar Start) - (Bar Width) - (Padding)
+    bar_x = (w - SIDEBAR_W) - LEVEL_BAR_W - 20
+    return bar_x, LEVEL_BAR_Y, LEVEL_BAR_W, LEVEL_BAR_H
+
+def build_level_bar_halo_layer(layer, w, h):
+    # Outer glow (own layer so low render quality can drop it)
+    bar_x, bar_y, bar_w, bar_h = level_bar_rect(w)
+    for i in range(5):
+        alpha = 0.15 - (i * 0.03)
+        offset = 5 - i
+        layer.rect((bar_x - offset, bar_y - offset), (bar_x + bar_w + offset, bar_y + bar_h + offset), (0, 255, 255), alpha=alpha)
+
+def build_level_bar_layer(layer, w, h):
+    # Static progress bar frame - rendered once per resolution
+    bar_x, bar_y, bar_w, bar_h = level_bar_rect(w)
+    
+    # Dark background with border
+    layer.rect((bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (20, 20, 25))
+    layer.rect((bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (0, 255, 255), thickness=2)
+
+# Indian Flag (Top Left Corner)
+FLAG_X = 20
+FLAG_Y = 15
+FLAG_W = 40
+FLAG_CAPTION = "Proudly Made in India"
+
+def flag_caption_pos(x, y, width):
+    # Calculate text size for centering
+    height = int(width * 0.6)
+    (tw, th), _ = cv2.getTextSize(FLAG_CAPTION, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)
+    tx = x + (width // 2) - (tw // 2) # Center horizontally
+    ty = y + height + 25 # [FIX] Moved down further (was +15)
+    return tx, ty
 
+def build_flag_caption_layer(layer, w, h):
+    # Triple Stroke for Max Visibility - rendered once per resolution
+    tx, ty = flag_caption_pos(FLAG_X, FLAG_Y, FLAG_W)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    layer.text(FLAG_CAPTION, (tx, ty), font, 0.45, (0, 0, 0), 4)       # Black Shadow
+    layer.text(FLAG_CAPTION, (tx, ty), font, 0.45, (255, 255, 255), 2) # White Outline
+    layer.text(FLAG_CAPTION, (tx, ty), font, 0.45, (0, 215, 255), 1)   # Gold Core
 
-def draw_indian_flag(frame, x, y, width, t):
-    """
-    Draws a waving, glowing Indian flag with text.
-    """
+# The wave is sin(t * 4 + i * 0.1), so the animation repeats every pi/2 seconds
+FLAG_WAVE_PERIOD = math.pi / 2
+FLAG_PHASES = 32
+
+def paint_flag(layer, x, y, width, t):
+    """Paints one phase of the waving flag onto a render_utils.Layer."""
     height = int(width * 0.6)
     
     # Colors (BGR)
@@ -3203,133 +3015,131 @@ def draw_indian_flag(frame, x, y, width, t):
         
         # Draw Slices
         # Saffron
-        cv2.rectangle(frame, (x+i, int(y+shift)), (x+i+seg_w, int(y+height/3+shift)), saffron, -1)
+        layer.rect((x+i, int(y+shift)), (x+i+seg_w, int(y+height/3+shift)), saffron)
         # White
-        cv2.rectangle(frame, (x+i, int(y+height/3+shift)), (x+i+seg_w, int(y+2*height/3+shift)), white, -1)
+        layer.rect((x+i, int(y+height/3+shift)), (x+i+seg_w, int(y+2*height/3+shift)), white)
         # Green
-        cv2.rectangle(frame, (x+i, int(y+2*height/3+shift)), (x+i+seg_w, int(y+height+shift)), green, -1)
+        layer.rect((x+i, int(y+2*height/3+shift)), (x+i+seg_w, int(y+height+shift)), green)
         
-        # Glow (Add weighted) - Subtle
+        # Glow - Subtle
         if i % 4 == 0:
-            overlay = frame.copy()
-            cv2.circle(overlay, (x+i, int(y+height/2+shift)), 5, (255, 255, 255), -1)
-            cv2.addWeighted(overlay, 0.05, frame, 0.95, 0, frame)
+            layer.circle((x+i, int(y+height/2+shift)), 5, (255, 255, 255), alpha=0.05)
 
     # Ashoka Chakra (Center)
     # Approximate center of the wave
     center_shift = math.sin(t * 4 + width/2 * 0.1) * 4
     cx, cy = int(x + width/2), int(y + height/2 + center_shift)
     r = int(height * 0.14)
-    cv2.circle(frame, (cx, cy), r, blue, 1)
+    layer.circle((cx, cy), r, blue, thickness=1)
     # Spokes
     for k in range(0, 360, 15):
         rad = math.radians(k)
         x2 = int(cx + r * math.cos(rad))
         y2 = int(cy + r * math.sin(rad))
-        cv2.line(frame, (cx, cy), (x2, y2), blue, 1)
-
-    # Text - Enhanced Visibility
-    text = "Proudly Made in India"
-    # Calculate text size for centering
-    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)
-    tx = x + (width // 2) - (tw // 2) # Center horizontally
-    ty = y + height + 25 # [FIX] Moved down further (was +15)
-    
-    # Triple Stroke for Max Visibility
-    # 1. Black Shadow
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 4, cv2.LINE_AA)
-    # 2. White Outline
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 2, cv2.LINE_AA)
-    # 3. Gold Core
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 215, 255), 1, cv2.LINE_AA)
+        layer.line((cx, cy), (x2, y2), blue, 1)
 
-
-def generate_aura_photo(frame, aura_color, avg_hr, focus_level):
+class FlagAnimation:
     """
-    Generates a souvenir photo with aura glow and stats.
+    The waving flag pre-rendered into FLAG_PHASES premultiplied sprites
+    (lazily, one per phase); drawing picks the phase for t and does one blit.
     """
-    h, w, _ = frame.shape
-    souvenir = frame.copy()
-    
-    # 1. Apply Aura Glow (Vignette)
-    # Create a radial gradient mask
-    Y, X = np.ogrid[:h, :w]
-    center = (h//2, w//2)
-    dist_from_center = np.sqrt((X - center[1])**2 + (Y - center[0])**2)
-    mask = 1 - np.clip(dist_from_center / (w * 0.6), 0, 1) # 1 at center, 0 at edges
-    
-    # Apply color tint to edges (inverse of mask)
-    glow_layer = np.full((h, w, 3), aura_color, dtype=np.uint8)
-    
-    # Blend: Center is original, Edges are tinted
-    # We want edges to be glowing with aura_color
-    # So alpha for glow_layer should be high at edges (low mask)
-    alpha = (1 - mask) * 0.6 # Max 60% tint at edges
-    alpha = np.dstack((alpha, alpha, alpha))
-    
-    souvenir = (souvenir * (1 - alpha) + glow_layer * alpha).astype(np.uint8)
-    
-    # 2. Add Border
-    cv2.rectangle(souvenir, (0, 0), (w, h), aura_color, 20)
-    
-    # 3. Add Text Stats
-    # Bottom Bar
-    bar_h = 120
-    cv2.rectangle(souvenir, (0, h - bar_h), (w, h), (20, 20, 20), -1)
-    
-    # Title
-    cv2.putText(souvenir, "YOGA AI SOUVENIR", (w//2 - 150, h - 80), 
-                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
-    
-    # Date
-    import datetime
-    date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    cv2.putText(souvenir, date_str, (w - 250, h - 20), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-                
-    # Stats
-    stats_text = f"Avg HR: {int(avg_hr)} BPM   |   Focus: {int(focus_level * 100)}%"
-    cv2.putText(souvenir, stats_text, (50, h - 30), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, aura_color, 2)
-                
-    # Save
-    filename = f"aura_souvenir_{int(time.time())}.png"
-    cv2.imwrite(filename, souvenir)
-    print(f"[INFO] Aura Souvenir saved: {filename}")
-    
-    # Show briefly (optional, but main loop is ending)
-    cv2.imshow("Aura Souvenir", souvenir)
-    cv2.waitKey(2000) # Show for 2 seconds before closing
+    PAD = 12 # Room for the wave (+-4 px) and the glow circles
+
+    def __init__(self, width, phases=FLAG_PHASES):
+        self.width = width
+        self.phases = phases
+        self.frames = [None] * phases
+
+    def sprite(self, t):
+        idx = int((t % FLAG_WAVE_PERIOD) / FLAG_WAVE_PERIOD * self.phases) % self.phases
+        if self.frames[idx] is None:
+            pad = self.PAD
+            height = int(self.width * 0.6)
+            layer = Layer(self.width + 2 * pad, height + 2 * pad)
+            paint_flag(layer, pad, pad, self.width, idx * FLAG_WAVE_PERIOD / self.phases)
+            sprite = layer.to_sprite()
+            sprite.x -= pad
+            sprite.y -= pad
+            self.frames[idx] = sprite
+        return self.frames[idx]
+
+flag_animations = {}
+
+def draw_indian_flag(frame, x, y, width, t, caption=True):
+    """
+    Draws a waving, glowing Indian flag with text.
+    caption=False skips the text (when the cached HUD layer provides it).
+    """
+    anim = flag_animations.get(width)
+    if anim is None:
+        anim = flag_animations[width] = FlagAnimation(width)
+    sprite = anim.sprite(t)
+    blit_premultiplied(frame, sprite, x + sprite.x, y + sprite.y)
 
+    # Text - Enhanced Visibility
+    if not caption:
+        return
+    text = FLAG_CAPTION
+    tx, ty = flag_caption_pos(x, y, width)
+    
+    # Triple Stroke for Max Visibility: Black Shadow, White Outline, Gold Core
+    text_cache.draw(frame, text, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.45,
+                    (((0, 0, 0), 4), ((255, 255, 255), 2), ((0, 215, 255), 1)), cv2.LINE_AA)
+
+
+# Souvenir / screenshot output (encoded and written by the background writer)
+SOUVENIR_DIR = "screenshots"
+SOUVENIR_FORMAT = "png"    # "png", "jpg" or "webp"
+SOUVENIR_COMPRESSION = 3   # PNG zlib level 0-9, or JPEG / WebP quality 0-100
+
+# Aura vignette: float32 tint strength per resolution, and per (w, h, color)
+# a premultiplied tint + inverse alpha (uint8) ready for one integer blend
+vignette_alpha_cache = {}
+vignette_cache = OrderedDict()
+VIGNETTE_CACHE_SIZE = 8
+
+def vignette_alpha(w, h):
+    """Tint strength, float32: 0 at the centre, 0.6 at w * 0.6 from it and beyond."""
+    key = (w, h)
+    alpha = vignette_alpha_cache.get(key)
+    if alpha is None:
+        Y, X = np.ogrid[:h, :w]
+        dist_from_center = np.sqrt(((X - w // 2) ** 2 + (Y - h // 2) ** 2).astype(np.float32))
+        mask = 1 - np.clip(dist_from_center / (w * 0.6), 0, 1) # 1 at center, 0 at edges
+        alpha = ((1 - mask) * 0.6).astype(np.float32) # Max 60% tint at edges
+        vignette_alpha_cache[key] = alpha
+    return alpha
+
+def vignette_sprite(w, h, aura_color):
+    key = (w, h, tuple(int(c) for c in aura_color))
+    sprite = vignette_cache.get(key)
+    if sprite is not None:
+        vignette_cache.move_to_end(key)
+        return sprite
+    alpha = vignette_alpha(w, h)
+    a3 = alpha[:, :, None]
+    color = np.clip(a3 * np.array(key[2], np.float32) + 0.5, 0, 255).astype(np.uint8)
+    inv = np.clip((1 - a3) * 255 + 0.5, 0, 255).astype(np.uint8)
+    sprite = PremultSprite(color, np.ascontiguousarray(np.repeat(inv, 3, axis=2)), 0, 0)
+    vignette_cache[key] = sprite
+    while len(vignette_cache) > VIGNETTE_CACHE_SIZE:
+        vignette_cache.popitem(last=False)
+    return sprite
+
+# Build the display-size mask up front so the first souvenir doesn't hitch
+vignette_alpha(FRAME_WIDTH, FRAME_HEIGHT)
 
 def generate_aura_photo(frame, aura_color, avg_hr, focus_level):
     """
     Generates a souvenir photo with aura glow and stats.
-    Saves in 'screenshots' folder with timestamp.
+    Saves in 'screenshots' folder with timestamp (written in the background).
     """
     h, w, _ = frame.shape
     souvenir = frame.copy()
     
     # 1. Apply Aura Glow (Vignette)
-    # Create a radial gradient mask
-    Y, X = np.ogrid[:h, :w]
-    center = (h//2, w//2)
-    dist_from_center = np.sqrt((X - center[1])**2 + (Y - center[0])**2)
-    mask = 1 - np.clip(dist_from_center / (w * 0.6), 0, 1) # 1 at center, 0 at edges
-    
-    # Apply color tint to edges (inverse of mask)
-    glow_layer = np.full((h, w, 3), aura_color, dtype=np.uint8)
-    
-    # Blend: Center is original, Edges are tinted
-    # We want edges to be glowing with aura_color
-    # So alpha for glow_layer should be high at edges (low mask)
-    alpha = (1 - mask) * 0.6 # Max 60% tint at edges
-    alpha = np.dstack((alpha, alpha, alpha))
-    
-    souvenir = (souvenir * (1 - alpha) + glow_layer * alpha).astype(np.uint8)
+    # Edges are tinted with aura_color; cached mask, one integer blend
+    blit_premultiplied(souvenir, vignette_sprite(w, h, aura_color))
     
     # 2. Add Border
     cv2.rectangle(souvenir, (0, 0), (w, h), aura_color, 20)
@@ -3355,21 +3165,18 @@ def generate_aura_photo(frame, aura_color, avg_hr, focus_level):
                 cv2.FONT_HERSHEY_SIMPLEX, 0.7, aura_color, 2)
                 
     # Save to Screenshots Folder
-    screenshot_dir = "screenshots"
-    if not os.path.exists(screenshot_dir):
-        os.makedirs(screenshot_dir)
-    
     # Better filename with readable timestamp
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(screenshot_dir, f"yoga_session_{timestamp}.png")
-    cv2.imwrite(filename, souvenir)
-    print(f"[INFO] 📸 Screenshot saved: {filename}")
+    filename = os.path.join(SOUVENIR_DIR, f"yoga_session_{timestamp}.{SOUVENIR_FORMAT}")
+    image_writer.submit(filename, souvenir, quality=SOUVENIR_COMPRESSION)
+    print(f"[INFO] 📸 Screenshot queued: {filename}")
     
     return filename  # Return filename for confirmation
 
 
-def show_final_report(session_start, chakra_energies, total_gyan_count, alignment_count):
-    end_time = time.time()
+def show_final_report(session_start, chakra_energies, total_gyan_count, alignment_count, end_time=None):
+    if end_time is None:
+        end_time = frame_clock.now
     duration_min = (end_time - session_start) / 60.0
     strongest_idx = int(np.argmax(chakra_energies))
     weakest_idx = int(np.argmin(chakra_energies))
@@ -3395,6 +3202,33 @@ def show_final_report(session_start, chakra_energies, total_gyan_count, alignmen
 
 # ======================== MAIN ===========================
 
+# ---------------- Cached HUD Layers -----------------
+# Static chrome is rasterised once per resolution into premultiplied BGRA
+# sprites; draw functions only render the dynamic content on top.
+hud = HudCompositor()
+hud.add_static("hr_panel", build_heart_rate_panel_layer)
+hud.add_static("sidebar", build_sidebar_layer)
+hud.add_static("level_bar_halo", build_level_bar_halo_layer)
+hud.add_static("level_bar", build_level_bar_layer)
+hud.add_static("chakra_meter", build_chakra_meter_layer)
+hud.add_static("flag_caption", build_flag_caption_layer)
+# Each layer is composited where its chrome used to be drawn, so the
+# z-order against the live drawing is unchanged
+LEVEL_BAR_LAYERS = ("level_bar_halo", "level_bar")
+
+# Render quality tiers: stepped from measured frame work time, 'g' cycles
+# Auto -> Low -> Medium -> High -> Auto
+QUALITY_TARGET_FPS = 24.0
+quality = QualityGovernor(QUALITY_TARGET_FPS)
+
+def apply_quality_tier():
+    """Pushes the current tier's settings into the long-lived effect objects."""
+    elemental_effects.particles.cap_scale = quality.particle_scale
+    elemental_effects.glow = quality.glow
+    om_particles.particles.cap_scale = quality.particle_scale
+    multi_visualizer.resolution = quality.graph_resolution
+
+
 def main():
     cap = cv2.VideoCapture(CAM_INDEX)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
@@ -3434,11 +3268,11 @@ def main():
 
     chakra_energies = [0.4] * 7
     last_chakra_index = None
-    last_activation_time = time.time()
+    last_activation_time = frame_clock.now
     breathing = BreathingTracker()
 
-    session_start = time.time()
-    eye_closed_frames = 0
+    session_start = frame_clock.now
+    eyes_closed_debounce = Debouncer(on_secs=EYE_CLOSED_SECS_REQUIRED)
     alignment_mode = False
     alignment_start_time = 0.0
     alignment_progress = 0.0
@@ -3453,7 +3287,7 @@ def main():
     med_level = 0.0
     namaste_hold_start = 0
     namaste_triggered = False
-    namaste_grace_frames = 0 # Grace period for flickering detection
+    namaste_debounce = Debouncer(off_secs=NAMASTE_GRACE_SECS) # Grace period for flickering detection
     
     # Awakening Sequence State
     was_eyes_closed = False
@@ -3469,7 +3303,6 @@ def main():
     
     # Animation Time Tracking
     anim_time = 0.0
-    last_frame_time = time.time()
 
     # AI explainer state
     ai_text = "Breathe easy. Hold a gesture to get a short tip."
@@ -3484,7 +3317,7 @@ def main():
     posture_analyzer = PostureAnalyzer()
     analytics = AnalyticsTracker()
     meditation_tracker = MeditationTracker()
-    hr_monitor = HeartRateMonitor() # Initialize Heart Rate Monitor
+    hr_monitor = HeartRateMonitor(clock=frame_clock, port=HR_SENSOR_PORT, raw=HR_SENSOR_RAW) # Initialize Heart Rate Monitor
 
     # Voice recognizer (heavy) can be disabled if laggy
     ENABLE_VOICE = False
@@ -3507,8 +3340,13 @@ def main():
     # [NEW] XP System (20 Levels)
     total_xp = 0.0
     current_level = 1
-    XP_PER_LEVEL = 150 # Approx 5 seconds per level at base rate (30fps)
+    XP_PER_LEVEL = 150 # Approx 5 seconds per level at base rate
     MAX_LEVEL = 20
+    prev_total_xp = 0.0 # XP at the previous sim tick (for render interpolation)
+    prev_prana = 0.0
+
+    # [NEW] Fixed-timestep simulation clock (independent of render FPS)
+    sim_clock = FixedTimestep(SIM_HZ)
 
     print("[INFO] AI ChakraFlow FULL started. Press 'q' to quit.")
 
@@ -3516,7 +3354,7 @@ def main():
     cv2.setMouseCallback("AI ChakraFlow — Full Experience", mouse_callback)
     # Main Loop
     frame_count = 0
-    fps_start_time = time.time()
+    fps_start_time = frame_clock.now
     fps_counter = 0
     current_fps = 0.0
 
@@ -3525,14 +3363,25 @@ def main():
         if not success:
             print("Ignoring empty camera frame.")
             continue
+        # Work time of this frame (excludes waiting on the camera / waitKey)
+        work_start = time.perf_counter()
+
+        # [NEW] Single clock snapshot for this frame (passed to analysis & render)
+        now = frame_clock.tick()
+        if getattr(clock_source, "finished", False):
+            print("[INFO] Replay finished.")
+            break
+
+        # Advance simulation clock (XP / meditation / Kumbhaka run on fixed ticks)
+        sim_steps = sim_clock.advance(now)
 
         # FPS Calculation
         frame_count += 1
         fps_counter += 1
-        if time.time() - fps_start_time > 1.0:
-            current_fps = fps_counter / (time.time() - fps_start_time)
+        if now - fps_start_time > 1.0:
+            current_fps = fps_counter / (now - fps_start_time)
             fps_counter = 0
-            fps_start_time = time.time()
+            fps_start_time = now
 
         # Resize for display if needed (though we set properties, some cams ignore)
         frame = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
@@ -3609,7 +3458,7 @@ def main():
             
             nose = face_landmarks.landmark[1]
             nose_y = nose.y
-            breathing.update(nose_y)
+            breathing.update(nose_y, now)
             center_x = int(nose.x * w)
             
             # [NEW] Third Eye Interface (Siddhi Mode)
@@ -3637,7 +3486,7 @@ def main():
                 head_yaw = max(-1.0, min(1.0, head_yaw))
                 
                 # Draw Beam
-                third_eye.update_and_draw(frame, face_res.multi_face_landmarks[0], head_yaw, chakra_energies)
+                third_eye.update_and_draw(frame, face_res.multi_face_landmarks[0], head_yaw, chakra_energies, now)
                 
                 # Visual Indicator for Siddhi Mode
                 cv2.putText(frame, "SIDDHI MODE ACTIVE", (w//2 - 150, 100), 
@@ -3648,37 +3497,35 @@ def main():
             
             if is_eyes_closed:
                 if not was_eyes_closed:
-                    eyes_closed_start = time.time()
+                    eyes_closed_start = now
                 was_eyes_closed = True
-                eye_closed_frames += 1
                 try:
                     draw_text_with_bg(frame, "Meditation Detector: Eyes Closed", center_x - 120, center_y - 50, color=(255, 255, 0))
                 except Exception:
                     pass
             else:
                 if was_eyes_closed:
-                    duration_closed = time.time() - eyes_closed_start
+                    duration_closed = now - eyes_closed_start
                     if duration_closed > 4.0:
                         awakening_active = True
-                        awakening_start = time.time()
+                        awakening_start = now
                         print("[INFO] Chakra Awakening Sequence Started!")
                 was_eyes_closed = False
-                eye_closed_frames = 0
 
-            if eye_closed_frames > EYE_CLOSED_FRAMES_REQUIRED and not alignment_mode:
+            if eyes_closed_debounce.update(is_eyes_closed, now) and not alignment_mode:
                 alignment_mode = True
                 alignment_count += 1
-                alignment_start_time = time.time()
+                alignment_start_time = now
                 alignment_progress = 0.0
                 print("[INFO] Alignment Mode activated.")
         else:
-            breathing.update(0.5)
-            eye_closed_frames = 0
+            breathing.update(0.5, now)
+            eyes_closed_debounce.reset()
             was_eyes_closed = False
 
         # ALIGNMENT (Updated to allow rising)
         if alignment_mode:
-            alignment_progress = min(1.0, alignment_progress + 0.01)
+            alignment_progress = min(1.0, alignment_progress + 0.01 * TUNED_FPS * sim_clock.dt * sim_steps)
             # Instead of clamping, we just ensure a minimum baseline that rises
             # This allows the meditation boost (later in code) to add on top!
             target_base = 1.0 * alignment_progress # Target 100%
@@ -3688,7 +3535,7 @@ def main():
                 chakra_energies[i] = max(chakra_energies[i], target_base)
             
             aura_color = (0, 215, 255)
-            if time.time() - alignment_start_time > 8:
+            if now - alignment_start_time > 8:
                 alignment_mode = False
                 print("[INFO] Alignment Mode ended.")
 
@@ -3705,14 +3552,16 @@ def main():
         if 'eye_open' not in locals(): eye_open = 1.0
         if 'gaze_label' not in locals(): gaze_label = "Center"
         
-        med_stage, med_level = meditation_tracker.update(eye_open, True, posture_score > 0.6, gaze_label)
+        for _ in range(sim_steps):
+            meditation_tracker.update(eye_open, True, posture_score > 0.6, gaze_label, sim_clock.dt, now)
+        med_stage, med_level = meditation_tracker.stage, meditation_tracker.concentration_level
 
         breath_factor = breathing.get_breath_factor()
         
         # Update Heart Rate
         hr_monitor.update()
         current_avg_energy = sum(chakra_energies) / len(chakra_energies)
-        draw_heart_rate_panel(frame, hr_monitor, meditation_tracker.stage, posture_score, current_avg_energy, gaze_label)
+        draw_heart_rate_panel(frame, hr_monitor, meditation_tracker.stage, posture_score, current_avg_energy, gaze_label, now)
 
         # Fallback Mood Logic (If Face not detected)
         if mood_label == "Scanning..." or mood_label == "No face":
@@ -3801,7 +3650,7 @@ def main():
         if is_eyes_closed:
             energy_limit = 1.0 
             if 'eyes_closed_start' in locals():
-                duration_closed = time.time() - eyes_closed_start
+                duration_closed = now - eyes_closed_start
                 if duration_closed > 30.0:
                     energy_limit = 1.0 
         
@@ -3812,14 +3661,14 @@ def main():
 
         # [FIX] Sticky Energy Limit (1.5s grace period)
         # Prevents energy limit dropping instantly if detection flickers
-        if detected_mudra_name or (time.time() - last_activation_time < 1.5):
+        if detected_mudra_name or (now - last_activation_time < 1.5):
              if energy_limit < 0.60 and not gaze_distracted: # Don't hold if distracted
                  energy_limit = 0.60
 
         if detected_mudra is not None and not gaze_distracted:
-            analytics.record_chakra(detected_mudra)
+            analytics.record_chakra(detected_mudra, now)
             active_chakra_idx = detected_mudra
-            last_activation_time = time.time()
+            last_activation_time = now
             for i in range(len(chakra_energies)):
                 if i == detected_mudra:
                     # Active Mudra Boost - INSTANT
@@ -3870,12 +3719,10 @@ def main():
                 chakra_energies[i] = 0.0 
 
         # Draw Sidebar
-        draw_mudra_sidebar(frame, detected_mudra_name)
+        draw_mudra_sidebar(frame, detected_mudra_name, now)
 
-        # Time Delta Calculation
-        now = time.time()
-        dt = now - last_frame_time
-        last_frame_time = now
+        # Time Delta Calculation (from the per-frame clock snapshot)
+        dt = frame_clock.dt
         
         # Golden Aura Logic
         is_yoga_active = (posture_score > 0.1) or gyan_active
@@ -3905,9 +3752,11 @@ def main():
                  xp_gain = 0.0
                  warning_msg = "CLOSE EYES TO PROGRESS!"
 
-        # Apply XP
-        if current_level < MAX_LEVEL:
-            total_xp += xp_gain
+        # Apply XP (xp_gain is per tuned frame -> scale to the sim ticks that elapsed)
+        if current_level < MAX_LEVEL and sim_steps > 0:
+            xp_step = xp_gain * TUNED_FPS * sim_clock.dt
+            prev_total_xp = total_xp + xp_step * (sim_steps - 1)
+            total_xp = prev_total_xp + xp_step
             
             # Check Level Up
             # Level = (Total XP / XP_PER_LEVEL) + 1
@@ -3920,31 +3769,19 @@ def main():
                 
         # Draw Level Progress UI (Top Center) - PREMIUM VERSION
         # Bar Dimensions - Adjusted to fit between Left Panel and Right Sidebar
-        bar_w = 220 # [FIX] Reduced width (was 280)
-        bar_h = 15  # [FIX] Reduced height (was 30) for slimmer look
-        
-        # [FIX] Right-Aligned Position (Close to Arrow/Sidebar)
-        # Right Sidebar starts at w-280. We place bar just left of it.
-        # bar_x = (Sidebar Start) - (Bar Width) - (Padding)
-        bar_x = (w - 280) - bar_w - 20
+        bar_x, bar_y, bar_w, bar_h = level_bar_rect(w)
         bar_center_x = bar_x + bar_w // 2
         
-        # [FIX] Moved up slightly per user request
-        bar_y = 100 # Was 120
-        
         # Draw Level Text with GLOW Effect
         level_text = f"LEVEL {current_level}"
         
         # Dynamic Centering for Text
-        (lw, lh), _ = cv2.getTextSize(level_text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 6)
+        (lw, lh), _ = text_cache.size(level_text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 6)
         text_x = bar_center_x - lw // 2
         
-        # Black shadow for depth
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 6)
-        # Gold glow
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 215, 255), 4)
-        # White core
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+        # Black shadow for depth, Gold glow, White core
+        text_cache.draw(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2,
+                        (((0, 0, 0), 6), ((0, 215, 255), 4), ((255, 255, 255), 2)))
         
         # Draw Warning Message if Gated
         if warning_msg:
@@ -3953,8 +3790,8 @@ def main():
              pulse = (math.sin(anim_time * 8) + 1) / 2 
              alpha = 0.6 + 0.4 * pulse
              
-             # 2. Create Overlay for Transparency
-             overlay_warn = frame.copy()
+             # 2. Create Overlay for Transparency (ROI-limited)
+             overlay_warn = BlendRegion(frame)
              
              # Calculate text size
              (tw, th), _ = cv2.getTextSize(warning_msg, cv2.FONT_HERSHEY_SIMPLEX, 0.55, 2) # [FIX] Font 0.55
@@ -3964,32 +3801,22 @@ def main():
              
              # Background Box (Black with Red Border)
              pad = 6 # [FIX] Slightly more padding
-             cv2.rectangle(overlay_warn, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 0), -1)
-             cv2.rectangle(overlay_warn, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 255), 1)
+             overlay_warn.rect((tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 0))
+             overlay_warn.rect((tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 255), 1)
              
              # Text (High Visibility: Triple Stroke)
              # 1. Black Outer Shadow (Contrast)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 6)
+             overlay_warn.text(warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 6)
              # 2. White Outline (Brightness)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 3) 
+             overlay_warn.text(warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 3)
              # 3. Red Core (Color)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 255), 2)
+             overlay_warn.text(warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 255), 2)
              
              # 3. Apply Fade Animation
-             cv2.addWeighted(overlay_warn, alpha, frame, 1 - alpha, 0, frame)
-        
-        # Draw Progress Bar with PREMIUM styling
-        # Outer glow
-        for i in range(5):
-            alpha = 0.15 - (i * 0.03)
-            offset = 5 - i
-            overlay_glow = frame.copy()
-            cv2.rectangle(overlay_glow, (bar_x - offset, bar_y - offset), (bar_x + bar_w + offset, bar_y + bar_h + offset), (0, 255, 255), -1)
-            cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+             overlay_warn.apply(alpha)
         
-        # Dark background with border
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (20, 20, 25), -1)
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (0, 255, 255), 2)
+        # Progress Bar glow, background and border: cached HUD layers
+        hud.compose(frame, LEVEL_BAR_LAYERS if quality.halo else LEVEL_BAR_LAYERS[1:])
         
         # Calculate Progress %
         # XP for current level start = (current_level - 1) * XP_PER_LEVEL
@@ -3998,26 +3825,23 @@ def main():
         xp_next = current_level * XP_PER_LEVEL
         
         if current_level < MAX_LEVEL:
-            progress = (total_xp - xp_start) / (xp_next - xp_start)
+            # Interpolate between the last two sim ticks for smooth fill
+            display_xp = lerp(prev_total_xp, total_xp, sim_clock.alpha)
+            progress = (display_xp - xp_start) / (xp_next - xp_start)
             progress = max(0.0, min(1.0, progress))
             fill_w = int(bar_w * progress)
             
-            # Draw gradient fill (darker to lighter cyan)
-            for i in range(fill_w):
-                ratio = i / max(1, fill_w)
-                # Gradient from dark cyan to bright cyan
-                color_val = int(150 + (105 * ratio))
-                cv2.line(frame, (bar_x + i, bar_y), (bar_x + i, bar_y + bar_h), (0, color_val, 255), 1)
+            # Draw gradient fill (cached strip, dark cyan to bright cyan)
+            gradient_cache.fill(frame, bar_x, bar_y, (0, 150, 255), (0, 255, 255), fill_w, bar_h + 1)
             
             # Inner glow on progress
-            overlay_prog = frame.copy()
-            cv2.rectangle(overlay_prog, (bar_x, bar_y), (bar_x + fill_w, bar_y + bar_h), (100, 255, 255), -1)
-            cv2.addWeighted(overlay_prog, 0.3, frame, 0.7, 0, frame)
+            if quality.glow:
+                BlendRegion(frame).rect((bar_x, bar_y), (bar_x + fill_w, bar_y + bar_h), (100, 255, 255)).apply(0.3)
         else:
             # Max Level - Full Gold Bar with premium glow
             cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (0, 215, 255), -1)
-            (mw, mh), _ = cv2.getTextSize("MAX LEVEL", cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-            cv2.putText(frame, "MAX LEVEL", (bar_center_x - mw // 2, bar_y + bar_h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 215, 255), 2)
+            (mw, mh), _ = text_cache.size("MAX LEVEL", cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+            text_cache.draw(frame, "MAX LEVEL", (bar_center_x - mw // 2, bar_y + bar_h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (((0, 215, 255), 2),))
 
         # Keep Old Visual Rewards (Neck Medals) based on Milestones
         # Bronze: Lvl 1-5, Silver: Lvl 6-10, Gold: Lvl 11-15, Trophy: Lvl 16-20
@@ -4054,24 +3878,21 @@ def main():
         if visual_tier == 2:
              # Tier 2: Level 6-10
              title = "YOG GURU"
-             (tw, th), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
+             (tw, th), _ = text_cache.size(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
              tx = bar_center_x - tw // 2
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 5)
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 3)
+             text_cache.draw(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (((0, 0, 0), 5), ((255, 255, 255), 3)))
         elif visual_tier == 3:
              # Tier 3: Level 11-15
              title = "TRUE YOGI"
-             (tw, th), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
+             (tw, th), _ = text_cache.size(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
              tx = bar_center_x - tw // 2
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 5)
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 3)
+             text_cache.draw(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (((0, 0, 0), 5), ((255, 255, 255), 3)))
         elif visual_tier == 4:
              # Tier 4: Level 16-20
              title = "MASTER YOGI"
-             (tw, th), _ = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
+             (tw, th), _ = text_cache.size(title, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 5)
              tx = bar_center_x - tw // 2
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 5)
-             cv2.putText(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 3)
+             text_cache.draw(frame, title, (tx, bar_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (((0, 0, 0), 5), ((255, 255, 255), 3)))
              # Trophy Icon 🏆
              tx, ty = bar_center_x, bar_y + 110
              # Cup
@@ -4122,11 +3943,10 @@ def main():
             else:
                 aura_color = (0, 215, 255) # Gold (High Energy)
 
-        overlay_bg = frame.copy()
-        cv2.circle(overlay_bg, (center_x, center_y_aura), aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay_bg, 0.15, frame, 0.85, 0, frame)
+        if quality.aura:
+            BlendRegion(frame).circle((center_x, center_y_aura), aura_radius, aura_color).apply(0.15)
         
-        if is_yoga_active and not alignment_mode:
+        if is_yoga_active and not alignment_mode and quality.particles:
              head_y = int(nose.y * h) if 'nose' in locals() else center_y_aura - 100
              head_x = int(nose.x * w) if 'nose' in locals() else center_x
              head_y = int(nose.y * h) if 'nose' in locals() else center_y_aura - 100
@@ -4143,13 +3963,14 @@ def main():
         
         # Draw Chakras
         if not yoga_mode_active:
-            draw_chakras(frame, center_x, top_y, bottom_y, detected_mudra, chakra_energies, aura_color, breath_factor, anim_time)
+            draw_chakras(frame, center_x, top_y, bottom_y, detected_mudra, chakra_energies, aura_color, breath_factor, anim_time,
+                         glow=quality.glow)
         else:
             # Yoga Mode UI
             # Draw Chakras (so they are visible during Awakening/Meditation)
             draw_chakras(frame, center_x, top_y, bottom_y,
                         active_chakra_idx if active_chakra_idx is not None else -1,
-                        chakra_energies, aura_color, breath_factor, anim_time)
+                        chakra_energies, aura_color, breath_factor, anim_time, glow=quality.glow)
             
         # Draw Chakra Meter (ALWAYS VISIBLE)
         draw_chakra_meter(frame, chakra_energies)
@@ -4226,7 +4047,11 @@ def main():
                 pass
 
         # Update with current HR and Nose Touch status
-        prana_val, is_holding_breath = kumbhaka_tracker.update(hr_monitor.heart_rate, is_touching_nose)
+        for _ in range(sim_steps):
+            prev_prana = kumbhaka_tracker.prana_level
+            kumbhaka_tracker.update(hr_monitor.heart_rate, is_touching_nose, sim_clock.dt)
+        prana_val = lerp(prev_prana, kumbhaka_tracker.prana_level, sim_clock.alpha)
+        is_holding_breath = kumbhaka_tracker.is_holding
         draw_kumbhaka_bar(frame, prana_val, is_holding_breath)
 
         if not is_touching_nose:
@@ -4239,24 +4064,24 @@ def main():
         # [NEW] Elemental Mastery Effects
         # Pass hand landmarks list and face landmarks (first face)
         face_lm_single = face_res.multi_face_landmarks[0] if face_res.multi_face_landmarks else None
-        elemental_effects.update_and_draw(frame, detected_mudra_name, hand_res.multi_hand_landmarks, face_lm_single)
+        elemental_effects.update_and_draw(frame, detected_mudra_name, hand_res.multi_hand_landmarks, face_lm_single, now)
 
         # [NEW] Divine OM Effect
         # Only if Energy > 90%
-        if avg_energy > 0.9:
+        if avg_energy > 0.9 and quality.particles:
              draw_om_effect(frame, avg_energy)
 
         # Namaste Detection for Screenshot (Replaces Mode Toggle)
         # [FIX] Robust Detection with Grace Period & Visual Feedback
         is_namaste = detect_namaste(hand_res)
+        namaste_held = namaste_debounce.update(is_namaste, now)
         
         if is_namaste:
-            namaste_grace_frames = 15 # Reset grace period (approx 0.5s at 30fps)
             if namaste_hold_start == 0:
-                namaste_hold_start = time.time()
+                namaste_hold_start = now
             
             # Calculate Progress
-            hold_duration = time.time() - namaste_hold_start
+            hold_duration = now - namaste_hold_start
             req_duration = 1.0 # 1 second hold
             progress = min(1.0, hold_duration / req_duration)
             
@@ -4284,18 +4109,16 @@ def main():
                     print(f"[INFO] 🙏 Namaste Screenshot Captured! Saved to: {filename}")
                     
                     # Visual Flash Effect
-                    flash = frame.copy()
-                    cv2.rectangle(flash, (0, 0), (w, h), (255, 255, 255), -1)
-                    cv2.addWeighted(flash, 0.5, frame, 0.5, 0, frame)
+                    BlendRegion(frame).fill((255, 255, 255)).apply(0.5)
                     cv2.putText(frame, "NAMASTE - SCREENSHOT SAVED!", (center_x - 250, center_y_aura), 
                                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3)
                     cv2.imshow("AI ChakraFlow — Full Experience", frame)
                     cv2.waitKey(300) # Brief flash
         else:
             # Grace Period Logic
-            if namaste_grace_frames > 0:
-                namaste_grace_frames -= 1
-                # Keep holding start time valid, just waiting
+            if namaste_held:
+                # Within NAMASTE_GRACE_SECS: keep holding start time valid, just waiting
+                pass
             else:
                 namaste_hold_start = 0
                 namaste_triggered = False
@@ -4310,13 +4133,13 @@ def main():
         
         if is_peace:
             if screenshot_timer == 0:
-                screenshot_timer = time.time()
+                screenshot_timer = now
             
-            hold_duration = time.time() - screenshot_timer
+            hold_duration = now - screenshot_timer
             
             if hold_duration > 1.0 and screenshot_countdown_start == 0:
                 # Start Countdown
-                screenshot_countdown_start = time.time()
+                screenshot_countdown_start = now
                 
         else:
             if screenshot_countdown_start == 0:
@@ -4324,7 +4147,7 @@ def main():
                 
         # Handle Countdown & Capture
         if screenshot_countdown_start > 0:
-            elapsed = time.time() - screenshot_countdown_start
+            elapsed = now - screenshot_countdown_start
             remaining = 3.0 - elapsed
             
             if remaining > 0:
@@ -4365,7 +4188,7 @@ def main():
             status['subtitle'] = "Meditation & Mudra Engine"
             
         # 3. Hint: Coach Message or Instructions
-        idle_time = time.time() - last_activation_time
+        idle_time = now - last_activation_time
         # [FIX] Removed "Touch nose" and "Press q" from here (Moved to Sidebar)
         
         if idle_time > 10 and not alignment_mode and not gyan_active:
@@ -4385,43 +4208,44 @@ def main():
         draw_status_panel(frame, center_x, center_y_aura, aura_radius, status)
 
 
-        elapsed_min = (time.time() - session_start) / 60.0
+        elapsed_min = (now - session_start) / 60.0
         top_text = f"AI ChakraFlow  |  Session: {elapsed_min:.1f} min  |  Mood: {mood_label}  |  Posture: {posture_label}"
         
         # [FIX] Premium Top Bar (Smaller, Centered, Gold Accent)
         # Calculate size for centering
-        (tw, th), _ = cv2.getTextSize(top_text, cv2.FONT_HERSHEY_SIMPLEX, 0.55, 1)
+        (tw, th), _ = text_cache.size(top_text, cv2.FONT_HERSHEY_SIMPLEX, 0.55, 1)
         tx = w // 2 - tw // 2
         ty = 15 # [FIX] Moved to very top (was 30) to avoid overlap
         
         # Background with Border
-        overlay = frame.copy()
         pad = 8 # Slightly reduced padding
-        cv2.rectangle(overlay, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (10, 10, 10), -1) 
-        cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
+        BlendRegion(frame).rect((tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (10, 10, 10)).apply(0.8, 0.2)
         
         # Gold Border
         cv2.rectangle(frame, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 215, 255), 1)
         
         # Text (Gold)
-        cv2.putText(frame, top_text, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 215, 255), 1, cv2.LINE_AA)
+        text_cache.draw(frame, top_text, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (((0, 215, 255), 1),), cv2.LINE_AA)
 
         # [NEW] Indian Flag (Top Left Corner - No Overlap)
         # Chakra Meter moved down to y=130 to accommodate this
-        draw_indian_flag(frame, 20, 15, 40, anim_time)
+        # (Still flag at low render quality)
+        draw_indian_flag(frame, FLAG_X, FLAG_Y, FLAG_W, anim_time if quality.flag_wave else 0.0, caption=False)
+        hud.compose(frame, ("flag_caption",))
 
         # [NEW] Check Hover for Speaking Graphs
-        check_hover_and_speak(w, h)
+        check_hover_and_speak(w, h, now)
 
         # Draw FPS
-        cv2.putText(frame, f"FPS: {int(current_fps)}", (w - 120, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        text_cache.draw(frame, f"FPS: {int(current_fps)}", (w - 120, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (((0, 255, 0), 2),))
+        text_cache.draw(frame, quality.label(), (w - 120, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (((0, 255, 0), 1),))
 
         cv2.imshow("AI ChakraFlow — Full Experience", frame)
 
         # Voice trigger disabled to avoid lag; set ENABLE_VOICE=True to re-enable.
         if False:
-            if time.time() - last_voice_check > 4:
-                last_voice_check = time.time()
+            if now - last_voice_check > 4:
+                last_voice_check = now
                 try:
                     with mic as source:
                         r.adjust_for_ambient_noise(source, duration=0.2)
@@ -4429,7 +4253,7 @@ def main():
                     try:
                         cmd = r.recognize_google(audio, language="hi-IN").lower()
                         if "hari om" in cmd or ("hari" in cmd and "om" in cmd):
-                            duration_min_now = (time.time() - session_start) / 60.0
+                            duration_min_now = (now - session_start) / 60.0
                             show_chakra_bar_graph(chakra_energies)
                             summary_img = create_summary_image(chakra_energies, duration_min_now,
                                                                total_gyan_count, alignment_count)
@@ -4441,6 +4265,14 @@ def main():
                 except Exception:
                     pass
 
+        # Pick next frame's render quality from this frame's work time.
+        # Real time throughout: the hysteresis windows must not follow a
+        # simulated / replayed frame clock
+        prev_level = quality.level
+        quality.update(time.perf_counter() - work_start)
+        if quality.level != prev_level:
+            apply_quality_tier()
+
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             # [FIX] Removed Screenshot on Quit
@@ -4448,15 +4280,18 @@ def main():
         elif key == ord('r'):
             print("[INFO] Manual Reconnect Requested...")
             hr_monitor.connect()
+        elif key == ord('g'):
+            # Cycle render quality: Auto -> Low -> Medium -> High -> Auto
+            quality.cycle_override()
+            apply_quality_tier()
+            print(f"[INFO] Render quality: {quality.label()}")
         elif key == ord('s'):
             # [NEW] Manual Screenshot with 'S' key
             avg_energy = sum(chakra_energies) / len(chakra_energies)
             filename = generate_aura_photo(frame, aura_color, hr_monitor.heart_rate, avg_energy)
             print(f"[INFO] 📸 Manual Screenshot Captured! Saved to: {filename}")
             # Visual Flash Effect
-            flash = frame.copy()
-            cv2.rectangle(flash, (0, 0), (w, h), (255, 255, 255), -1)
-            cv2.addWeighted(flash, 0.5, frame, 0.5, 0, frame)
+            BlendRegion(frame).fill((255, 255, 255)).apply(0.5)
             cv2.putText(frame, "SCREENSHOT SAVED!", (center_x - 180, center_y_aura), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
             cv2.imshow("AI ChakraFlow — Full Experience", frame)
@@ -4473,6 +4308,16 @@ def main():
     print("Avg posture score:", f"{summary['avg_posture']:.2f}")
     print("Posture alerts (score<0.5):", summary["posture_alerts"])
     print("Time per chakra (s):", [round(t, 1) for t in summary["chakra_time"]])
+    hr_monitor.close() # Stop the serial reader and port watcher threads
+    physio_engine.spectral.stop(timeout=1.0) # And the spectral HRV worker
+    if CLOCK_RECORD_FILE:
+        clock_source.save(CLOCK_RECORD_FILE)
+        print(f"[INFO] Frame timestamps saved to {CLOCK_RECORD_FILE}")
+    # Finish any images still being written
+    if not image_writer.close(timeout=IMAGE_WRITER_FLUSH_SECS):
+        print(f"[WARN] {image_writer.pending} image(s) not written before exit")
+    if image_writer.failed:
+        print(f"[WARN] {image_writer.failed} image write(s) failed: {image_writer.last_error}")
     print("[INFO] Exited cleanly.")
 
 